@@ -0,0 +1,31 @@
+import subprocess
+import numpy as np
+
+SAMPLE_RATE = 8000  # Plenty for waveforms and voice activity, and cheap to decode
+
+
+def iter_audio_chunks(video_path, sample_rate=SAMPLE_RATE, chunk_seconds=30):
+    """Decode the first audio track of a file to mono float32 chunks in [-1, 1].
+
+    Decoding is streamed through ffmpeg so memory stays bounded by the chunk
+    size regardless of the length of the video.
+    """
+    process = subprocess.Popen(
+        ["ffmpeg", "-nostdin", "-v", "error", "-i", video_path, "-vn", "-map", "0:a:0",
+         "-ac", "1", "-ar", str(sample_rate), "-f", "s16le", "-"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    chunk_bytes = sample_rate * chunk_seconds * 2
+    try:
+        while True:
+            data = process.stdout.read(chunk_bytes)
+            if not data:
+                break
+            if len(data) % 2:
+                data = data[:-1]
+            yield np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read().decode('utf-8', 'replace')
+        process.stderr.close()
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed to decode {video_path}: {stderr.strip()}")
@@ -0,0 +1,74 @@
+import os
+import subprocess
+
+from disk_cache import file_identity, touch, evict_to_budget
+
+SIDECAR_EXTENSION = ".mka"  # Matroska audio holds both a copied AAC track and an Opus encode
+OPUS_BITRATE = "64k"  # Plenty for speech
+
+
+def probe_audio_codec(video_path):
+    """Return the codec name of a file's first audio track, or an empty string if it has none."""
+    probe = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "a:0", "-show_entries", "stream=codec_name",
+         "-of", "csv=p=0", video_path],
+        capture_output=True, text=True)
+    return probe.stdout.strip()
+
+
+def sidecar_command(video_path, out_path, audio_codec):
+    """Build the ffmpeg command extracting the first audio track, copying it when it is already compact."""
+    command = ["ffmpeg", "-nostdin", "-v", "error", "-y", "-i", video_path, "-vn", "-sn", "-dn", "-map", "0:a:0"]
+    if audio_codec in ('aac', 'opus'):
+        command += ["-c:a", "copy"]
+    else:
+        command += ["-c:a", "libopus", "-b:a", OPUS_BITRATE]
+    command += ["-f", "matroska", out_path]
+    return command
+
+
+class AudioSidecarCache:
+    """Local audio-only copies of videos, keyed by file identity and bounded by a disk budget.
+
+    Playing the sidecar instead of the container keeps a practice session that
+    does not show the video from streaming gigabytes of video from a network
+    share. A sidecar is built by reading the source once.
+    """
+
+    def __init__(self, cache_dir, budget_bytes=2 * 1024 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.budget_bytes = budget_bytes
+
+    def path_for(self, video_path):
+        return os.path.join(self.cache_dir, f"{file_identity(video_path)}{SIDECAR_EXTENSION}")
+
+    def lookup(self, video_path):
+        """Return the sidecar of a video if it has been built, or None."""
+        try:
+            path = self.path_for(video_path)
+        except OSError:
+            return None
+        if not os.path.exists(path):
+            return None
+        touch(path)
+        return path
+
+    def build(self, video_path, keep=()):
+        """Extract a video's audio into its sidecar, evict old sidecars over budget and return the path."""
+        path = self.path_for(video_path)
+        if os.path.exists(path):
+            touch(path)
+            return path
+        audio_codec = probe_audio_codec(video_path)
+        if not audio_codec:
+            raise RuntimeError(f"{video_path} has no audio track")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        completed = subprocess.run(sidecar_command(video_path, tmp_path, audio_codec), capture_output=True, text=True)
+        if completed.returncode != 0:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise RuntimeError(f"ffmpeg failed to extract the audio of {video_path}: {completed.stderr.strip()}")
+        os.replace(tmp_path, path)
+        evict_to_budget(self.cache_dir, self.budget_bytes, keep=[path, *keep])
+        return path
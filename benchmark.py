@@ -0,0 +1,264 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import tempfile
+import tracemalloc
+
+from clip_store import CLIP_DB_NAME, new_clip_id, open_clip_store, iter_clips_parallel, ClipWriter
+from clip_session import ClipSession, scan_for_videos
+from library_index import LibraryIndex
+
+HEAVY_VIDEO_ID = "video000000.mp4"  # The synthetic video holding the most clips
+
+
+def generate_library(work_dir, videos, clips, depth, fanout, heavy_clips, seed=0):
+    """Create empty video files in a deep directory tree and JSON clip configs for them.
+
+    Clips are spread evenly over the videos, except for one video with
+    ``heavy_clips`` clips: the worst case for opening a video and editing its clips.
+    Returns ``(base_dir, config_dir)``.
+    """
+    rng = random.Random(seed)
+    base_dir = os.path.join(work_dir, "videos")
+    config_dir = os.path.join(work_dir, "config")
+    os.makedirs(config_dir, exist_ok=True)
+    heavy_clips = min(heavy_clips, clips)
+    per_video = (clips - heavy_clips) // max(1, videos - 1)
+    leaves = fanout ** depth
+    for i in range(videos):
+        leaf = i % leaves
+        dir_path = os.path.join(base_dir, *(f"d{leaf // fanout ** level % fanout}" for level in reversed(range(depth))))
+        os.makedirs(dir_path, exist_ok=True)
+        name = f"video{i:06d}.mp4"
+        open(os.path.join(dir_path, name), 'wb').close()
+
+        count = heavy_clips if i == 0 else per_video
+        starts = sorted(rng.uniform(0, 2700) for _ in range(count))
+        data = [{'id': new_clip_id(), 'positions': [start, start + rng.uniform(1, 8)]} for start in starts]
+        with open(os.path.join(config_dir, f"{name}.json"), 'w') as f:
+            json.dump(data, f)
+    return base_dir, config_dir
+
+
+def prepare_library(work_dir, params):
+    """Generate the synthetic library, or reuse the one in ``work_dir`` if it was built with the same parameters."""
+    params_path = os.path.join(work_dir, "library.json")
+    try:
+        with open(params_path, 'r') as f:
+            reusable = json.load(f) == params
+    except (OSError, ValueError):
+        reusable = False
+    base_dir, config_dir = os.path.join(work_dir, "videos"), os.path.join(work_dir, "config")
+    if not reusable:
+        for path in (base_dir, config_dir):
+            shutil.rmtree(path, ignore_errors=True)
+        generate_library(work_dir, **params)
+        with open(params_path, 'w') as f:
+            json.dump(params, f)
+    return base_dir, config_dir
+
+
+def measure(name, function, setup=None, repeat=5):
+    """Time ``function`` over ``repeat`` runs, then run it once more under tracemalloc for its peak memory.
+
+    ``setup`` is called untimed before every run. Returns a result dictionary.
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+
+    # tracemalloc slows allocation down, so memory is measured in a separate run
+    if setup:
+        setup()
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        'name': name,
+        'repeat': repeat,
+        'median_ms': timings[len(timings) // 2] * 1000,
+        'min_ms': timings[0] * 1000,
+        'max_ms': timings[-1] * 1000,
+        'peak_kb': peak / 1024,
+    }
+
+
+def run_library_benchmarks(base_dir, work_dir, repeat):
+    """Benchmark the startup scan: a full walk, and the library index cold and warm."""
+    index_path = os.path.join(work_dir, "cache", "library_index.json")
+
+    def remove_index():
+        if os.path.exists(index_path):
+            os.remove(index_path)
+
+    def index_scan():
+        library_index = LibraryIndex(base_dir, index_path)
+        library_index.load()
+        library_index.reconcile()
+
+    def index_load():
+        LibraryIndex(base_dir, index_path).load()
+
+    results = [
+        measure("scan.walk", lambda: scan_for_videos(base_dir), repeat=repeat),
+        measure("scan.index_cold", index_scan, setup=remove_index, repeat=repeat),
+        measure("scan.index_warm", index_scan, repeat=repeat),
+        measure("scan.index_load", index_load, repeat=repeat),
+    ]
+    return results, LibraryIndex(base_dir, index_path).load()
+
+
+def run_clip_benchmarks(backend, config_dir, video_paths, repeat, edits, seed=0):
+    """Benchmark the clip data paths of one clip store backend."""
+    rng = random.Random(seed)
+    results = []
+    cache_dir = os.path.join(os.path.dirname(config_dir), "cache")
+    db_path = os.path.join(cache_dir, CLIP_DB_NAME)
+
+    def remove_db():
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+    if backend == 'sqlite':
+        results.append(measure("store.import", lambda: open_clip_store(config_dir, 'sqlite', cache_dir).close(),
+                               setup=remove_db, repeat=1))
+    store = open_clip_store(config_dir, backend, cache_dir)
+    writer = ClipWriter(store, debounce=0)
+    session = ClipSession(store, writer)
+    try:
+        results.append(measure("toggle.list_videos", lambda: session.videos_with_clips(video_paths), repeat=repeat))
+
+        # Reading every config of the tree, from a fresh store and again from one that parsed them already
+        video_ids = session.videos_with_clips(video_paths)
+        fresh = {}
+
+        def open_fresh_store():
+            if 'store' in fresh:
+                fresh['store'].close()
+            fresh['store'] = open_clip_store(config_dir, backend, cache_dir)
+
+        def load_all(target):
+            for _ in iter_clips_parallel(target, video_ids):
+                pass
+
+        results.append(measure("toggle.load_all_cold", lambda: load_all(fresh['store']),
+                               setup=open_fresh_store, repeat=repeat))
+        fresh.pop('store').close()
+        load_all(store)
+        results.append(measure("toggle.load_all_warm", lambda: load_all(store), repeat=repeat))
+        results.append(measure("toggle.expand_heavy", lambda: session.clips_of(HEAVY_VIDEO_ID),
+                               setup=lambda: session.video_clips.clear(), repeat=repeat))
+        results.append(measure("video.load_clips", lambda: session.load_clips(HEAVY_VIDEO_ID), repeat=repeat))
+
+        # Edits are timed until they are durable, as an E or Delete press would be
+        def save_clip():
+            start = rng.uniform(0, 2700)
+            session.add_clip(start, start + 3)
+            writer.flush()
+
+        def delete_clip():
+            session.delete_clip(rng.randrange(len(session.favorites)))
+            writer.flush()
+
+        session.load_clips(HEAVY_VIDEO_ID)
+        results.append(measure("clip.save", save_clip, repeat=edits))
+        results.append(measure("clip.delete", delete_clip, repeat=edits))
+    finally:
+        writer.close()
+        store.close()
+    if backend == 'sqlite':
+        remove_db()
+    for result in results:
+        result['backend'] = backend
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return the results whose median is more than ``tolerance`` times the baseline's."""
+    previous = {(r['name'], r.get('backend')): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        before = previous.get((result['name'], result.get('backend')))
+        if before and before['median_ms'] > 0:
+            result['baseline_ms'] = before['median_ms']
+            if result['median_ms'] > before['median_ms'] * tolerance:
+                regressions.append(result)
+    return regressions
+
+
+def print_table(results):
+    print(f"{'benchmark':<22} {'backend':<8} {'median ms':>11} {'min ms':>10} {'max ms':>10} {'peak KB':>10} {'baseline':>10}")
+    for r in results:
+        baseline = f"{r['baseline_ms']:.2f}" if 'baseline_ms' in r else "-"
+        print(f"{r['name']:<22} {r.get('backend', '-'):<8} {r['median_ms']:>11.2f} {r['min_ms']:>10.2f} "
+              f"{r['max_ms']:>10.2f} {r['peak_kb']:>10.0f} {baseline:>10}")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the library scan and clip data paths on a synthetic library.")
+    parser.add_argument("--videos", type=int, default=10000, help="Number of synthetic videos")
+    parser.add_argument("--clips", type=int, default=1000000, help="Total number of synthetic clips")
+    parser.add_argument("--heavy-clips", type=int, default=5000, help="Clips of the single heaviest video")
+    parser.add_argument("--depth", type=int, default=6, help="Depth of the video directory tree")
+    parser.add_argument("--fanout", type=int, default=4, help="Subdirectories per directory")
+    parser.add_argument("--backend", action="append", choices=["json", "sqlite"],
+                        help="Clip store backend to benchmark (repeatable, default: both)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per read benchmark")
+    parser.add_argument("--edits", type=int, default=20, help="Clip saves and deletes per backend")
+    parser.add_argument("--work-dir", help="Keep the synthetic library here and reuse it on later runs")
+    parser.add_argument("--json", dest="json_path", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Compare against the JSON results of an earlier run")
+    parser.add_argument("--tolerance", type=float, default=1.25,
+                        help="Slowdown factor against --compare that counts as a regression")
+    args = parser.parse_args(argv)
+
+    params = {'videos': args.videos, 'clips': args.clips, 'depth': args.depth, 'fanout': args.fanout,
+              'heavy_clips': args.heavy_clips}
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="videoclip-bench-")
+    os.makedirs(work_dir, exist_ok=True)
+    try:
+        started = time.perf_counter()
+        base_dir, config_dir = prepare_library(work_dir, params)
+        print(f"Synthetic library ready in {time.perf_counter() - started:.1f}s: {params}", flush=True)
+
+        results, video_paths = run_library_benchmarks(base_dir, work_dir, args.repeat)
+        for backend in args.backend or ["json", "sqlite"]:
+            results += run_clip_benchmarks(backend, config_dir, video_paths, args.repeat, args.edits)
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        if baseline.get('params') != params:
+            print(f"Warning: baseline was run with {baseline.get('params')}")
+        regressions = compare(results, baseline, args.tolerance)
+
+    print_table(results)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'params': params, 'python': sys.version.split()[0], 'platform': platform.platform(),
+                       'time': time.strftime("%Y-%m-%dT%H:%M:%S"), 'results': results}, f, indent=2)
+    for r in regressions:
+        print(f"REGRESSION {r['name']} ({r.get('backend', '-')}): {r['median_ms']:.2f} ms vs {r['baseline_ms']:.2f} ms")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,121 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from clip_store import overlay_ops
+
+DEFAULT_TOLERANCE = 0.25  # Seconds within which two clip boundaries count as the same
+
+
+def merge_clips(clips, tolerance=DEFAULT_TOLERANCE, merge_overlaps=False):
+    """Sweep clips in start order, dropping near-duplicates or merging overlapping clips.
+
+    A clip whose start and end are both within ``tolerance`` of a kept clip is
+    dropped. With ``merge_overlaps`` a clip starting before the previous kept
+    clip ends (plus ``tolerance``) is folded into it instead, extending its end.
+    Kept clips keep their ids and the input clips are not modified.
+
+    Returns ``(kept, dropped)``: the kept clips sorted by start, and a
+    ``(dropped clip, id of the clip it went into)`` pair per removed clip.
+    """
+    kept, dropped = [], []
+    for clip in sorted(clips, key=lambda clip: tuple(clip['positions'])):
+        start, end = clip['positions']
+        target = None
+        if merge_overlaps:
+            # Kept clips never overlap, so only the last one can
+            if kept and start <= kept[-1]['positions'][1] + tolerance:
+                target = kept[-1]
+                kept_start, kept_end = target['positions']
+                target['positions'] = (kept_start, max(kept_end, end))
+        else:
+            # Walk back over the kept clips that start close enough to be duplicates
+            for candidate in reversed(kept):
+                candidate_start, candidate_end = candidate['positions']
+                if start - candidate_start > tolerance:
+                    break
+                if abs(end - candidate_end) <= tolerance:
+                    target = candidate
+                    break
+        if target is None:
+            kept.append({'id': clip['id'], 'positions': (start, end)})
+        else:
+            dropped.append((clip, target['id']))
+    return kept, dropped
+
+
+def dedupe_video(store, video_id, tolerance=DEFAULT_TOLERANCE, merge_overlaps=False, dry_run=False,
+                 clip_writer=None):
+    """Clean up the clips of one video, writing its record once if anything changed.
+
+    With a ``clip_writer`` (the player's) the cleanup is queued on it as an
+    update, applied to the clips as they are when it is written, so edits
+    queued meanwhile are kept. Otherwise the store is locked from the read to
+    the write. Returns ``(kept, dropped)`` as ``merge_clips`` does.
+    """
+    if clip_writer is not None:
+        clips, ops = clip_writer.read(store.clips_for_video, video_id)
+        kept, dropped = merge_clips(overlay_ops(video_id, clips, ops), tolerance, merge_overlaps)
+        if dropped and not dry_run:
+            clip_writer.update(video_id, lambda clips: merge_clips(clips, tolerance, merge_overlaps)[0])
+        return kept, dropped
+
+    store.clips_for_video(video_id)  # Parse in parallel; the read under the lock is then a cache hit
+    with store.lock:
+        kept, dropped = merge_clips(store.clips_for_video(video_id), tolerance, merge_overlaps)
+        if dropped and not dry_run:
+            store.replace_clips(video_id, kept)
+    return kept, dropped
+
+
+def dedupe_library(store, video_ids=None, tolerance=DEFAULT_TOLERANCE, merge_overlaps=False, dry_run=False,
+                   workers=8, on_progress=None, clip_writer=None):
+    """Clean up the clips of many videos (every video in the store by default) in a thread pool.
+
+    Returns video id -> ``(kept, dropped)`` for the videos that changed.
+    """
+    video_ids = store.video_ids() if video_ids is None else list(video_ids)
+    changed = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            lambda video_id: dedupe_video(store, video_id, tolerance, merge_overlaps, dry_run, clip_writer),
+            video_ids)
+        for done, (video_id, (kept, dropped)) in enumerate(zip(video_ids, results), 1):
+            if dropped:
+                changed[video_id] = (kept, dropped)
+            if on_progress:
+                on_progress(done, len(video_ids))
+    return changed
+
+
+def main(argv=None):
+    import argparse
+    from clip_store import open_clip_store
+
+    parser = argparse.ArgumentParser(description="Drop duplicate clips, or merge overlapping ones, in every clip config.")
+    parser.add_argument("config_dir", help="Clip config directory")
+    parser.add_argument("--backend", default="json", choices=["json", "sqlite"], help="Clip store backend")
+    parser.add_argument("--cache-dir", default=os.path.join(os.getcwd(), "cache"), help="Clip database cache directory")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Seconds within which clip boundaries count as the same")
+    parser.add_argument("--merge-overlaps", action="store_true", help="Merge overlapping clips into one")
+    parser.add_argument("--video", action="append", help="Only clean up the clips of this video (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="Report the changes without writing them")
+    parser.add_argument("--workers", type=int, default=8, help="Number of worker threads")
+    args = parser.parse_args(argv)
+
+    store = open_clip_store(args.config_dir, backend=args.backend, cache_dir=args.cache_dir)
+    changed = dedupe_library(store, args.video, args.tolerance, args.merge_overlaps, args.dry_run, args.workers)
+    store.close()
+    for video_id, (kept, dropped) in sorted(changed.items()):
+        print(f"{video_id}: {len(kept) + len(dropped)} -> {len(kept)} clips")
+        for clip, target_id in dropped:
+            start, end = clip['positions']
+            print(f"  {clip['id']} {start:.2f}s - {end:.2f}s -> {target_id}")
+    removed = sum(len(dropped) for _, dropped in changed.values())
+    action = "Would remove" if args.dry_run else "Removed"
+    print(f"{action} {removed} clips in {len(changed)} videos")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,183 @@
+import os
+import json
+import bisect
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from audio_sidecar import probe_audio_codec
+from clip_store import atomic_write_json
+
+MANIFEST_NAME = "export_manifest.json"
+KEYFRAME_TOLERANCE = 0.05  # Seconds a cut point may be off a keyframe and still be stream-copied
+
+
+def load_keyframes(video_path, keyframe_dir=None):
+    """Return the sorted keyframe times of a video in seconds, from the player's index cache if given.
+
+    Listing keyframes reads the whole file, so it is only done for video exports.
+    """
+    from keyframes import KeyframeCache, probe_keyframes
+
+    if keyframe_dir is None:
+        keyframes = probe_keyframes(video_path)
+    else:
+        cache = KeyframeCache(keyframe_dir)
+        keyframes = cache.load(video_path)
+        if keyframes is None:
+            keyframes = cache.build(video_path)
+    return [keyframe / 1000.0 for keyframe in keyframes.tolist()]
+
+
+def on_keyframe(keyframes, time, tolerance=KEYFRAME_TOLERANCE):
+    """Return True if a time is within tolerance of a keyframe."""
+    i = bisect.bisect_left(keyframes, time - tolerance)
+    return i < len(keyframes) and keyframes[i] <= time + tolerance
+
+
+def clip_output_path(output_dir, video_path, clip, kind):
+    """Return the file a clip is exported to."""
+    stem = os.path.splitext(os.path.basename(video_path))[0]
+    start, end = clip['positions']
+    extension = ".m4a" if kind == 'audio' else ".mp4"
+    return os.path.join(output_dir, stem, f"{stem}_{int(start * 1000):08d}-{int(end * 1000):08d}{extension}")
+
+
+def segment_command(video_path, clip, out_path, kind, audio_codec, keyframes):
+    """Build the ffmpeg command extracting one clip, stream-copying whenever the cut allows it."""
+    start, end = clip['positions']
+    command = ["ffmpeg", "-nostdin", "-v", "error", "-y", "-ss", f"{start:.3f}", "-i", video_path,
+               "-t", f"{end - start:.3f}"]
+    if kind == 'audio':
+        command += ["-vn", "-map", "0:a:0"]
+        command += ["-c:a", "copy"] if audio_codec == 'aac' else ["-c:a", "aac", "-b:a", "128k"]
+    elif on_keyframe(keyframes, start):
+        command += ["-map", "0:v:0", "-map", "0:a:0?", "-c", "copy", "-avoid_negative_ts", "make_zero"]
+    else:
+        command += ["-map", "0:v:0", "-map", "0:a:0?", "-c:v", "libx264", "-preset", "veryfast",
+                    "-crf", "20", "-c:a", "aac", "-b:a", "128k"]
+    command.append(out_path)
+    return command
+
+
+def export_video_clips(video_path, clips, output_dir, kinds, keyframe_dir=None):
+    """Export the clips of one video; runs in a worker process.
+
+    The source is probed once and its clips are cut one after another, so
+    every container is handled by a single worker. Returns a list of
+    ``(clip_id, kind, out_path, error)``.
+    """
+    audio_codec = probe_audio_codec(video_path)
+    keyframes = load_keyframes(video_path, keyframe_dir) if 'video' in kinds else []
+    results = []
+    for clip in clips:
+        for kind in kinds:
+            out_path = clip_output_path(output_dir, video_path, clip, kind)
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+            command = segment_command(video_path, clip, out_path, kind, audio_codec, keyframes)
+            completed = subprocess.run(command, capture_output=True, text=True)
+            error = completed.stderr.strip() if completed.returncode else None
+            results.append((clip['id'], kind, out_path, error))
+    return results
+
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def export_clips(store, video_paths, output_dir, video_ids=None, kinds=('audio',), workers=None,
+                 on_progress=None, keyframe_dir=None):
+    """Export saved clips to standalone files with a bounded process pool.
+
+    ``video_paths`` maps video ids to source files. Clips already listed in the
+    output directory's manifest with the same positions are skipped, so an
+    interrupted export resumes where it stopped. ``on_progress(done, total)``
+    is called after every finished video. Video exports take keyframes from
+    the index cache in ``keyframe_dir`` if given. Returns ``(exported, skipped, errors)``.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(output_dir)
+    if video_ids is None:
+        video_ids = store.video_ids()
+
+    # Group the outstanding clips by source video so each container is opened by one worker
+    tasks, skipped = [], 0
+    for video_id in video_ids:
+        video_path = video_paths.get(video_id)
+        if not video_path:
+            continue
+        todo = []
+        for clip in store.clips_for_video(video_id):
+            done = all(
+                manifest.get(f"{clip['id']}:{kind}", {}).get('positions') == list(clip['positions'])
+                and os.path.exists(manifest[f"{clip['id']}:{kind}"]['file'])
+                for kind in kinds)
+            if done:
+                skipped += 1
+            else:
+                todo.append(clip)
+        if todo:
+            tasks.append((video_path, todo))
+
+    exported, errors = 0, []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(export_video_clips, video_path, clips, output_dir, kinds, keyframe_dir): clips
+                   for video_path, clips in tasks}
+        for done, future in enumerate(as_completed(futures), 1):
+            positions = {clip['id']: list(clip['positions']) for clip in futures[future]}
+            try:
+                results = future.result()
+            except Exception as e:
+                errors.append(str(e))
+                results = []
+            for clip_id, kind, out_path, error in results:
+                if error:
+                    errors.append(f"{out_path}: {error}")
+                else:
+                    manifest[f"{clip_id}:{kind}"] = {'file': out_path, 'positions': positions[clip_id]}
+                    exported += 1
+            # Record progress after every video so an interrupted export can resume
+            atomic_write_json(os.path.join(output_dir, MANIFEST_NAME), manifest)
+            if on_progress:
+                on_progress(done, len(tasks))
+    return exported, skipped, errors
+
+
+def main(argv=None):
+    import argparse
+    from clip_store import open_clip_store
+    from library_index import LibraryIndex
+
+    parser = argparse.ArgumentParser(description="Export saved clips as standalone audio/video files.")
+    parser.add_argument("config_dir", help="Clip config directory")
+    parser.add_argument("base_video_dir", help="Directory containing the videos")
+    parser.add_argument("output_dir", help="Directory to write the exported clips to")
+    parser.add_argument("--backend", default="json", choices=["json", "sqlite"], help="Clip store backend")
+    parser.add_argument("--cache-dir", default=os.path.join(os.getcwd(), "cache"), help="Library index and clip database cache directory")
+    parser.add_argument("--video", action="append", help="Only export clips of this video (repeatable)")
+    parser.add_argument("--with-video", action="store_true", help="Also export video clips")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    args = parser.parse_args(argv)
+
+    library_index = LibraryIndex(args.base_video_dir, os.path.join(args.cache_dir, "library_index.json"))
+    library_index.load()
+    library_index.reconcile()
+    store = open_clip_store(args.config_dir, backend=args.backend, cache_dir=args.cache_dir)
+    kinds = ('audio', 'video') if args.with_video else ('audio',)
+
+    exported, skipped, errors = export_clips(
+        store, library_index.video_paths(), args.output_dir, video_ids=args.video, kinds=kinds,
+        workers=args.workers, keyframe_dir=os.path.join(args.cache_dir, "keyframes"),
+        on_progress=lambda done, total: print(f"{done}/{total} videos", flush=True))
+    store.close()
+    print(f"Exported {exported} files, skipped {skipped} clips already exported, {len(errors)} errors")
+    for error in errors:
+        print(error)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,216 @@
+import os
+
+from clip_store import make_clip, sort_clips, overlay_ops, overlay_clip
+from clip_dedupe import DEFAULT_TOLERANCE, merge_clips
+
+
+def scan_for_videos(base_dir, extensions=('.mp4',)):
+    """Scan the base directory and subdirectories for video files.
+
+    Returns a basename -> path dictionary. This is a full walk; the player uses
+    the persistent LibraryIndex instead and this stays as the reference scan.
+    """
+    video_paths = {}
+    for root, _, files in os.walk(base_dir):
+        for file in files:
+            if file.endswith(extensions):
+                video_paths[file] = os.path.join(root, file)
+    return video_paths
+
+
+def insertion_row(clips, start):
+    """Return the row at which a clip starting at ``start`` keeps sorted ``clips`` sorted (after equal starts)."""
+    low, high = 0, len(clips)
+    while low < high:
+        middle = (low + high) // 2
+        if start < clips[middle]['positions'][0]:
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+def clip_row(clips, clip):
+    """Return the row of ``clip`` in sorted ``clips`` by bisecting on its start, or None if it is not there."""
+    start = clip['positions'][0]
+    row = insertion_row(clips, start) - 1
+    while row >= 0 and clips[row]['positions'][0] == start:
+        if clips[row]['id'] == clip['id']:
+            return row
+        row -= 1
+    return None
+
+
+class ClipSession:
+    """Clip state of the player without any Qt or VLC objects.
+
+    Holds the clips of the open video (``favorites``), the clips read so far
+    for the all-videos tree (``video_clips``) and an id -> (video id, clip) map
+    of every clip seen, and saves edits through a ClipWriter when one is given,
+    or straight to the store otherwise. The player delegates its clip logic here
+    so it can be scripted and benchmarked headlessly.
+    """
+
+    def __init__(self, clip_store, clip_writer=None):
+        self.clip_store = clip_store
+        self.clip_writer = clip_writer
+        self.video_id = None
+        self.favorites = []
+        self.video_clips = {}  # video id -> clips, filled as videos are expanded in the tree
+        self.clips_by_id = {}  # clip id -> (video id, clip) for every clip read or added
+
+    def remember(self, video_id, clips):
+        for clip in clips:
+            self.clips_by_id[clip['id']] = (video_id, clip)
+        return clips
+
+    def read_store(self, read_function, *args):
+        """Call a store read and return ``(result, ops)``, the writer's operations not yet reflected in it."""
+        if self.clip_writer is None:
+            return read_function(*args), []
+        return self.clip_writer.read(read_function, *args)
+
+    def read_clips(self, video_id):
+        """Read the clips of a video from the clip store, including edits still being written."""
+        clips, ops = self.read_store(self.clip_store.clips_for_video, video_id)
+        return self.remember(video_id, overlay_ops(video_id, clips, ops))
+
+    def load_clips(self, video_id, clips=None):
+        """Make ``video_id`` the open video and return its clips sorted by start time."""
+        if clips is None:
+            clips = self.read_clips(video_id)
+        self.video_id = video_id
+        self.favorites = self.remember(video_id, sort_clips(list(clips)))
+        return self.favorites
+
+    def sort_clips(self):
+        """Sort the favorites list by start time."""
+        sort_clips(self.favorites)
+
+    def write(self, method, *args):
+        """Queue a change on the clip writer, or apply it to the store right away without one."""
+        getattr(self.clip_writer if self.clip_writer is not None else self.clip_store, method)(*args)
+
+    def add_clip(self, start, end):
+        """Add a clip to the open video at its sorted row, save it and return the row."""
+        clip_data = make_clip((start, end))
+        row = insertion_row(self.favorites, clip_data['positions'][0])
+        self.favorites.insert(row, clip_data)
+        tree_clips = self.video_clips.get(self.video_id)
+        if tree_clips is not None:
+            tree_clips.insert(insertion_row(tree_clips, clip_data['positions'][0]), clip_data)
+        self.remember(self.video_id, [clip_data])
+        self.write('add_clips', self.video_id, [clip_data])
+        return row
+
+    def add_clips(self, clips):
+        """Add several clips to the open video with a single store write."""
+        self.favorites.extend(clips)
+        self.sort_clips()
+        self.video_clips.pop(self.video_id, None)  # Re-read for the tree on expand
+        self.remember(self.video_id, clips)
+        self.write('add_clips', self.video_id, clips)
+
+    def find_clip(self, clip_id):
+        """Return ``(video_id, clip)`` for a clip id, or None if no such clip exists."""
+        found = self.clips_by_id.get(clip_id)
+        if found is None:
+            found, ops = self.read_store(self.clip_store.get_clip, clip_id)
+            found = overlay_clip(clip_id, found, ops)
+            if found is not None:
+                self.remember(found[0], [found[1]])
+        return found
+
+    def delete_clip(self, row):
+        """Delete the clip at a row of the open video, save and return it."""
+        clip_data = self.favorites[row]
+        self.delete_clip_by_id(clip_data['id'])
+        return clip_data
+
+    def delete_clip_by_id(self, clip_id):
+        """Delete a clip of any video, touching only its own store record.
+
+        Returns ``(video_id, favorites_row)`` where ``favorites_row`` is the row it
+        had in the open video's clips (None for another video), or None if the
+        clip does not exist.
+        """
+        found = self.find_clip(clip_id)
+        if found is None:
+            return None
+        video_id, clip_data = found
+        favorites_row = clip_row(self.favorites, clip_data) if video_id == self.video_id else None
+        if favorites_row is not None:
+            del self.favorites[favorites_row]
+        tree_clips = self.video_clips.get(video_id)
+        tree_row = clip_row(tree_clips, clip_data) if tree_clips is not None else None
+        if tree_row is not None:
+            del tree_clips[tree_row]
+        del self.clips_by_id[clip_id]
+        self.write('delete_clip', clip_id)
+        return video_id, favorites_row
+
+    def reload_video(self, video_id, clips):
+        """Take over the stored clips of a video that changed outside the player.
+
+        Returns True if they differ from the clips known for it (always for a
+        video not read yet), False if the change was one of our own writes.
+        """
+        clips = sort_clips(list(clips))
+        known = self.favorites if video_id == self.video_id else self.video_clips.get(video_id)
+        if known is not None:
+            if [(c['id'], tuple(c['positions'])) for c in known] == [(c['id'], tuple(c['positions'])) for c in clips]:
+                return False
+            for clip in known:
+                self.clips_by_id.pop(clip['id'], None)
+        self.remember(video_id, clips)
+        if video_id == self.video_id:
+            self.favorites = clips
+        if video_id in self.video_clips:
+            self.video_clips[video_id] = list(clips)
+        return True
+
+    def videos_with_clips(self, video_paths, reset=True):
+        """Return the ids of the videos that have saved clips and whose file exists.
+
+        With ``reset`` the clips read for the tree are dropped so they are re-read on expand.
+        """
+        if reset:
+            self.video_clips = {}
+        video_ids, ops = self.read_store(self.clip_store.video_ids)
+        video_ids = set(video_ids) | {op[1] for op in ops if op[0] in ('add', 'replace') and op[2]}
+        return [name for name in sorted(video_ids) if name in video_paths]
+
+    def dedupe_clips(self, tolerance=DEFAULT_TOLERANCE, merge_overlaps=False):
+        """Drop duplicate clips of the open video, or merge overlapping ones, and save them with one write.
+
+        Returns the ``(dropped clip, id of the clip it went into)`` pairs.
+        """
+        kept, dropped = merge_clips(self.favorites, tolerance, merge_overlaps)
+        if not dropped:
+            return dropped
+        for clip, _ in dropped:
+            self.clips_by_id.pop(clip['id'], None)
+        self.favorites = self.remember(self.video_id, kept)
+        if self.video_id in self.video_clips:
+            self.video_clips[self.video_id] = list(kept)
+        self.write('replace_clips', self.video_id, kept)
+        return dropped
+
+    def preload(self, video_id, clips):
+        """Take over clips read in the background for the tree, unless the video has been read since.
+
+        Returns the clips the tree should show, or None if it already has them.
+        """
+        if video_id in self.video_clips:
+            return None
+        if video_id == self.video_id:
+            clips = self.favorites  # May hold edits not yet written
+        self.video_clips[video_id] = list(clips)
+        self.remember(video_id, self.video_clips[video_id])
+        return self.video_clips[video_id]
+
+    def clips_of(self, video_id):
+        """Return the clips of any video, reading each from the store once."""
+        if video_id not in self.video_clips:
+            self.video_clips[video_id] = self.read_clips(video_id)
+        return self.video_clips[video_id]
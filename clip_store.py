@@ -0,0 +1,663 @@
+import os
+import json
+import uuid
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import tracer
+
+CLIP_DB_NAME = "clips.sqlite3"
+
+
+def new_clip_id():
+    """Return a fresh, globally unique clip id."""
+    return uuid.uuid4().hex
+
+
+def legacy_clip_id(video_id, positions, occurrence=0):
+    """Return a stable id for a clip saved before clips carried ids."""
+    key = f"{video_id}\0{positions[0]!r}\0{positions[1]!r}\0{occurrence}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:32]
+
+
+def make_clip(positions, clip_id=None):
+    """Build a clip dictionary from a (start, end) pair in seconds."""
+    start, end = positions
+    return {'id': clip_id or new_clip_id(), 'positions': (float(start), float(end))}
+
+
+def atomic_write_json(path, data):
+    """Write JSON through a temporary file, fsync and rename so readers never see a partial file."""
+    tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def sort_clips(clips):
+    """Sort clips in place by start time."""
+    clips.sort(key=lambda clip: clip['positions'][0])
+    return clips
+
+
+def overlay_ops(video_id, clips, ops):
+    """Return the clips of a video as read from the store with queued ClipWriter operations applied."""
+    clips = list(clips)
+    for op in ops:
+        if op[0] == 'replace' and op[1] == video_id:
+            clips = list(op[2])
+        elif op[0] == 'add' and op[1] == video_id:
+            new_ids = {clip['id'] for clip in op[2]}
+            clips = [c for c in clips if c['id'] not in new_ids] + list(op[2])
+        elif op[0] == 'update' and op[1] == video_id:
+            clips = list(op[2](sort_clips(clips)))
+        elif op[0] == 'delete':
+            clips = [c for c in clips if c['id'] != op[1]]
+    return sort_clips(clips)
+
+
+def overlay_clip(clip_id, found, ops):
+    """Return ``(video_id, clip)`` for a clip found in the store (or None) with queued operations applied."""
+    for op in ops:
+        if op[0] == 'delete':
+            if op[1] == clip_id:
+                found = None
+            continue
+        if op[0] == 'update':
+            continue  # Only rewrites clips of its video, which a later read shows
+        clip = next((c for c in op[2] if c['id'] == clip_id), None)
+        if clip is not None:
+            found = (op[1], clip)
+        elif op[0] == 'replace' and found is not None and found[0] == op[1]:
+            found = None
+    return found
+
+
+class ClipStore:
+    """Storage backend for the clips of every video.
+
+    Videos are identified by their file basename, clips by a string id.
+    Clips are dictionaries ``{'id': str, 'positions': (start, end)}`` with the
+    positions in seconds.
+    """
+
+    def video_ids(self):
+        """Return the sorted ids of the videos that have saved clips."""
+        raise NotImplementedError
+
+    def clip_counts(self):
+        """Return a dictionary of video id -> number of clips."""
+        raise NotImplementedError
+
+    def clips_for_video(self, video_id):
+        """Return the clips of a video sorted by start time."""
+        raise NotImplementedError
+
+    def get_clip(self, clip_id):
+        """Return ``(video_id, clip)`` for a clip id, or None."""
+        raise NotImplementedError
+
+    def add_clips(self, video_id, clips):
+        """Insert clips for a video in a single transaction."""
+        raise NotImplementedError
+
+    def delete_clip(self, clip_id):
+        """Delete one clip; return True if it existed."""
+        raise NotImplementedError
+
+    def replace_clips(self, video_id, clips):
+        """Replace all clips of a video in a single transaction."""
+        raise NotImplementedError
+
+    def add_clip(self, video_id, clip):
+        self.add_clips(video_id, [clip])
+
+    def apply(self, ops):
+        """Apply a batch of operations.
+
+        Each operation is ``('replace', video_id, clips)``, ``('add', video_id, clips)``,
+        ``('update', video_id, function)`` (replacing the clips with ``function(clips)``)
+        or ``('delete', clip_id)``.
+        """
+        for op in ops:
+            if op[0] == 'replace':
+                self.replace_clips(op[1], op[2])
+            elif op[0] == 'update':
+                self.replace_clips(op[1], op[2](self.clips_for_video(op[1])))
+            elif op[0] == 'add':
+                self.add_clips(op[1], op[2])
+            elif op[0] == 'delete':
+                self.delete_clip(op[1])
+            else:
+                raise ValueError(f"Unknown clip store operation: {op[0]}")
+
+    def close(self):
+        pass
+
+
+class SQLiteClipStore(ClipStore):
+    """Clip store backed by an embedded SQLite database in WAL mode."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS clips (
+        id TEXT PRIMARY KEY,
+        video_id TEXT NOT NULL,
+        start REAL NOT NULL,
+        end REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS clips_video_start ON clips (video_id, start);
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+    """
+
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.db_path = db_path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def _transaction(self, statements):
+        """Run (sql, params) pairs atomically."""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, params in statements:
+                    if isinstance(params, list):
+                        self.conn.executemany(sql, params)
+                    else:
+                        self.conn.execute(sql, params)
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def _query(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def video_ids(self):
+        return [row[0] for row in self._query("SELECT DISTINCT video_id FROM clips ORDER BY video_id")]
+
+    def clip_counts(self):
+        return dict(self._query("SELECT video_id, COUNT(*) FROM clips GROUP BY video_id"))
+
+    def clips_for_video(self, video_id):
+        rows = self._query(
+            "SELECT id, start, end FROM clips WHERE video_id = ? ORDER BY start", (video_id,))
+        return [{'id': clip_id, 'positions': (start, end)} for clip_id, start, end in rows]
+
+    def get_clip(self, clip_id):
+        rows = self._query("SELECT video_id, start, end FROM clips WHERE id = ?", (clip_id,))
+        if not rows:
+            return None
+        video_id, start, end = rows[0]
+        return video_id, {'id': clip_id, 'positions': (start, end)}
+
+    def _insert_params(self, video_id, clips):
+        return [(clip['id'], video_id, clip['positions'][0], clip['positions'][1]) for clip in clips]
+
+    def add_clips(self, video_id, clips):
+        self._transaction([
+            ("INSERT OR REPLACE INTO clips (id, video_id, start, end) VALUES (?, ?, ?, ?)",
+             self._insert_params(video_id, clips)),
+        ])
+
+    def delete_clip(self, clip_id):
+        with self.lock:
+            cursor = self.conn.execute("DELETE FROM clips WHERE id = ?", (clip_id,))
+            return cursor.rowcount > 0
+
+    def replace_clips(self, video_id, clips):
+        self._transaction(self._replace_statements(video_id, clips))
+
+    def _replace_statements(self, video_id, clips):
+        return [
+            ("DELETE FROM clips WHERE video_id = ?", (video_id,)),
+            ("INSERT OR REPLACE INTO clips (id, video_id, start, end) VALUES (?, ?, ?, ?)",
+             self._insert_params(video_id, clips)),
+        ]
+
+    def apply(self, ops):
+        """Apply a batch of operations in a single transaction."""
+        statements = []
+        for i, op in enumerate(ops):
+            if op[0] == 'replace':
+                statements.extend(self._replace_statements(op[1], op[2]))
+            elif op[0] == 'update':
+                # The earlier operations of the batch are not committed yet
+                with self.lock:
+                    clips = overlay_ops(op[1], self.clips_for_video(op[1]), ops[:i])
+                statements.extend(self._replace_statements(op[1], op[2](clips)))
+            elif op[0] == 'add':
+                statements.append(("INSERT OR REPLACE INTO clips (id, video_id, start, end) VALUES (?, ?, ?, ?)",
+                                   self._insert_params(op[1], op[2])))
+            elif op[0] == 'delete':
+                statements.append(("DELETE FROM clips WHERE id = ?", (op[1],)))
+            else:
+                raise ValueError(f"Unknown clip store operation: {op[0]}")
+        if statements:
+            self._transaction(statements)
+
+    def get_meta(self, key, default=None):
+        rows = self._query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0][0] if rows else default
+
+    def set_meta(self, key, value):
+        self._transaction([("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))])
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class JsonClipStore(ClipStore):
+    """Clip store compatible with the original one-JSON-file-per-video layout.
+
+    Each video's clips live in ``config_dir/<video_id>.json`` as a list of
+    ``{'id': ..., 'positions': [start, end]}``. Files written before clips had
+    ids are read with stable, derived ids. Parsed files are cached by their
+    (size, mtime_ns), so reading an unchanged file again costs one stat.
+    """
+
+    def __init__(self, config_dir):
+        self.config_dir = config_dir
+        self.lock = threading.RLock()
+        self.clip_videos = {}  # clip id -> video id, for the videos read so far
+        self.parsed = {}  # video id -> ((size, mtime_ns), clips) of the last parse or write
+
+    def config_path(self, video_id):
+        return os.path.join(self.config_dir, f"{video_id}.json")
+
+    def video_ids(self):
+        try:
+            names = os.listdir(self.config_dir)
+        except OSError:
+            return []
+        return sorted(name[:-5] for name in names if name.endswith('.json') and not name.startswith('.'))
+
+    def clip_counts(self):
+        return {video_id: len(self.clips_for_video(video_id)) for video_id in self.video_ids()}
+
+    def file_stamps(self):
+        """Return video id -> (size, mtime_ns) of every config file, to tell which ones changed."""
+        stamps = {}
+        try:
+            with os.scandir(self.config_dir) as it:
+                for entry in it:
+                    if entry.name.endswith('.json') and not entry.name.startswith('.'):
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        stamps[entry.name[:-5]] = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            pass
+        return stamps
+
+    def read_file(self, file_path, video_id):
+        """Parse one config file into clip dictionaries."""
+        try:
+            with open(file_path, 'r') as f:
+                loaded_clips = json.load(f)
+        except (OSError, ValueError):
+            return []
+        if not isinstance(loaded_clips, list):
+            return []
+
+        clips, seen = [], {}
+        for clip in loaded_clips:
+            if not isinstance(clip, dict) or 'positions' not in clip:
+                continue
+            positions = tuple(clip['positions'])
+            clip_id = clip.get('id')
+            if not clip_id:
+                occurrence = seen.get(positions, 0)
+                seen[positions] = occurrence + 1
+                clip_id = legacy_clip_id(video_id, positions, occurrence)
+            clips.append({'id': clip_id, 'positions': positions})
+        return sort_clips(clips)
+
+    def write_file(self, video_id, clips):
+        """Write the clips of one video to its config file."""
+        os.makedirs(self.config_dir, exist_ok=True)
+        clips_to_save = [{'id': clip['id'], 'positions': list(clip['positions'])} for clip in clips]
+        path = self.config_path(video_id)
+        atomic_write_json(path, clips_to_save)
+        stat = os.stat(path)
+        self.parsed[video_id] = ((stat.st_size, stat.st_mtime_ns),
+                                 [{'id': clip['id'], 'positions': tuple(clip['positions'])} for clip in clips])
+
+    def clips_for_video(self, video_id):
+        path = self.config_path(video_id)
+        try:
+            stat = os.stat(path)
+            stamp = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            stamp = None
+        with self.lock:
+            cached = self.parsed.get(video_id)
+        if stamp is not None and cached is not None and cached[0] == stamp:
+            return list(cached[1])
+
+        # Parse outside the lock so several files can be read at once
+        clips = self.read_file(path, video_id) if stamp is not None else []
+        with self.lock:
+            if stamp is None:
+                self.parsed.pop(video_id, None)
+            else:
+                self.parsed[video_id] = (stamp, clips)
+            for clip in clips:
+                self.clip_videos[clip['id']] = video_id
+        return list(clips)
+
+    def get_clip(self, clip_id):
+        with self.lock:
+            video_ids = [self.clip_videos[clip_id]] if clip_id in self.clip_videos else self.video_ids()
+            for video_id in video_ids:
+                for clip in self.clips_for_video(video_id):
+                    if clip['id'] == clip_id:
+                        return video_id, clip
+            return None
+
+    def add_clips(self, video_id, clips):
+        with self.lock:
+            existing = self.clips_for_video(video_id)
+            new_ids = {clip['id'] for clip in clips}
+            merged = [clip for clip in existing if clip['id'] not in new_ids] + list(clips)
+            self.replace_clips(video_id, merged)
+
+    def delete_clip(self, clip_id):
+        with self.lock:
+            found = self.get_clip(clip_id)
+            if found is None:
+                return False
+            video_id = found[0]
+            self.replace_clips(video_id, [c for c in self.clips_for_video(video_id) if c['id'] != clip_id])
+            self.clip_videos.pop(clip_id, None)
+            return True
+
+    def replace_clips(self, video_id, clips):
+        with self.lock:
+            clips = sort_clips(list(clips))
+            self.write_file(video_id, clips)
+            for clip in clips:
+                self.clip_videos[clip['id']] = video_id
+
+    def apply(self, ops):
+        """Apply a batch of operations, writing each touched file once."""
+        with self.lock:
+            videos = {}  # video id -> clips after the operations so far
+
+            def clips_of(video_id):
+                if video_id not in videos:
+                    videos[video_id] = self.clips_for_video(video_id)
+                return videos[video_id]
+
+            for op in ops:
+                if op[0] == 'replace':
+                    videos[op[1]] = list(op[2])
+                elif op[0] == 'update':
+                    videos[op[1]] = list(op[2](sort_clips(list(clips_of(op[1])))))
+                elif op[0] == 'add':
+                    new_ids = {clip['id'] for clip in op[2]}
+                    videos[op[1]] = [c for c in clips_of(op[1]) if c['id'] not in new_ids] + list(op[2])
+                elif op[0] == 'delete':
+                    video_id = next((v for v, clips in videos.items()
+                                     if any(c['id'] == op[1] for c in clips)), None)
+                    if video_id is None:
+                        video_id = self.clip_videos.get(op[1])
+                    if video_id is None:
+                        found = self.get_clip(op[1])
+                        video_id = found[0] if found else None
+                    if video_id is not None:
+                        videos[video_id] = [c for c in clips_of(video_id) if c['id'] != op[1]]
+                        self.clip_videos.pop(op[1], None)
+                else:
+                    raise ValueError(f"Unknown clip store operation: {op[0]}")
+
+            for video_id, clips in videos.items():
+                self.replace_clips(video_id, clips)
+
+
+class ClipWriter:
+    """Apply clip store changes in a background thread.
+
+    Bursts of changes are coalesced and applied as one batch once no new change
+    has arrived for ``debounce`` seconds, or at most ``max_delay`` seconds after
+    the first one. ``on_written(op_count, latency_ms, error)`` is called from
+    the writer thread after every batch.
+    """
+
+    def __init__(self, store, debounce=0.3, max_delay=2.0, on_written=None):
+        self.store = store
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.on_written = on_written
+        self.condition = threading.Condition()
+        self.pending = []
+        self.in_flight = []  # The batch being written
+        self.first_queued = None
+        self.last_queued = None
+        self.writing = False
+        self.flush_requested = False
+        self.closed = False
+        self.latencies_ms = deque(maxlen=256)  # Time from first queued change to durable write
+        self.write_count = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def replace_clips(self, video_id, clips):
+        self._queue(('replace', video_id, [dict(clip) for clip in clips]))
+
+    def add_clips(self, video_id, clips):
+        self._queue(('add', video_id, [dict(clip) for clip in clips]))
+
+    def delete_clip(self, clip_id):
+        self._queue(('delete', clip_id))
+
+    def update(self, video_id, function):
+        """Replace the clips of a video with ``function(clips)`` of its clips as they are when written.
+
+        Changes queued before it are applied first, so a read-modify-write
+        queued here cannot lose them.
+        """
+        self._queue(('update', video_id, function))
+
+    def _queue(self, op):
+        with self.condition:
+            if op[0] == 'replace':
+                # A full replace supersedes earlier queued changes to the same video
+                self.pending = [p for p in self.pending if p[0] == 'delete' or p[1] != op[1]]
+            self.pending.append(op)
+            now = time.monotonic()
+            if self.first_queued is None:
+                self.first_queued = now
+            self.last_queued = now
+            self.condition.notify_all()
+
+    def has_pending(self):
+        with self.condition:
+            return bool(self.pending) or self.writing
+
+    def read(self, read_function, *args):
+        """Call a store read and return ``(result, ops)``, the operations not yet written when it ran.
+
+        Applying ``ops`` to the result gives the state including queued changes,
+        without waiting for them to be written. The read is repeated if a batch
+        finished writing while it ran, since it may have seen only part of it.
+        """
+        while True:
+            with self.condition:
+                generation = self.write_count
+                ops = self.in_flight + self.pending
+            result = read_function(*args)
+            with self.condition:
+                if self.write_count == generation:
+                    return result, ops
+
+    def stats(self):
+        """Return write count and save latency figures in milliseconds."""
+        with self.condition:
+            latencies = sorted(self.latencies_ms)
+        if not latencies:
+            return {'writes': self.write_count, 'last_ms': 0.0, 'p50_ms': 0.0, 'max_ms': 0.0}
+        return {
+            'writes': self.write_count,
+            'last_ms': self.latencies_ms[-1],
+            'p50_ms': latencies[len(latencies) // 2],
+            'max_ms': latencies[-1],
+        }
+
+    def run(self):
+        while True:
+            with self.condition:
+                while True:
+                    if self.pending:
+                        due = min(self.last_queued + self.debounce, self.first_queued + self.max_delay)
+                        remaining = due - time.monotonic()
+                        if remaining <= 0 or self.flush_requested or self.closed:
+                            break
+                        self.condition.wait(remaining)
+                    elif self.closed:
+                        return
+                    else:
+                        self.flush_requested = False
+                        self.condition.wait()
+                ops, self.pending = self.pending, []
+                self.in_flight = ops
+                first_queued, self.first_queued = self.first_queued, None
+                self.flush_requested = False
+                self.writing = True
+
+            error = None
+            try:
+                with tracer.span("clip_store.apply", ops=len(ops)):
+                    self.store.apply(ops)
+            except Exception as e:
+                error = e
+            latency_ms = (time.monotonic() - first_queued) * 1000
+
+            with self.condition:
+                self.writing = False
+                self.in_flight = []
+                self.write_count += 1
+                self.latencies_ms.append(latency_ms)
+                self.condition.notify_all()
+            if self.on_written:
+                self.on_written(len(ops), latency_ms, error)
+
+    def flush(self, timeout=None):
+        """Write pending changes now and wait until they are durable."""
+        with self.condition:
+            self.flush_requested = True
+            self.condition.notify_all()
+            return self.condition.wait_for(lambda: not self.pending and not self.writing, timeout)
+
+    def close(self, timeout=None):
+        """Flush pending changes and stop the writer thread."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join(timeout)
+
+
+def iter_clips_parallel(store, video_ids, workers=8, clip_writer=None):
+    """Yield ``(video_id, clips)`` for the given videos in order, reading them in a thread pool.
+
+    Each video is yielded as soon as it and every video before it have been
+    read, so callers can fill a sorted view progressively. With a
+    ``clip_writer`` the changes it has not written yet are applied to the clips.
+    """
+    def read(video_id):
+        if clip_writer is None:
+            return store.clips_for_video(video_id)
+        clips, ops = clip_writer.read(store.clips_for_video, video_id)
+        return overlay_ops(video_id, clips, ops)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = [executor.submit(read, video_id) for video_id in video_ids]
+        for video_id, future in zip(video_ids, futures):
+            yield video_id, future.result()
+    finally:
+        # A caller that stops early does not wait for the remaining reads
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def import_json_dir(config_dir, store):
+    """Copy every ``<video>.json`` config file of a directory into a store (or a ClipWriter on one).
+
+    Clips are added, so clips already in the store are kept. Returns the
+    number of clips imported.
+    """
+    source = JsonClipStore(config_dir)
+    count = 0
+    for video_id in source.video_ids():
+        clips = source.clips_for_video(video_id)
+        if clips:
+            store.add_clips(video_id, clips)
+            count += len(clips)
+    return count
+
+
+def ensure_json_imported(config_dir, store, clip_writer=None):
+    """Import the JSON config files into a SQLite store unless that has been done before.
+
+    With a ``clip_writer`` the clips are queued on it, after edits already
+    queued, and written before the import is recorded. Returns the number of
+    clips imported.
+    """
+    if store.get_meta('json_imported'):
+        return 0
+    count = import_json_dir(config_dir, clip_writer or store)
+    if clip_writer is not None:
+        clip_writer.flush()
+    store.set_meta('json_imported', '1')
+    return count
+
+
+def open_clip_store(config_dir, backend='json', cache_dir=None, import_json=True):
+    """Open the clip store of a config directory.
+
+    The SQLite backend keeps its database in ``cache_dir/clips.sqlite3``:
+    the config directory is usually synced, and syncing a live WAL database
+    corrupts it. The JSON config files are imported the first time it is
+    opened, or later with ``ensure_json_imported`` if ``import_json`` is False.
+    """
+    if backend == 'json':
+        return JsonClipStore(config_dir)
+    if backend == 'sqlite':
+        if cache_dir is None:
+            raise ValueError("The SQLite clip store needs a local cache_dir")
+        store = SQLiteClipStore(os.path.join(cache_dir, CLIP_DB_NAME))
+        if import_json:
+            ensure_json_imported(config_dir, store)
+        return store
+    raise ValueError(f"Unknown clip store backend: {backend}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import JSON clip configs into a SQLite clip database.")
+    parser.add_argument("config_dir", help="Directory containing <video>.json config files")
+    parser.add_argument("--db", default=os.path.join(os.getcwd(), "cache", CLIP_DB_NAME),
+                        help="Database path, on a local disk (default: cache/clips.sqlite3)")
+    args = parser.parse_args()
+
+    db_store = SQLiteClipStore(args.db)
+    imported = import_json_dir(args.config_dir, db_store)
+    db_store.set_meta('json_imported', '1')
+    db_store.close()
+    print(f"Imported {imported} clips")
@@ -0,0 +1,71 @@
+import os
+import shutil
+import hashlib
+
+
+def file_identity(path):
+    """Return a short key that changes whenever a file is replaced or modified."""
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}\0{stat.st_size}\0{stat.st_mtime_ns}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+
+
+def touch(path):
+    """Mark a cache entry as recently used."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def entry_size(path):
+    """Return the size in bytes of a cache entry (a file or a directory)."""
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def evict_to_budget(cache_dir, budget_bytes, keep=()):
+    """Delete the least recently used entries of a cache directory until it fits the budget.
+
+    Entries are the direct children of ``cache_dir``; their mtime is the last
+    use (see ``touch``). Entries listed in ``keep`` are never deleted.
+    Returns the number of bytes freed.
+    """
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return 0
+    entries = []
+    for name in names:
+        path = os.path.join(cache_dir, name)
+        try:
+            entries.append((os.path.getmtime(path), path, entry_size(path)))
+        except OSError:
+            continue
+
+    total = sum(size for _, _, size in entries)
+    freed = 0
+    keep = {os.path.abspath(path) for path in keep}
+    for _, path, size in sorted(entries):
+        if total <= budget_bytes:
+            break
+        if os.path.abspath(path) in keep:
+            continue
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+        total -= size
+        freed += size
+    return freed
@@ -0,0 +1,291 @@
+import os
+import json
+import time
+import threading
+import functools
+from collections import deque
+
+TRACE_ENV_VAR = "VIDEOCLIP_TRACE"  # Set to a file path to record a trace of the session
+STARTUP_BUDGET_MS = 1500  # Time to interactive that the startup breakdown warns about
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class Tracer:
+    """Opt-in recorder of timed spans and counters.
+
+    Spans and counter samples are kept in a ring buffer of the last ``capacity``
+    events; every span name also gets a running histogram of its durations, so
+    long sessions keep their statistics while the buffer only holds the tail.
+    ``dump`` writes the buffer as Chrome trace JSON (chrome://tracing, Perfetto).
+    When disabled, ``span`` returns a shared no-op context manager.
+    """
+
+    def __init__(self, capacity=200000):
+        self.enabled = False
+        self.capacity = capacity
+        self.events = deque(maxlen=capacity)
+        self.stats = {}  # span name -> SpanStats
+        self.counters = {}  # counter name -> value
+        self.pending = {}  # key -> (name, start_us, args) of spans finished by another event
+        self.lock = threading.Lock()
+        self.origin_ns = time.perf_counter_ns()
+
+    def enable(self):
+        self.enabled = True
+
+    def now_us(self):
+        return (time.perf_counter_ns() - self.origin_ns) / 1000.0
+
+    def span(self, name, **args):
+        """Return a context manager timing the enclosed block as ``name``."""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, args)
+
+    def record(self, name, start_us, end_us, args=None):
+        """Record a finished span."""
+        duration_us = end_us - start_us
+        with self.lock:
+            self.events.append(('X', name, start_us, duration_us, threading.get_ident(), args))
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = SpanStats()
+            stats.add(duration_us / 1000.0)
+
+    def count(self, name, value=1):
+        """Add ``value`` to a counter and record its new value."""
+        if not self.enabled:
+            return
+        with self.lock:
+            total = self.counters[name] = self.counters.get(name, 0) + value
+            self.events.append(('C', name, self.now_us(), 0, threading.get_ident(), {name: total}))
+
+    def start_async(self, key, name, **args):
+        """Start a span that is finished later, possibly on another thread, by ``finish_async(key)``."""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.pending[key] = (name, self.now_us(), args)
+
+    def finish_async(self, key):
+        """Finish the span started under ``key``; returns its duration in ms, or None if none is pending."""
+        if not self.enabled:
+            return None
+        with self.lock:
+            pending = self.pending.pop(key, None)
+        if pending is None:
+            return None
+        name, start_us, args = pending
+        end_us = self.now_us()
+        self.record(name, start_us, end_us, args)
+        return (end_us - start_us) / 1000.0
+
+    def chrome_trace(self):
+        """Return the buffered events in the Chrome trace event format."""
+        pid = os.getpid()
+        with self.lock:
+            events = list(self.events)
+        trace_events = []
+        for phase, name, ts, dur, tid, args in events:
+            event = {'name': name, 'ph': phase, 'ts': ts, 'pid': pid, 'tid': tid}
+            if phase == 'X':
+                event['dur'] = dur
+            if args:
+                event['args'] = args
+            trace_events.append(event)
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def dump(self, path):
+        """Write the Chrome trace JSON to ``path``."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+
+    def summary(self):
+        """Return a table of span durations and counters."""
+        with self.lock:
+            stats = sorted(self.stats.items(), key=lambda item: -item[1].total_ms)
+            counters = sorted(self.counters.items())
+        buckets = " ".join(f"<{b}" for b in HISTOGRAM_BUCKETS_MS) + " more"
+        lines = [f"{'span':<28} {'count':>7} {'total ms':>10} {'mean':>8} {'p50':>8} {'p95':>8} {'max':>8}  ms histogram: {buckets}"]
+        for name, s in stats:
+            lines.append(f"{name:<28} {s.count:>7} {s.total_ms:>10.1f} {s.total_ms / s.count:>8.2f} "
+                         f"{s.percentile(50):>8.2f} {s.percentile(95):>8.2f} {s.max_ms:>8.2f}  "
+                         f"{' '.join(str(n) for n in s.histogram)}")
+        for name, value in counters:
+            lines.append(f"{name:<28} {value:>7}")
+        return "\n".join(lines)
+
+
+class SpanStats:
+    """Running count, total, maximum and histogram of one span's durations."""
+
+    def __init__(self, recent=1024):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.histogram = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        self.recent = deque(maxlen=recent)  # Latest durations, for percentiles
+
+    def add(self, duration_ms):
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.recent.append(duration_ms)
+        for i, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+            if duration_ms < bound:
+                self.histogram[i] += 1
+                return
+        self.histogram[-1] += 1
+
+    def percentile(self, p):
+        values = sorted(self.recent)
+        return values[min(len(values) - 1, len(values) * p // 100)] if values else 0.0
+
+
+class Span:
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start_us = self.tracer.now_us()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer.record(self.name, self.start_us, self.tracer.now_us(), self.args)
+        return False
+
+
+class NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class StartupTimer:
+    """Start and end times of the startup stages, measured from when this module was imported.
+
+    Stages may overlap (VLC and the library index load in background threads
+    while the window paints), so each one is reported with its own start and
+    duration rather than as a slice of a sequence. Stages are also recorded as
+    tracer spans when tracing is enabled.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.stages = {}  # stage name -> (start ms, end ms)
+        self.lock = threading.Lock()
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.origin) * 1000.0
+
+    def mark(self, name):
+        """Record a stage that ends now and started with the process, e.g. the first paint."""
+        self.add(name, 0.0, self.elapsed_ms())
+
+    def stage(self, name):
+        """Return a context manager recording the enclosed block as stage ``name``."""
+        return StartupStage(self, name)
+
+    def add(self, name, start_ms, end_ms):
+        with self.lock:
+            self.stages.setdefault(name, (start_ms, end_ms))
+        if tracer.enabled:
+            origin_us = (self.origin * 1e9 - tracer.origin_ns) / 1000.0
+            tracer.record(f"startup.{name}", origin_us + start_ms * 1000.0, origin_us + end_ms * 1000.0)
+
+    def done(self, *names):
+        with self.lock:
+            return all(name in self.stages for name in names)
+
+    def breakdown(self, interactive_ms=None, budget_ms=STARTUP_BUDGET_MS):
+        """Return a table of the stages so far, ordered by when they ended."""
+        with self.lock:
+            stages = sorted(self.stages.items(), key=lambda item: item[1][1])
+        lines = [f"{'startup stage':<16} {'start ms':>9} {'took ms':>9} {'done at':>9}"]
+        for name, (start_ms, end_ms) in stages:
+            lines.append(f"{name:<16} {start_ms:>9.0f} {end_ms - start_ms:>9.0f} {end_ms:>9.0f}")
+        if interactive_ms is not None:
+            verdict = "within" if interactive_ms <= budget_ms else "OVER"
+            lines.append(f"time to interactive: {interactive_ms:.0f} ms ({verdict} the {budget_ms} ms budget)")
+        return "\n".join(lines)
+
+
+class StartupStage:
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start_ms = self.timer.elapsed_ms()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timer.add(self.name, self.start_ms, self.timer.elapsed_ms())
+        return False
+
+
+class CpuMeter:
+    """Process CPU time per state (e.g. video or audio mode), as a share of the wall time spent in it.
+
+    ``sample`` is called periodically with the current state. CPU time of every
+    thread counts, so decoding done inside libvlc is included. Gaps between
+    samples longer than ``max_gap`` seconds (the sampling stopped, e.g. while
+    paused) are not charged to any state.
+    """
+
+    def __init__(self, max_gap=1.0):
+        self.max_gap = max_gap
+        self.totals = {}  # state -> [cpu seconds, wall seconds]
+        self.last = None  # (state, cpu, wall) of the previous sample
+
+    def sample(self, state):
+        """Charge the time since the previous sample to the state it was in; a state of None is not timed."""
+        cpu, wall = time.process_time(), time.perf_counter()
+        if self.last is not None:
+            previous, last_cpu, last_wall = self.last
+            if previous is not None and wall - last_wall <= self.max_gap:
+                totals = self.totals.setdefault(previous, [0.0, 0.0])
+                totals[0] += cpu - last_cpu
+                totals[1] += wall - last_wall
+                tracer.count(f"cpu_ms.{previous}", round((cpu - last_cpu) * 1000))
+        self.last = (state, cpu, wall)
+
+    def percent(self, state):
+        """Return the CPU use in a state in percent of one core, or None if it was never timed."""
+        cpu, wall = self.totals.get(state, (0.0, 0.0))
+        return 100.0 * cpu / wall if wall > 0 else None
+
+    def report(self):
+        """Return e.g. "CPU: video 38%, audio 6%" for the states timed so far."""
+        parts = [f"{state} {self.percent(state):.0f}%" for state in sorted(self.totals) if self.percent(state) is not None]
+        return "CPU: " + ", ".join(parts) if parts else ""
+
+
+# The process-wide tracer; disabled unless enable() is called
+tracer = Tracer()
+
+# Startup stages of the player, timed from the first import of this module
+startup = StartupTimer()
+
+
+def traced(name=None):
+    """Decorate a function so every call is recorded as a span when tracing is enabled."""
+    def decorator(function):
+        span_name = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            with Span(tracer, span_name, None):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import numpy as np
+
+from disk_cache import file_identity
+
+
+def probe_keyframes(video_path):
+    """Return the keyframe times of a video's first video stream as a sorted int32 array of ms.
+
+    Nothing is decoded, but ffprobe reads every packet, so this is one full
+    read of the file: cheap on a local disk, a full transfer on a network share.
+    """
+    process = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "v:0",
+         "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", video_path],
+        capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"ffprobe failed to read {video_path}: {process.stderr.strip()}")
+    times = []
+    for line in process.stdout.splitlines():
+        pts_time, _, flags = line.partition(',')
+        if 'K' in flags:
+            try:
+                times.append(float(pts_time))
+            except ValueError:
+                continue  # N/A
+    return np.unique(np.round(np.array(times, dtype=np.float64) * 1000)).astype(np.int32)
+
+
+def keyframe_before(keyframes, time_ms):
+    """Return the last keyframe at or before ``time_ms``, or None if there is none."""
+    i = int(np.searchsorted(keyframes, time_ms, side='right')) - 1
+    return int(keyframes[i]) if i >= 0 else None
+
+
+def nearest_keyframe(keyframes, time_ms):
+    """Return the keyframe nearest to ``time_ms``, or None for an empty index."""
+    i = int(np.searchsorted(keyframes, time_ms))
+    candidates = [int(keyframes[j]) for j in (i - 1, i) if 0 <= j < len(keyframes)]
+    return min(candidates, key=lambda k: abs(k - time_ms)) if candidates else None
+
+
+class KeyframeCache:
+    """On-disk cache of keyframe time arrays keyed by file identity."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def path_for(self, video_path):
+        return os.path.join(self.cache_dir, f"{file_identity(video_path)}.npy")
+
+    def load(self, video_path):
+        try:
+            return np.load(self.path_for(video_path))
+        except (OSError, ValueError):
+            return None
+
+    def save(self, video_path, keyframes):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path_for(video_path)
+        tmp_path = f"{path}.tmp.npy"
+        np.save(tmp_path, keyframes)
+        os.replace(tmp_path, path)
+        return keyframes
+
+    def build(self, video_path):
+        return self.save(video_path, probe_keyframes(video_path))
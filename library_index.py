@@ -0,0 +1,157 @@
+import os
+import json
+
+
+class LibraryIndex:
+    """Persistent index of the video files found under a base directory.
+
+    The index remembers, for every directory, its mtime and the video files and
+    subdirectories it contained. Reconciling against the disk only re-lists the
+    directories whose mtime changed, so a warm scan costs one stat per directory.
+    """
+
+    VERSION = 1
+
+    def __init__(self, base_dir, index_path, extensions=('.mp4',)):
+        self.base_dir = os.path.abspath(base_dir)
+        self.index_path = index_path
+        self.extensions = tuple(extensions)
+        self.dirs = {}  # dir path -> {'mtime_ns': int, 'videos': [names], 'subdirs': [names]}
+
+    def load(self):
+        """Load the index from disk and return the basename -> path dictionary."""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = None
+
+        if (isinstance(data, dict) and data.get('version') == self.VERSION
+                and data.get('root') == self.base_dir and isinstance(data.get('dirs'), dict)):
+            self.dirs = data['dirs']
+        else:
+            self.dirs = {}
+        return self.video_paths()
+
+    def save(self):
+        """Write the index atomically so a crash never leaves a truncated file."""
+        os.makedirs(os.path.dirname(self.index_path) or '.', exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.VERSION, 'root': self.base_dir, 'dirs': self.dirs}, f)
+        os.replace(tmp_path, self.index_path)
+
+    def video_paths(self):
+        """Return the basename -> path dictionary described by the index."""
+        video_paths = {}
+        for dir_path in sorted(self.dirs):
+            for name in self.dirs[dir_path]['videos']:
+                video_paths[name] = os.path.join(dir_path, name)
+        return video_paths
+
+    def _list_dir(self, dir_path):
+        """List a directory, returning its video files and subdirectories."""
+        videos, subdirs = [], []
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        elif entry.name.endswith(self.extensions):
+                            videos.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        return sorted(videos), sorted(subdirs)
+
+    def refresh_dir(self, dir_path, recursive=True):
+        """Reconcile one directory (and, by default, its subtree) against the disk.
+
+        Returns ``(added, removed)`` where ``added`` maps basenames to paths and
+        ``removed`` lists the paths that disappeared.
+        """
+        added, removed = {}, []
+        self._walk(os.path.abspath(dir_path), added, removed, recursive=recursive)
+        return added, removed
+
+    def reconcile(self, on_batch=None, batch_size=200):
+        """Walk the library, re-listing only directories whose mtime changed.
+
+        ``on_batch(added, removed)`` is called every ``batch_size`` changes and
+        once more at the end, so callers can stream results into the UI.
+        Returns the total ``(added, removed)`` and saves the index.
+        """
+        all_added, all_removed = {}, []
+        pending_added, pending_removed = {}, []
+
+        def flush():
+            if on_batch and (pending_added or pending_removed):
+                on_batch(dict(pending_added), list(pending_removed))
+            all_added.update(pending_added)
+            all_removed.extend(pending_removed)
+            pending_added.clear()
+            del pending_removed[:]
+
+        visited = set()
+        stack = [self.base_dir]
+        while stack:
+            dir_path = stack.pop()
+            visited.add(dir_path)
+            entry = self._walk(dir_path, pending_added, pending_removed, recursive=False)
+            if entry is not None:
+                stack.extend(os.path.join(dir_path, name) for name in reversed(entry['subdirs']))
+            if len(pending_added) + len(pending_removed) >= batch_size:
+                flush()
+
+        # Directories that were not reached any more have been deleted or moved
+        for dir_path in [d for d in self.dirs if d not in visited]:
+            pending_removed.extend(os.path.join(dir_path, name) for name in self.dirs.pop(dir_path)['videos'])
+        flush()
+
+        self.save()
+        return all_added, all_removed
+
+    def _walk(self, dir_path, added, removed, recursive=True):
+        """Update the index entry of one directory, collecting changes into added/removed."""
+        cached = self.dirs.get(dir_path)
+        try:
+            mtime_ns = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+
+        if mtime_ns is None:
+            entry = None
+        elif cached is not None and cached['mtime_ns'] == mtime_ns:
+            entry = cached
+        else:
+            listing = self._list_dir(dir_path)
+            entry = None if listing is None else {
+                'mtime_ns': mtime_ns, 'videos': listing[0], 'subdirs': listing[1]}
+
+        old_videos = set(cached['videos']) if cached else set()
+        if entry is None:
+            self._drop_subtree(dir_path, removed)
+            return None
+
+        if entry is not cached:
+            self.dirs[dir_path] = entry
+            new_videos = set(entry['videos'])
+            for name in sorted(new_videos - old_videos):
+                added[name] = os.path.join(dir_path, name)
+            removed.extend(os.path.join(dir_path, name) for name in sorted(old_videos - new_videos))
+            # Subdirectories that vanished take their whole subtree with them
+            for name in set(cached['subdirs'] if cached else ()) - set(entry['subdirs']):
+                self._drop_subtree(os.path.join(dir_path, name), removed)
+
+        if recursive:
+            for name in entry['subdirs']:
+                self._walk(os.path.join(dir_path, name), added, removed, recursive=True)
+        return entry
+
+    def _drop_subtree(self, dir_path, removed):
+        """Forget a directory and everything below it."""
+        prefix = dir_path + os.sep
+        for path in [d for d in self.dirs if d == dir_path or d.startswith(prefix)]:
+            removed.extend(os.path.join(path, name) for name in self.dirs.pop(path)['videos'])
@@ -1,19 +1,66 @@
 import sys
 import os
-import json
-import vlc
+import time
+import threading
+from instrumentation import tracer, traced, startup, CpuMeter, TRACE_ENV_VAR
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QListWidget,
     QFileDialog, QLabel, QSlider, QHBoxLayout, QToolTip, QInputDialog, QMenu,
-    QStyle, QComboBox, QTreeWidget, QTreeWidgetItem  # Add this import
+    QStyle, QComboBox, QTreeView, QStackedLayout, QStyleOptionSlider, QStylePainter,
+    QDialog, QLineEdit, QListView
 )
-from PyQt5.QtCore import Qt, QTimer, QEvent
-from PyQt5.QtGui import QMouseEvent
+from PyQt5.QtCore import Qt, QTimer, QEvent, QObject, pyqtSignal, QAbstractItemModel, QAbstractListModel, QModelIndex, QLineF, QFileSystemWatcher
+from PyQt5.QtGui import QMouseEvent, QColor
 import platform
+import bisect
+from library_index import LibraryIndex
+from clip_store import open_clip_store, ensure_json_imported, make_clip, ClipWriter, iter_clips_parallel
+from clip_session import ClipSession, insertion_row
+from media_cache import MediaCache
+from clip_export import export_clips
+from subtitles import SubtitleLibrary, SubtitleSearchIndex
+from audio_sidecar import AudioSidecarCache
+from media_profile import MediaProfileStore, choose_profile
+from playlist import Playlist, build_playlist
+from clip_dedupe import DEFAULT_TOLERANCE, dedupe_library, merge_clips
+
+CLIP_ID_ROLE = Qt.UserRole  # Tree/list item data: the clip's id
+CLIP_POSITIONS_ROLE = Qt.UserRole + 1  # Tree/list item data: the clip's (start, end) at full precision
+SEEK_SETTLED_MS = 500  # A reported time this close to a seek target counts as the seek's first frame
+LEAD_IN_TIMEOUT_MS = 1000  # A clip start still muted after this long (no time events) is unmuted anyway
+PLAYLIST_LOOKAHEAD = 3  # Playlist items whose media and clips are opened ahead of time
+PLAYLIST_TRANSITION_BUDGET_MS = 300  # Slower hops from one playlist clip to the next are reported
+PLAYLIST_RECENT_DAYS = 7
+PLAYLIST_SAMPLE_SIZE = 50
+
+def create_vlc_players():
+    """Load libvlc and create an instance with a main and a standby player; runs in a worker thread."""
+    with startup.stage("vlc_init"):
+        import vlc
+
+        instance = vlc.Instance()
+        players = [instance.media_player_new() for _ in range(2)]
+
+        # Disable VLC's handling of mouse and key inputs
+        for player in players:
+            player.video_set_mouse_input(False)
+            player.video_set_key_input(False)
+    return instance, players
+
+def import_audio_modules():
+    """Import the numpy based audio modules in a worker thread, so their first use does not pay for it."""
+    import waveform
+    import vad
 
 class VideoPlayerApp(QWidget):
-    def __init__(self, debug=False, debug_video_path=None, config_dir=None, base_video_dir=None):
+    def __init__(self, debug=False, debug_video_path=None, config_dir=None, base_video_dir=None, cache_dir=None, clip_backend="json", media_cache_size=8, trace_path=None):
         super().__init__()
+
+        # Opt-in instrumentation, dumped as a Chrome trace on exit
+        self.trace_path = trace_path or os.environ.get(TRACE_ENV_VAR)
+        if self.trace_path:
+            tracer.enable()
+        self.seek_targets = {}  # player -> time (ms) of a seek whose first frame has not shown yet
         self.setWindowTitle("English Listening Practice")
 
         # Get the screen size
@@ -31,7 +78,6 @@ class VideoPlayerApp(QWidget):
         # Initialize variables
         self.video_path = None
         self.is_playing = False
-        self.favorites = []
         self.current_clip_start = None
         self.current_clip_end = None
         self.main_video_position = 0  # Store the last position of the main video
@@ -40,6 +86,7 @@ class VideoPlayerApp(QWidget):
 
         # Initialize mode
         self.audio_mode = False  # Start in video mode
+        self.cpu_meter = CpuMeter()  # CPU use while playing in video and in audio mode
 
         # Initialize dark mode
         self.dark_mode = True  # Start in dark mode
@@ -48,16 +95,23 @@ class VideoPlayerApp(QWidget):
         # Initialize playback speed
         self.playback_speed = 1.0  # Default speed is 1x
 
-        # Create VLC instance and media player
-        self.instance = vlc.Instance()
-        self.media_player = self.instance.media_player_new()
-
-        # Disable VLC's handling of mouse and key inputs
-        self.media_player.video_set_mouse_input(False)
-        self.media_player.video_set_key_input(False)
-        
-        # Initialize a dictionary to store video clips
-        self.video_clips = {}
+        # Start VLC in the background; the players are bound to the window when it is ready,
+        # or as soon as something uses them. A second, hidden player is pre-rolled at the
+        # start of the next clip.
+        self.vlc_instance = None
+        self.active_player = None
+        self.standby = None
+        self.standby_clip = None  # (video_path, start, end) the standby player is prepared for
+        self.standby_ready = False
+        self.vlc_task = BackgroundTask(create_vlc_players, (), self)
+        self.vlc_task.finished.connect(self.on_vlc_created)
+        self.vlc_task.start()
+
+        # Forward libvlc playback events to the UI thread
+        self.player_signals = PlayerEventSignals(self)
+        self.player_signals.time_changed.connect(self.on_player_time_changed)
+        self.player_signals.end_reached.connect(self.on_player_end_reached)
+        self.player_signals.playing.connect(self.on_player_playing)
 
         # Define the base video directory
         self.base_video_dir = base_video_dir
@@ -72,7 +126,18 @@ class VideoPlayerApp(QWidget):
         self.timer = QTimer(self)
         self.timer.setInterval(200)  # Adjust the interval as needed
         self.timer.timeout.connect(self.update_position)
-        self.timer.timeout.connect(self.check_loop_position)
+
+        # One-shot timer that fires exactly when the current clip should end
+        self.clip_end_timer = QTimer(self)
+        self.clip_end_timer.setSingleShot(True)
+        self.clip_end_timer.setTimerType(Qt.PreciseTimer)
+        self.clip_end_timer.timeout.connect(self.check_loop_position)
+
+        # A clip start shown from its keyframe first: (start ms, accurate seek issued), muted until it lands
+        self.lead_in = None
+        self.lead_in_timer = QTimer(self)
+        self.lead_in_timer.setSingleShot(True)
+        self.lead_in_timer.timeout.connect(self.cancel_lead_in)  # Never stay muted without time events
 
         # Set the config path
         if config_dir:
@@ -80,25 +145,370 @@ class VideoPlayerApp(QWidget):
         else:
             self.config_dir = os.path.join(os.getcwd(), "config")
 
-        # Load a specific video if debug flag is set
-        if debug and debug_video_path:
-            self.load_video(video_path=debug_video_path)
+        # Set the cache path for machine-local data such as the library index
+        if cache_dir:
+            self.cache_dir = cache_dir
+        else:
+            self.cache_dir = os.path.join(os.getcwd(), "cache")
+
+        # Open the clip store ("json" keeps one file per video, "sqlite" a single indexed database in the
+        # local cache; its first import of the JSON configs runs after the window shows)
+        self.clip_store = open_clip_store(self.config_dir, backend=clip_backend, cache_dir=self.cache_dir,
+                                          import_json=False)
+
+        # Write clip changes in the background, coalescing bursts of edits into one write
+        self.clip_write_signals = ClipWriteSignals(self)
+        self.clip_write_signals.written.connect(self.on_clips_written)
+        self.clip_writer = ClipWriter(self.clip_store, on_written=self.clip_write_signals.written.emit)
+
+        # Clips of the current video and of the tree, kept apart from the UI
+        self.clip_session = ClipSession(self.clip_store, self.clip_writer)
+
+        # Waveform overviews drawn behind the position slider, and the speech intervals
+        # that S/E snap clip boundaries to; both caches are opened on first use
+        self.waveform_cache = None
+        self.speech_cache = None
+        self.speech_intervals = None
+
+        # Keyframe times of the current video, for seeks that show a frame at once
+        self.keyframe_cache = None
+        self.keyframes = None
+        self.scrub_target = None  # Keyframe the slider drag last sought to
+
+        # Probed properties of each video, choosing the libvlc options it is opened with
+        self.media_profiles = MediaProfileStore(os.path.join(self.cache_dir, "media_profiles.json"))
+        self.profile_jobs = set()  # Video paths being probed
+
+        # Local audio-only copies played instead of the video files while the video is not shown
+        self.audio_sidecars = AudioSidecarCache(os.path.join(self.cache_dir, "audio"))
+        self.sidecar_queue = []  # Video paths waiting for their sidecar, built one at a time
+        self.sidecar_building = None
+        self.media_paths = {}  # player -> file its media was opened from (a video or its sidecar)
+
+        # Practice playlist of clips from many videos, played back to back
+        self.playlist = None
+        self.transition = None  # (started, first ms, last ms) of a playlist hop waiting for its first frame
+        self.audio_analysis_jobs = set()  # Video paths whose audio is being analyzed
+
+        # Sidecar subtitles: parsed lazily per video, and indexed for library-wide search
+        self.subtitle_library = SubtitleLibrary()
+        self.subtitle_track = None
+        self.subtitle_index = SubtitleSearchIndex(os.path.join(self.cache_dir, "subtitles.sqlite3"))
+        self.background_tasks = set()
+
+        # Keep recently used and upcoming videos parsed, together with their clip lists
+        self.media_cache = MediaCache(lambda: self.instance, self.clip_session.read_clips, capacity=media_cache_size,
+                                      media_options=self.media_options)
+
+        self.video_paths = {}
+        self.tree_loaded = False  # Whether the all-videos tree has been listed (it is kept current after that)
+        self.config_load_worker = None
+        self.config_load_generation = 0  # Bumped on every listing so batches of an older one are dropped
+
+        # Everything else waits until the window has been painted once
+        self.startup_options = (debug and debug_video_path, clip_backend)
+        self.first_painted = False
+        self.first_frame_shown = False
+        self.startup_reported = False
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.first_painted:
+            self.first_painted = True
+            startup.mark("first_paint")
+            QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        """Run the startup work that does not need to happen before the window first shows."""
+        debug_video_path, clip_backend = self.startup_options
 
         # Install an event filter to capture key events globally
         QApplication.instance().installEventFilter(self)
 
-        self.video_paths = self.scan_for_videos(base_video_dir)
+        # Load the library index and reconcile it with the disk in the background
+        self.start_library_scan()
+
+        # Watch the video and config directories so downloads and synced edits show up live
+        self.start_watching(clip_backend)
+
+        if clip_backend == "sqlite":
+            self.run_in_background(ensure_json_imported, self.config_dir, self.clip_store, self.clip_writer,
+                                   on_done=self.on_json_imported)
+
+        self.run_in_background(import_audio_modules)
+
+        # Load a specific video if debug flag is set
+        if debug_video_path:
+            self.load_video(video_path=debug_video_path)
+        self.report_startup()
+
+    def on_json_imported(self, count, error):
+        """Show the clips of the JSON configs once they have been imported into a new SQLite store."""
+        if error is not None:
+            self.feedback_label.setText(f"Could not import the clip configs: {error}")
+            return
+        if not count:
+            return
+        self.media_cache.clear()  # Holds the clip lists read before the import
+        if self.video_path:
+            self.load_clips_from_file()
+        if self.tree_loaded:
+            self.load_config_files()
+        self.feedback_label.setText(f"Imported {count} clips from the clip configs.")
+
+    def report_startup(self):
+        """Print the startup breakdown once the window is painted, VLC is up and the library is listed."""
+        if self.startup_reported or not startup.done("first_paint", "vlc_init"):
+            return
+        if self.base_video_dir and not startup.done("library_index"):
+            return
+        self.startup_reported = True
+        print(startup.breakdown(interactive_ms=startup.elapsed_ms()))
+
+    @property
+    def instance(self):
+        """The vlc.Instance, waiting for the background start if it has not finished."""
+        self.ensure_vlc()
+        return self.vlc_instance
+
+    @property
+    def media_player(self):
+        """The player shown in the window."""
+        if self.active_player is None:
+            self.ensure_vlc()
+        return self.active_player
+
+    @media_player.setter
+    def media_player(self, player):
+        self.active_player = player
+
+    @property
+    def standby_player(self):
+        """The hidden player pre-rolled at the start of the next clip."""
+        if self.standby is None:
+            self.ensure_vlc()
+        return self.standby
+
+    @standby_player.setter
+    def standby_player(self, player):
+        self.standby = player
+
+    def ensure_vlc(self):
+        """Make the VLC players usable now, waiting for the background start if needed."""
+        if self.vlc_instance is None:
+            with tracer.span("vlc_init.wait"):
+                result, error = self.vlc_task.wait()
+            self.on_vlc_created(result, error)
+            if error is not None:
+                raise error
+
+    def on_vlc_created(self, result, error):
+        """Bind the players created in the background to the video surfaces and listen to their events."""
+        if self.vlc_instance is not None:
+            return  # Already set up by ensure_vlc
+        if error is not None:
+            self.feedback_label.setText(f"Could not start VLC: {error}")
+            return
+        self.vlc_instance, players = result
+        self.active_player, self.standby = players
+        for i, player in enumerate(players):
+            self.bind_video_output(player, self.video_stack.widget(i))
+            self.attach_player_events(player)
+        self.report_startup()
+
+    def start_library_scan(self):
+        """Load the persisted library index and reconcile it with the disk in the background."""
+        if not self.base_video_dir:
+            return
+        index_path = os.path.join(self.cache_dir, "library_index.json")
+        self.library_index = LibraryIndex(self.base_video_dir, index_path)
+
+        self.library_scan_worker = LibraryScanWorker(self.library_index, self)
+        self.library_scan_worker.loaded.connect(self.on_library_index_loaded)
+        self.library_scan_worker.videos_found.connect(self.on_videos_found)
+        self.library_scan_worker.videos_removed.connect(self.on_videos_removed)
+        self.library_scan_worker.finished.connect(self.on_library_scan_finished)
+        self.library_scan_worker.start()
+
+    def on_library_index_loaded(self, video_paths):
+        """Take over the videos of the persisted index, before the disk has been checked."""
+        self.on_videos_found(video_paths)
+        self.report_startup()
+
+    def on_videos_found(self, added):
+        """Merge a batch of newly discovered videos into the library."""
+        self.video_paths.update(added)
+        if self.tree_loaded:
+            # Videos with saved clips appear in the tree as soon as their file does
+            video_ids = set(self.clip_session.videos_with_clips(added, reset=False))
+            for video_name in sorted(video_ids):
+                self.video_clips_model.add_video(video_name)
+
+    def on_videos_removed(self, removed):
+        """Drop videos that no longer exist on disk from the library."""
+        for path in removed:
+            video_name = os.path.basename(path)
+            if self.video_paths.get(video_name) == path:
+                del self.video_paths[video_name]
+                self.video_clips_model.remove_video(video_name)
+
+    def on_library_scan_finished(self, added_count, removed_count):
+        if added_count or removed_count:
+            self.feedback_label.setText(f"Library updated: {added_count} added, {removed_count} removed")
+
+        # Watch every directory of the library from now on
+        self.library_watcher.watch_dirs(list(self.library_index.dirs))
+
+        # Bring the subtitle search index up to date with the library
+        self.run_in_background(self.subtitle_index.update, dict(self.video_paths))
+
+    def start_watching(self, clip_backend):
+        """Watch the library directories and (for JSON clips) the config directory."""
+        self.library_watcher = LibraryWatcher(self)
+        self.library_watcher.video_dirs_changed.connect(self.on_video_dirs_changed)
+        self.library_watcher.config_dir_changed.connect(self.on_config_dir_changed)
+        self.video_refresh_running = False
+        self.pending_video_dirs = set()
+        self.config_refresh_running = False
+        self.config_refresh_pending = False
+        self.config_stamps = {}
+        if clip_backend == "json":
+            # Synced config edits arrive as file changes; the SQLite database is only written by us
+            self.run_in_background(self.clip_store.file_stamps, on_done=self.on_config_stamps_taken)
+
+    def on_config_stamps_taken(self, stamps, error):
+        """Start watching the config directory once the state to compare against is known."""
+        self.config_stamps = stamps or {}
+        self.library_watcher.watch_config_dir(self.config_dir)
+
+    def on_video_dirs_changed(self, dir_paths):
+        """Re-list a batch of changed video directories in the background, one batch at a time."""
+        self.pending_video_dirs.update(dir_paths)
+        if self.video_refresh_running or not hasattr(self, 'library_index'):
+            return
+        dir_paths, self.pending_video_dirs = sorted(self.pending_video_dirs), set()
+        self.video_refresh_running = True
+        self.run_in_background(self.refresh_video_dirs, dir_paths, on_done=self.on_video_dirs_refreshed)
+
+    def refresh_video_dirs(self, dir_paths):
+        """Reconcile changed directories with the library index; runs in a worker thread."""
+        added, removed = {}, []
+        for dir_path in dir_paths:
+            dir_added, dir_removed = self.library_index.refresh_dir(dir_path)
+            added.update(dir_added)
+            removed.extend(dir_removed)
+        self.library_index.save()
+        return added, removed, list(self.library_index.dirs)
+
+    def on_video_dirs_refreshed(self, result, error):
+        self.video_refresh_running = False
+        if error is None:
+            added, removed, dir_paths = result
+            if removed:
+                self.on_videos_removed(removed)
+            if added:
+                self.on_videos_found(added)
+            self.library_watcher.watch_dirs(dir_paths)  # New subdirectories
+            if added or removed:
+                self.feedback_label.setText(f"Library updated: {len(added)} added, {len(removed)} removed")
+        if self.pending_video_dirs:
+            self.on_video_dirs_changed([])
+
+    def on_config_dir_changed(self):
+        """Find the config files changed outside the player and read them in the background."""
+        if self.config_refresh_running:
+            self.config_refresh_pending = True
+            return
+        self.config_refresh_running = True
+        self.run_in_background(self.read_changed_configs, dict(self.config_stamps),
+                               on_done=self.on_changed_configs_read)
+
+    def read_changed_configs(self, old_stamps):
+        """Return the new stamps and video id -> clips of every added, changed or removed config file."""
+        if self.clip_writer.has_pending():
+            self.clip_writer.flush()  # Let our own edits land first so they are not mistaken for remote ones
+        stamps = self.clip_store.file_stamps()
+        changed = {video_id: self.clip_store.clips_for_video(video_id)
+                   for video_id, stamp in stamps.items() if old_stamps.get(video_id) != stamp}
+        changed.update((video_id, []) for video_id in old_stamps if video_id not in stamps)
+        return stamps, changed
+
+    def on_changed_configs_read(self, result, error):
+        self.config_refresh_running = False
+        if self.clip_writer.has_pending():
+            # Edits made since the files were read would look like remote changes; read again once written
+            QTimer.singleShot(LibraryWatcher.BATCH_DELAY_MS, self.on_config_dir_changed)
+            return
+        if error is None:
+            self.config_stamps, changed = result
+            for video_id, clips in sorted(changed.items()):
+                if self.clip_session.reload_video(video_id, clips):
+                    self.apply_external_clips(video_id)
+        if self.config_refresh_pending:
+            self.config_refresh_pending = False
+            self.on_config_dir_changed()
+
+    def apply_external_clips(self, video_id, clips=None):
+        """Show the clips of a video after its config file changed on disk (or were cleaned up)."""
+        if self.video_path and video_id == os.path.basename(self.video_path):
+            clips = self.favorites
+            self.favorites_model.set_clips(clips)
+            self.feedback_label.setText("Clips updated from disk.")
+        else:
+            clips = self.clip_session.video_clips.get(video_id, clips)
+            if clips is None:
+                clips = self.clip_session.read_clips(video_id)
+        if video_id in self.video_paths:
+            self.media_cache.update_clips(self.video_paths[video_id], clips)
+        if self.tree_loaded:
+            if clips and video_id in self.video_paths:
+                self.video_clips_model.add_video(video_id)
+                self.video_clips_model.set_clips(video_id, clips)
+            else:
+                self.video_clips_model.remove_video(video_id)
+
+    def attach_player_events(self, player):
+        """Emit player_signals from libvlc's event thread for a media player."""
+        import vlc
+
+        event_manager = player.event_manager()
+        event_manager.event_attach(
+            vlc.EventType.MediaPlayerTimeChanged,
+            lambda event: self.on_libvlc_time_changed(player, event.u.new_time))
+        event_manager.event_attach(
+            vlc.EventType.MediaPlayerEndReached,
+            lambda event: self.player_signals.end_reached.emit(player))
+        event_manager.event_attach(
+            vlc.EventType.MediaPlayerPlaying,
+            lambda event: self.player_signals.playing.emit(player))
+
+    def on_libvlc_time_changed(self, player, new_time):
+        """Runs on libvlc's event thread: finish a traced seek once the player reports its target, then forward."""
+        target = self.seek_targets.get(player)
+        if target is not None and abs(new_time - target) <= SEEK_SETTLED_MS:
+            self.seek_targets.pop(player, None)
+            tracer.finish_async(("seek", id(player)))
+        self.player_signals.time_changed.emit(player, new_time)
+
+    def bind_video_output(self, player, widget):
+        """Render a media player into a native video widget."""
+        if sys.platform == "win32":  # for Windows
+            player.set_hwnd(widget.winId())
+        elif sys.platform == "darwin":  # for MacOS
+            player.set_nsobject(int(widget.winId()))
+        elif sys.platform.startswith('linux'):  # for Linux using the X Server
+            player.set_xwindow(widget.winId())
+        widget.media_player = player
+
+    @property
+    def favorites(self):
+        """Clips of the current video, kept by the clip session."""
+        return self.clip_session.favorites
 
-    def scan_for_videos(self, base_dir):
-        """Scan the base directory and subdirectories for .mp4 files."""
-        video_paths = {}
-        for root, _, files in os.walk(base_dir):
-            for file in files:
-                if file.endswith('.mp4'):
-                    video_name = file
-                    video_path = os.path.join(root, file)
-                    video_paths[video_name] = video_path
-        return video_paths
+    @property
+    def video_clips(self):
+        """Clips read so far for the all-videos tree, kept by the clip session."""
+        return self.clip_session.video_clips
 
     def create_widgets(self):
         # Main layout
@@ -106,15 +516,14 @@ class VideoPlayerApp(QWidget):
 
         # Video display area
         video_layout = QVBoxLayout()
-        self.video_widget = ClickableVideoWidget(self)  # Use the custom video widget
+        self.video_widget = QWidget(self)
+        self.video_stack = QStackedLayout(self.video_widget)
 
-        # Set the video output to the video widget
-        if sys.platform == "win32":  # for Windows
-            self.media_player.set_hwnd(self.video_widget.winId())
-        elif sys.platform == "darwin":  # for MacOS
-            self.media_player.set_nsobject(int(self.video_widget.winId()))
-        elif sys.platform.startswith('linux'):  # for Linux using the X Server
-            self.media_player.set_xwindow(self.video_widget.winId())
+        # One native surface per player; swapping players just raises the other surface.
+        # The players are bound to them once VLC has started.
+        for _ in range(2):
+            surface = ClickableVideoWidget(self.video_widget)  # Use the custom video widget
+            self.video_stack.addWidget(surface)
 
         video_layout.addWidget(self.video_widget, stretch=1)  # Allow video to expand
 
@@ -126,6 +535,7 @@ class VideoPlayerApp(QWidget):
         self.position_slider.setRange(0, 0)
         self.position_slider.sliderMoved.connect(self.set_position)
         self.position_slider.sliderPressed.connect(self.slider_clicked)  # Connect slider click
+        self.position_slider.sliderReleased.connect(self.slider_released)
         self.position_slider.setToolTip("0:00")  # Initial tooltip
         self.position_slider.setMouseTracking(True)
         self.position_slider.installEventFilter(self)
@@ -139,6 +549,12 @@ class VideoPlayerApp(QWidget):
         # Add progress layout to video layout
         video_layout.addLayout(progress_layout)
 
+        # Current subtitle line
+        self.subtitle_label = QLabel("")
+        self.subtitle_label.setAlignment(Qt.AlignCenter)
+        self.subtitle_label.setWordWrap(True)
+        video_layout.addWidget(self.subtitle_label)
+
         # Add video layout to main layout
         main_layout.addLayout(video_layout, 7)  # 7/8 of the width
 
@@ -198,14 +614,19 @@ class VideoPlayerApp(QWidget):
         control_layout.addWidget(self.feedback_label)
 
         # Video Clips Tree
-        self.video_clips_tree = CustomTreeWidget()
-        self.video_clips_tree.setHeaderLabels(["Video"])
-        self.video_clips_tree.itemClicked.connect(self.on_clip_selected)  # Connect item click event
+        self.video_clips_model = VideoClipsModel(self.load_video_clips, self)
+        self.video_clips_tree = CustomTreeView()
+        self.video_clips_tree.setModel(self.video_clips_model)
+        self.video_clips_tree.setUniformRowHeights(True)  # Keep scrolling O(visible rows)
+        self.video_clips_tree.clicked.connect(self.on_clip_selected)  # Connect item click event
         self.video_clips_tree.hide()  # Initially hide the tree
         control_layout.addWidget(self.video_clips_tree)
 
         # Favorites
-        self.favorites_list = CustomListWidget(self)  # Use the custom list widget
+        self.favorites_model = ClipListModel(self)
+        self.favorites_list = CustomListView(self)  # Use the custom list view
+        self.favorites_list.setModel(self.favorites_model)
+        self.favorites_list.setUniformItemSizes(True)  # Keep layout O(visible rows)
         control_layout.addWidget(self.favorites_list)
 
         self.play_favorite_button = QPushButton("Play Favorite")
@@ -217,6 +638,31 @@ class VideoPlayerApp(QWidget):
         self.delete_clip_button.clicked.connect(self.delete_clip)
         control_layout.addWidget(self.delete_clip_button)
 
+        # Clip All Lines Button
+        self.clip_all_lines_button = QPushButton("Clip All Lines")
+        self.clip_all_lines_button.clicked.connect(self.clip_all_lines)
+        control_layout.addWidget(self.clip_all_lines_button)
+
+        # Search Subtitles Button
+        self.search_subtitles_button = QPushButton("Search Subtitles")
+        self.search_subtitles_button.clicked.connect(self.search_subtitles)
+        control_layout.addWidget(self.search_subtitles_button)
+
+        # Clean Up Clips Button
+        self.dedupe_button = QPushButton("Clean Up Clips")
+        self.dedupe_button.clicked.connect(self.dedupe_clips)
+        control_layout.addWidget(self.dedupe_button)
+
+        # Practice Playlist Button
+        self.playlist_button = QPushButton("Practice Playlist")
+        self.playlist_button.clicked.connect(self.toggle_playlist)
+        control_layout.addWidget(self.playlist_button)
+
+        # Export Clips Button
+        self.export_button = QPushButton("Export Clips")
+        self.export_button.clicked.connect(self.export_clips)
+        control_layout.addWidget(self.export_button)
+
         # Return to Main Video Button
         self.return_button = QPushButton("Return to Main Video")
         self.return_button.clicked.connect(self.return_to_main_video)
@@ -254,21 +700,93 @@ class VideoPlayerApp(QWidget):
         else:
             self.play_video()
 
+    @traced("timer_tick")
     def update_position(self):
+        self.cpu_meter.sample(self.cpu_state())
         current_time = self.media_player.get_time()
         total_time = self.media_player.get_length()
         if total_time > 0:
             self.position_slider.setRange(0, total_time)
-            self.position_slider.setValue(current_time)
+            if not self.position_slider.isSliderDown():  # Leave the handle under the mouse while scrubbing
+                self.position_slider.setValue(current_time)
             current_time_str = self.format_time(current_time)
             total_time_str = self.format_time(total_time)
             self.duration_label.setText(f"{current_time_str} / {total_time_str}")
+            if self.subtitle_track is not None:
+                subtitle_text = self.subtitle_track.text_at(current_time / 1000.0)
+                if subtitle_text != self.subtitle_label.text():
+                    self.subtitle_label.setText(subtitle_text)
         else:
             self.position_slider.setValue(0)
             self.duration_label.setText("0:00 / 0:00")
 
+    @traced()
     def set_position(self, position):
-        self.media_player.set_time(int(position))
+        self.cancel_lead_in()  # The user's seek replaces a clip start still being sought
+        if self.position_slider.isSliderDown() and self.keyframes is not None and len(self.keyframes):
+            # Scrubbing: jump between keyframes, which show at once, and seek accurately on release
+            from keyframes import nearest_keyframe
+            target = nearest_keyframe(self.keyframes, position)
+            if target != self.scrub_target:
+                self.scrub_target = target
+                tracer.count("seeks.keyframe")
+                self.seek(target)
+            return
+        self.seek(position)
+        self.schedule_clip_end(int(position))
+
+    def slider_released(self):
+        """Finish a keyframe scrub with an accurate seek to where the handle was let go."""
+        if self.scrub_target is not None:
+            self.scrub_target = None
+            self.set_position(self.position_slider.value())
+
+    def seek_clip_start(self, start_ms):
+        """Seek the active player to a clip start and return the position playback resumes from.
+
+        With a keyframe index the player first jumps to the keyframe before the
+        start, so a frame shows at once, and seeks accurately to the start as
+        soon as that frame is up (see on_lead_in_time). It stays muted until then.
+        """
+        self.cancel_lead_in()
+        keyframe = self.keyframe_before(start_ms)
+        if keyframe is None or start_ms - keyframe <= SEEK_SETTLED_MS:
+            self.seek(start_ms)
+            return start_ms
+        tracer.count("seeks.keyframe")
+        self.lead_in = (start_ms, False)
+        self.media_player.audio_set_mute(True)
+        self.lead_in_timer.start(LEAD_IN_TIMEOUT_MS)
+        self.seek(keyframe)
+        return start_ms
+
+    def on_lead_in_time(self, new_time):
+        """Follow the keyframe frame of a clip start with the accurate seek, and unmute once it lands."""
+        start_ms, sought = self.lead_in
+        if new_time >= start_ms - SEEK_SETTLED_MS:
+            self.cancel_lead_in()
+        elif not sought:
+            self.lead_in = (start_ms, True)
+            self.seek(start_ms)
+
+    def cancel_lead_in(self):
+        """Drop a pending clip start seek and restore the sound."""
+        self.lead_in_timer.stop()
+        if self.lead_in is not None:
+            self.lead_in = None
+            self.media_player.audio_set_mute(False)
+
+    def seek(self, time_ms, player=None):
+        """Seek a player (the active one by default), tracing the time until a frame at the new position shows."""
+        player = player or self.media_player
+        if tracer.enabled:
+            tracer.count("seeks")
+            self.seek_targets[player] = int(time_ms)
+            tracer.start_async(("seek", id(player)), "seek_to_frame", target_ms=int(time_ms))
+            with tracer.span("set_time"):
+                player.set_time(int(time_ms))
+        else:
+            player.set_time(int(time_ms))
 
     def format_time(self, ms):
         seconds = int(ms / 1000)
@@ -278,22 +796,25 @@ class VideoPlayerApp(QWidget):
 
     def eventFilter(self, source, event):
         if source is self.position_slider and event.type() == event.MouseMove:
-            pos = event.pos().x()
-            value = self.position_slider.minimum() + (self.position_slider.maximum() - self.position_slider.minimum()) * pos / self.position_slider.width()
-            tooltip_time = self.format_time(int(value))
-            QToolTip.showText(event.globalPos(), tooltip_time, self.position_slider)
-        # Check if the event is a key press event
-        elif event.type() == QEvent.KeyPress:
-            # Handle left and right arrow keys globally
-            if event.key() in [Qt.Key_Right, Qt.Key_K, Qt.Key_F]:
-                self.skip(3)  # Fine-tuned seeking
-                return True  # Event handled
-            elif event.key() in [Qt.Key_Left, Qt.Key_J, Qt.Key_D]:
-                self.skip(-3)  # Fine-tuned seeking
-                return True  # Event handled
+            with tracer.span("eventFilter.slider_hover"):
+                pos = event.pos().x()
+                value = self.position_slider.minimum() + (self.position_slider.maximum() - self.position_slider.minimum()) * pos / self.position_slider.width()
+                tooltip_time = self.format_time(int(value))
+                QToolTip.showText(event.globalPos(), tooltip_time, self.position_slider)
+        # Check if the event is a key press event, leaving text input alone
+        elif event.type() == QEvent.KeyPress and not isinstance(source, QLineEdit):
+            with tracer.span("eventFilter.key"):
+                # Handle left and right arrow keys globally
+                if event.key() in [Qt.Key_Right, Qt.Key_K, Qt.Key_F]:
+                    self.skip(3)  # Fine-tuned seeking
+                    return True  # Event handled
+                elif event.key() in [Qt.Key_Left, Qt.Key_J, Qt.Key_D]:
+                    self.skip(-3)  # Fine-tuned seeking
+                    return True  # Event handled
         return super().eventFilter(source, event)
 
-    def load_video(self, video_path=None):
+    @traced()
+    def load_video(self, video_path=None, autoplay=True):
         if video_path and os.path.exists(video_path):
             self.video_path = video_path
         else:
@@ -303,9 +824,14 @@ class VideoPlayerApp(QWidget):
                 self, "Open Video File", "", "Video Files (*.mp4 *.avi)", options=options)
 
         if self.video_path and os.path.exists(self.video_path):
-            # Create VLC media and set it to the player
-            media = self.instance.media_new(self.video_path)
-            self.media_player.set_media(media)
+            # Take the parsed VLC media and clip list from the cache and set it to the player,
+            # keeping a standby player that was pre-rolled on this video (a playlist's next clip)
+            self.cancel_lead_in()
+            if not self.standby_clip or self.standby_clip[0] != self.video_path:
+                self.reset_standby()
+            clips = self.set_player_media(self.media_player, self.video_path)
+            if self.audio_mode:
+                self.request_sidecar(self.video_path)
 
             # Update the paths for loading and saving clips
             self.update_clip_paths()
@@ -318,149 +844,348 @@ class VideoPlayerApp(QWidget):
             self.save_clip_button.setEnabled(True)
             self.feedback_label.setText(f"Loaded video: {os.path.basename(self.video_path)}")
 
+            # Show the waveform overview and find speech, decoding the audio in the background the first time
+            self.load_audio_analysis()
+            self.load_keyframes()
+
+            # Parse the sidecar subtitles off the UI thread
+            self.load_subtitles()
+
             # Load saved clip positions
-            self.load_clips_from_file()
+            self.load_clips_from_file(clips)
 
             # Automatically play the video after loading
-            self.play_video()
+            if autoplay:
+                self.play_video()
 
             # Set focus to the main window to prevent spacebar from triggering the button again
             self.setFocus()
         else:
             self.feedback_label.setText("Video file not found.")
 
+    def run_in_background(self, function, *args, on_done=None):
+        """Run ``function(*args)`` in a worker thread and call ``on_done(result, error)`` on the UI thread."""
+        task = BackgroundTask(function, args, self)
+        self.background_tasks.add(task)
+
+        def finished(result, error):
+            self.background_tasks.discard(task)
+            if on_done:
+                on_done(result, error)
+
+        task.finished.connect(finished)
+        task.start()
+
+    def load_subtitles(self):
+        """Load the sidecar subtitles of the current video in the background."""
+        video_path = self.video_path
+        self.subtitle_track = None
+        self.subtitle_label.setText("")
+        self.run_in_background(
+            self.subtitle_library.track, video_path,
+            on_done=lambda track, error: self.on_subtitles_loaded(video_path, track))
+
+    def on_subtitles_loaded(self, video_path, track):
+        if track is not None and len(track) and video_path == self.video_path:
+            self.subtitle_track = track
+
+    def search_subtitles(self):
+        """Open the library-wide subtitle search."""
+        dialog = SubtitleSearchDialog(self)
+        dialog.show()
+
+    def play_subtitle_hit(self, hit):
+        """Play the cue of a subtitle search hit as a clip."""
+        video_id, start, end, _ = hit
+        video_path = self.video_paths.get(video_id)
+        if not video_path:
+            self.feedback_label.setText("Video file not found!")
+            return
+        if self.video_path != video_path:
+            self.load_video(video_path=video_path)
+        self.play_clip(start, end)
+
+    def save_subtitle_hit_as_clip(self, hit):
+        """Save the cue of a subtitle search hit as a clip of its video."""
+        video_id, start, end, _ = hit
+        if self.video_path and os.path.basename(self.video_path) == video_id:
+            self.add_clip(start, end)
+        else:
+            clips = self.clip_session.read_clips(video_id) + [make_clip((start, end))]
+            self.clip_writer.replace_clips(video_id, clips)
+            self.video_clips.pop(video_id, None)
+            if video_id in self.video_paths:
+                self.media_cache.update_clips(self.video_paths[video_id], clips)
+        self.feedback_label.setText(f"Saved clip {start:.2f}s - {end:.2f}s of {video_id}")
+
+    def load_audio_analysis(self):
+        """Use the cached waveform and speech intervals of the current video, computing missing ones in the background."""
+        video_path = self.video_path
+        self.open_audio_caches()
+        waveform = self.waveform_cache.load(video_path)
+        self.speech_intervals = self.speech_cache.load(video_path)
+        self.position_slider.set_waveform(waveform)
+        if (waveform is None or self.speech_intervals is None) and video_path not in self.audio_analysis_jobs:
+            self.audio_analysis_jobs.add(video_path)
+            self.run_in_background(
+                self.analyze_audio, video_path, waveform is None, self.speech_intervals is None,
+                on_done=lambda result, error: self.on_audio_analyzed(video_path, result, error))
+
+    def open_audio_caches(self):
+        """Create the waveform and speech caches, importing numpy on first use rather than at startup."""
+        if self.waveform_cache is None:
+            from waveform import WaveformCache
+            from vad import SpeechCache
+
+            self.waveform_cache = WaveformCache(os.path.join(self.cache_dir, "waveforms"))
+            self.speech_cache = SpeechCache(os.path.join(self.cache_dir, "speech"))
+
+    def load_keyframes(self):
+        """Use the cached keyframe index of the current video, building it in the background if missing."""
+        from keyframes import KeyframeCache
+
+        if self.keyframe_cache is None:
+            self.keyframe_cache = KeyframeCache(os.path.join(self.cache_dir, "keyframes"))
+        video_path = self.video_path
+        self.keyframes = self.keyframe_cache.load(video_path)
+        if self.keyframes is None:
+            self.run_in_background(
+                self.build_keyframes, video_path,
+                on_done=lambda keyframes, error: self.on_keyframes_built(video_path, keyframes))
+
+    def build_keyframes(self, video_path):
+        """Build a video's keyframe index, unless it sits on slow storage.
+
+        Listing the keyframes reads the whole file once, which on a network share
+        costs more than the faster seeks save.
+        """
+        from media_profile import SLOW_STORAGE_MS, storage_latency_ms
+
+        properties = self.media_profiles.get(video_path)
+        latency_ms = properties['latency_ms'] if properties else storage_latency_ms(video_path)
+        if latency_ms > SLOW_STORAGE_MS:
+            return None
+        return self.keyframe_cache.build(video_path)
+
+    def on_keyframes_built(self, video_path, keyframes):
+        # Without ffprobe, or on slow storage, every seek stays an accurate one
+        if keyframes is not None and video_path == self.video_path:
+            self.keyframes = keyframes
+
+    def keyframe_before(self, time_ms):
+        """Return the keyframe of the current video at or before ``time_ms``, or None without an index."""
+        if self.keyframes is None or not len(self.keyframes) or self.media_paths.get(self.media_player) != self.video_path:
+            return None  # No index, or playing the audio sidecar, which seeks fast anyway
+        from keyframes import keyframe_before
+        return keyframe_before(self.keyframes, time_ms)
+
+    def analyze_audio(self, video_path, need_waveform, need_speech):
+        """Decode a video's audio once, feeding both the waveform and the speech detector."""
+        from audio_decode import iter_audio_chunks
+        from waveform import PeakAccumulator
+        from vad import SpeechDetector
+
+        peaks = PeakAccumulator() if need_waveform else None
+        detector = SpeechDetector() if need_speech else None
+        for chunk in iter_audio_chunks(video_path):
+            if peaks is not None:
+                peaks.add(chunk)
+            if detector is not None:
+                detector.add(chunk)
+        waveform = self.waveform_cache.save(video_path, peaks.peaks()) if peaks is not None else None
+        intervals = self.speech_cache.save(video_path, detector.intervals()) if detector is not None else None
+        return waveform, intervals
+
+    def on_audio_analyzed(self, video_path, result, error):
+        self.audio_analysis_jobs.discard(video_path)
+        # Without ffmpeg or an audio track the slider stays bare and S/E do not snap
+        if error is not None or video_path != self.video_path:
+            return
+        waveform, intervals = result
+        if waveform is not None:
+            self.position_slider.set_waveform(waveform)
+        if intervals is not None:
+            self.speech_intervals = intervals
+
     def update_clip_paths(self):
         os.makedirs(self.config_dir, exist_ok=True)
         self.config_file = os.path.join(self.config_dir, f"{os.path.basename(self.video_path)}.json")
+        self.library_watcher.watch_config_file(os.path.abspath(self.config_file))
 
     def play_video(self):
         if self.video_path:
             try:
                 if not self.media_player.get_media():
-                    media = self.instance.media_new(self.video_path)
-                    self.media_player.set_media(media)
+                    self.set_player_media(self.media_player, self.video_path)
                 self.media_player.play()
                 self.is_playing = True
                 self.timer.start()
+                self.schedule_clip_end()
                 self.feedback_label.setText("Playing video")
             except Exception as e:
                 self.feedback_label.setText(f"Error playing video: {e}")
 
     def pause_video(self):
         if self.is_playing:
+            self.cancel_lead_in()
             self.media_player.pause()
             self.is_playing = False
+            self.timer.stop()  # Nothing moves while paused
+            self.clip_end_timer.stop()
             self.feedback_label.setText("Video paused")
 
+    @traced()
     def skip(self, seconds):
         if self.media_player.get_length() > 0:
             current_time = self.media_player.get_time()
             new_time = current_time + seconds * 1000  # milliseconds
             new_time = max(0, min(new_time, self.media_player.get_length()))
-            self.media_player.set_time(int(new_time))
+            self.cancel_lead_in()
+            self.seek(new_time)
+            self.schedule_clip_end(int(new_time))
             direction = "forward" if seconds > 0 else "backward"
             self.feedback_label.setText(f"Skipped {direction} {abs(seconds)} seconds")
 
     def start_clip(self):
         if self.media_player.get_length() > 0:
-            self.current_clip_start = max(0, self.media_player.get_time() / 1000.0 - 0.5) # seconds
-            self.feedback_label.setText("Clip start point set.")
+            current_time = self.media_player.get_time() / 1000.0  # seconds
+            self.current_clip_start = max(0, current_time - 0.5)
+
+            # Prefer the start of the subtitle line, then the speech onset. The line is looked up at the
+            # raw time, so it is the one on screen when S was pressed (0.5 s earlier can still be the
+            # previous line); the speech onset is searched around the reaction-adjusted start.
+            snapped = self.subtitle_track.snap_start(current_time) if self.subtitle_track is not None else None
+            if snapped is not None:
+                self.current_clip_start = snapped
+                self.feedback_label.setText("Clip start point set at subtitle line.")
+                return
+            if self.speech_intervals is not None:
+                from vad import snap_start
+                snapped = snap_start(self.speech_intervals, self.current_clip_start)
+            if snapped is not None:
+                self.current_clip_start = snapped
+                self.feedback_label.setText("Clip start point set at speech onset.")
+            else:
+                self.feedback_label.setText("Clip start point set.")
 
     def save_clip(self):
         if self.current_clip_start is not None:
             self.current_clip_end = self.media_player.get_time() / 1000.0  # seconds
-            if self.current_clip_end > self.current_clip_start:
-                clip_data = {
-                    'positions': (self.current_clip_start, self.current_clip_end),
-                }
-                self.favorites.append(clip_data)
-
-                # Sort clips after adding a new one
-                self.sort_clips()
-
-                # Update the favorites list widget
-                self.update_favorites_list()
-
-                # Save to JSON file
-                self.save_clips_to_file()
-
-                # Find the index of the newly added clip
-                new_clip_index = self.favorites.index(clip_data)
-
-                if not self.single_video_mode:
-                    # Update the video clips tree
-                    self.update_video_clips_tree()
-
-                    # Select the newly added clip in the video clips tree
-                    self.select_clip_in_tree(new_clip_index)
-                else:
-                    # Select the newly added clip in the favorites list
-                    self.favorites_list.setCurrentRow(new_clip_index)
 
+            # Prefer the end of the subtitle line, then the speech offset
+            snapped = self.subtitle_track.snap_end(self.current_clip_end) if self.subtitle_track is not None else None
+            if snapped is None and self.speech_intervals is not None:
+                from vad import snap_end
+                snapped = snap_end(self.speech_intervals, self.current_clip_end)
+            if snapped is not None and snapped > self.current_clip_start:
+                self.current_clip_end = snapped
+            if self.current_clip_end > self.current_clip_start:
+                self.add_clip(self.current_clip_start, self.current_clip_end)
                 self.feedback_label.setText("Clip positions saved!")
             else:
                 self.feedback_label.setText("Invalid clip duration.")
         else:
             self.feedback_label.setText("Set the clip start point first.")
 
+    def add_clip(self, start, end):
+        """Add a clip to the current video, save it and select it."""
+        new_clip_index = self.clip_session.add_clip(start, end)
+        self.favorites_model.insert_clip(new_clip_index, self.favorites[new_clip_index])
+        self.media_cache.update_clips(self.video_path, self.favorites)
+
+        if not self.single_video_mode:
+            # Add the row to the video clips tree
+            tree_row = self.video_clips_model.insert_clip(
+                os.path.basename(self.video_path), self.favorites[new_clip_index])
+
+            # Select the newly added clip in the video clips tree
+            self.select_clip_in_tree(new_clip_index if tree_row is None else tree_row)
+        else:
+            # Select the newly added clip in the favorites list
+            self.favorites_list.setCurrentRow(new_clip_index)
+
+    def clip_current_line(self):
+        """Save the subtitle line being shown (or the last one before now) as a clip."""
+        if self.subtitle_track is None:
+            self.feedback_label.setText("No subtitles for this video.")
+            return
+        line = self.subtitle_track.line_at(self.media_player.get_time() / 1000.0)
+        if line is None:
+            self.feedback_label.setText("No subtitle line here.")
+            return
+        self.add_clip(*line)
+        self.feedback_label.setText(f"Clipped line {line[0]:.2f}s - {line[1]:.2f}s")
+
+    def clip_all_lines(self):
+        """Turn every subtitle line of the current video into a clip with a single store write."""
+        if self.subtitle_track is None:
+            self.feedback_label.setText("No subtitles for this video.")
+            return
+        existing = {tuple(clip['positions']) for clip in self.favorites}
+        new_clips = [make_clip(line) for line in self.subtitle_track.lines() if line not in existing]
+        if not new_clips:
+            self.feedback_label.setText("Every subtitle line is already a clip.")
+            return
+
+        self.clip_session.add_clips(new_clips)
+        self.clips_changed()
+        if not self.single_video_mode:
+            self.update_video_clips_tree()
+        self.feedback_label.setText(f"Added {len(new_clips)} clips from subtitle lines")
+
     def select_clip_in_tree(self, clip_index):
         """Select the newly added clip in the video clips tree."""
         video_name = os.path.basename(self.video_path)
-        for i in range(self.video_clips_tree.topLevelItemCount()):
-            video_item = self.video_clips_tree.topLevelItem(i)
-            if video_item.text(0) == video_name:
-                clip_item = video_item.child(clip_index)
-                if clip_item:
-                    self.video_clips_tree.setCurrentItem(clip_item)
-                break
+        clip_index = self.video_clips_model.clip_index(video_name, clip_index)
+        if clip_index.isValid():
+            self.video_clips_tree.setCurrentIndex(clip_index)
 
+    @traced()
     def update_video_clips_tree(self):
         """Update the video clips tree with the current clips for the loaded video."""
         video_name = os.path.basename(self.video_path)
-        for i in range(self.video_clips_tree.topLevelItemCount()):
-            video_item = self.video_clips_tree.topLevelItem(i)
-            if video_item.text(0) == video_name:
-                # Clear existing clips
-                video_item.takeChildren()
-                # Add updated clips
-                for clip in self.favorites:
-                    start, end = clip['positions']
-                    clip_item = QTreeWidgetItem(video_item, [f"Clip: {start:.2f}s - {end:.2f}s"])
-                    video_item.addChild(clip_item)
-                break
-
-    def sort_clips(self):
-        """Sort the favorites list by start time."""
-        self.favorites.sort(key=lambda clip: clip['positions'][0])
+        self.video_clips[video_name] = list(self.favorites)
+        self.video_clips_model.set_clips(video_name, self.favorites)
 
-    def save_clips_to_file(self):
-        if self.video_path:
-            # Use the updated config_file path
-            clips_to_save = [{'positions': clip['positions']} for clip in self.favorites]
+    def clips_changed(self):
+        """Refresh the clip cache and the favorites list after the current video's clips changed."""
+        self.media_cache.update_clips(self.video_path, self.favorites)
 
-            with open(self.config_file, 'w') as f:
-                json.dump(clips_to_save, f)
+        # Update the favorites list widget
+        self.update_favorites_list()
 
-            # Update the favorites list widget
-            self.update_favorites_list()
-            self.feedback_label.setText("Clip positions saved to file.")
-
-    def load_clips_from_file(self):
+    def on_clips_written(self, op_count, latency_ms, error):
+        """Report the outcome of a background clip write."""
+        if error:
+            self.feedback_label.setText(f"Error saving clips: {error}")
+        else:
+            self.feedback_label.setText(f"Clip positions saved to file ({latency_ms:.0f} ms).")
+
+    def closeEvent(self, event):
+        # Make sure no clip edits are lost on exit
+        self.clip_writer.close()
+        self.clip_store.close()
+        self.subtitle_index.close()
+        if self.trace_path:
+            tracer.dump(self.trace_path)
+            print(tracer.summary())
+            cache = self.media_cache.stats()
+            print(f"media cache: {cache['hits']} hits, {cache['misses']} misses ({cache['hit_rate']:.0%} hit rate), "
+                  f"{cache['prefetches']} prefetches, {cache['size']}/{cache['capacity']} entries")
+            writes = self.clip_writer.stats()
+            print(f"clip writes: {writes['writes']} batches, save latency last {writes['last_ms']:.0f} ms, "
+                  f"p50 {writes['p50_ms']:.0f} ms, max {writes['max_ms']:.0f} ms")
+            print(f"Trace written to {self.trace_path}")
+        super().closeEvent(event)
+
+    def load_clips_from_file(self, clips=None):
         if self.video_path:
-            self.favorites = []
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    loaded_clips = json.load(f)
-
-                if isinstance(loaded_clips, list) and all(isinstance(clip, dict) for clip in loaded_clips):
-                    self.favorites = loaded_clips
-
+            # Read (if not given) and sort the clips of the video
+            self.clip_session.load_clips(os.path.basename(self.video_path), clips)
+            if self.favorites:
                 self.feedback_label.setText("Clip positions loaded from file.")
             else:
                 self.feedback_label.setText("No saved clip positions found.")
-            
-            # Sort clips after loading
-            self.sort_clips()
 
             # Update the favorites list widget
             self.update_favorites_list()
@@ -484,30 +1209,244 @@ class VideoPlayerApp(QWidget):
         else:
             self.feedback_label.setText("No clip selected.")
 
-    def check_loop_position(self):
-        current_position = self.media_player.get_time()
+    @traced()
+    def check_loop_position(self, current_position=None):
+        if current_position is None:
+            current_position = self.media_player.get_time()
         if self.current_clip_end is not None:  # Ensure current_clip_end is set
             if current_position >= int(self.current_clip_end * 1000):  # Convert to milliseconds
                 if self.loop_enabled:
                     # Apply an additional 200ms buffer when looping
                     adjusted_start = max(0, self.current_clip_start * 1000 - 100)
-                    self.media_player.set_time(int(adjusted_start))
+                    resume_from = self.seek_clip_start(adjusted_start)
                     self.media_player.play()
+                    self.schedule_clip_end(int(resume_from))
+                elif self.playlist is not None:
+                    self.play_playlist_item(1)  # Back to back
                 else:
                     self.media_player.pause()
                     self.is_playing = False  # Update the is_playing flag
+                    self.timer.stop()
                     self.feedback_label.setText("Clip playback finished.")
                     self.current_clip_end = None
+            else:
+                # Woke up early (e.g. the decoder stalled), wait for the remaining time
+                self.schedule_clip_end(current_position)
+
+    def schedule_clip_end(self, current_position=None):
+        """Arm the one-shot clip end timer from the remaining clip time and playback speed."""
+        if self.current_clip_end is None or not self.is_playing:
+            self.clip_end_timer.stop()
+            return
+        if current_position is None:
+            current_position = self.media_player.get_time()
+        remaining = int(self.current_clip_end * 1000) - current_position
+        self.clip_end_timer.start(max(0, int(remaining / self.playback_speed)))
+
+    def on_player_time_changed(self, player, new_time):
+        """Handle libvlc's MediaPlayerTimeChanged: stop or loop at the clip end, else re-arm the timer."""
+        if not self.first_frame_shown and player is self.media_player:
+            self.first_frame_shown = True
+            startup.mark("first_frame")
+            print(f"first frame: {startup.elapsed_ms():.0f} ms after start")
+        if self.lead_in is not None and player is self.media_player:
+            self.on_lead_in_time(new_time)
+        if self.transition is not None and player is self.media_player:
+            self.on_transition_time(new_time)
+        if player is self.standby_player:
+            self.on_standby_time_changed(new_time)
+            return
+        if player is not self.media_player or self.current_clip_end is None:
+            return
+        if new_time >= int(self.current_clip_end * 1000):
+            self.check_loop_position(new_time)
+        else:
+            self.schedule_clip_end(new_time)
+
+    def on_player_end_reached(self, player):
+        """Handle libvlc's MediaPlayerEndReached: restart a looping clip or stop the UI updates."""
+        if player is not self.media_player:
+            return
+        if self.loop_enabled and self.current_clip_end is not None:
+            # An ended player has to be restarted before it can seek again
+            self.media_player.stop()
+            self.media_player.play()
+            adjusted_start = max(0, self.current_clip_start * 1000 - 100)
+            resume_from = self.seek_clip_start(adjusted_start)
+            self.schedule_clip_end(int(resume_from))
+        elif self.playlist is not None and self.current_clip_end is not None:
+            self.play_playlist_item(1)
+        else:
+            self.is_playing = False
+            self.timer.stop()
+            self.clip_end_timer.stop()
+            self.current_clip_end = None
+
+    def on_player_playing(self, player):
+        """Seek the standby player to its clip once it has opened the media; in audio mode, drop the video."""
+        if self.audio_mode:
+            self.set_video_enabled(player, False)  # New media start with their video track selected
+        if player is self.standby_player and self.standby_clip and not self.standby_ready:
+            self.seek(self.standby_clip[1] * 1000, self.standby_player)
+
+    def on_standby_time_changed(self, new_time):
+        """Freeze the standby player on the first frame of its clip."""
+        if self.standby_clip and not self.standby_ready and new_time >= int(self.standby_clip[1] * 1000) - 1000:
+            self.standby_player.set_pause(1)
+            self.standby_ready = True
+
+    def preroll_standby(self, video_path, start, end):
+        """Open, seek and buffer the standby player at the start of a clip."""
+        if self.standby_clip == (video_path, start, end):
+            return
+        self.standby_clip = (video_path, start, end)
+        self.standby_ready = False
+        self.set_player_media(self.standby_player, video_path)
+        self.standby_player.audio_set_mute(True)
+        self.standby_player.play()  # on_player_playing seeks, on_standby_time_changed pauses
+
+    def media_path_for(self, video_path):
+        """Return the file to play for a video: its audio sidecar in audio mode once it is built, else the video."""
+        if self.audio_mode:
+            sidecar = self.audio_sidecars.lookup(video_path)
+            if sidecar:
+                return sidecar
+        return video_path
+
+    def media_options(self, video_path, media_path):
+        """Return the libvlc options of a video's profile for the media cache.
+
+        A video that has not been probed opens with the defaults and is probed
+        in the background; its cached media is then opened again with its profile.
+        """
+        if media_path != video_path:
+            return []  # Local audio sidecars play fine with the defaults
+        with tracer.span("media_profile", video=os.path.basename(video_path)):
+            properties = self.media_profiles.get(video_path)
+        if properties is None:
+            self.probe_media_profile(video_path)
+            return []
+        name, options = choose_profile(properties)
+        tracer.count(f"profile.{name}")
+        return options
+
+    def probe_media_profile(self, video_path):
+        """Probe a video in the background so its media is opened with a profile."""
+        if video_path in self.profile_jobs:
+            return
+        self.profile_jobs.add(video_path)
+        self.run_in_background(self.media_profiles.probe, video_path,
+                               on_done=lambda properties, error: self.on_media_profile_probed(video_path, properties))
+
+    def on_media_profile_probed(self, video_path, properties):
+        self.profile_jobs.discard(video_path)
+        # Without ffprobe every video keeps the default options
+        if properties is None:
+            return
+        self.media_cache.reopen_media(video_path)  # Cached or prefetched with the default options
+        if video_path == self.video_path:
+            self.feedback_label.setText(f"Video profile: {choose_profile(properties)[0]}")
+
+    def set_player_media(self, player, video_path):
+        """Open a video, or the file standing in for it, on a player and return the video's clips."""
+        media_path = self.media_path_for(video_path)
+        media, clips = self.media_cache.get(video_path, media_path)
+        player.set_media(media)
+        self.media_paths[player] = media_path
+        return clips
+
+    def switch_media(self):
+        """Move the active player to the file the current mode plays, at the same position, rate and play state.
+
+        Returns False if it already plays that file.
+        """
+        if not self.video_path or self.media_player.get_media() is None:
+            return False
+        if self.media_paths.get(self.media_player) == self.media_path_for(self.video_path):
+            return False
+        position = self.media_player.get_time()
+        self.set_player_media(self.media_player, self.video_path)
+        self.media_player.play()
+        self.media_player.set_rate(self.playback_speed)
+        self.seek(position)
+        if not self.is_playing:
+            self.media_player.set_pause(1)
+        return True
+
+    def request_sidecar(self, video_path):
+        """Queue the extraction of a video's audio track into its sidecar, unless it exists or is queued."""
+        if video_path == self.sidecar_building or video_path in self.sidecar_queue:
+            return
+        if self.audio_sidecars.lookup(video_path):
+            return
+        self.sidecar_queue.append(video_path)
+        self.build_next_sidecar()
+
+    def build_next_sidecar(self):
+        # One at a time, so the extraction reads a single file from the network share
+        if self.sidecar_building or not self.sidecar_queue:
+            return
+        video_path = self.sidecar_building = self.sidecar_queue.pop(0)
+        keep = [path for path in self.media_paths.values() if path != video_path]
+        self.run_in_background(
+            self.audio_sidecars.build, video_path, keep,
+            on_done=lambda path, error: self.on_sidecar_built(video_path, error))
+
+    def on_sidecar_built(self, video_path, error):
+        self.sidecar_building = None
+        # Without ffmpeg or an audio track the video itself keeps being played
+        if error is None and self.audio_mode and video_path == self.video_path and self.switch_media():
+            self.feedback_label.setText("Playing the local audio copy.")
+        self.build_next_sidecar()
+
+    def reset_standby(self):
+        """Discard whatever the standby player was prepared for."""
+        self.standby_clip = None
+        self.standby_ready = False
+        self.standby_player.stop()
+
+    def preroll_next_clip(self, start):
+        """Prepare the standby player for the clip that follows ``start`` in the current list, or in the playlist."""
+        if self.playlist is not None:
+            upcoming = self.playlist.upcoming(1)
+            if upcoming:
+                video_path, clip = upcoming[0]
+                self.preroll_standby(video_path, *clip['positions'])
+            return
+        if not self.favorites or not self.video_path:
+            return
+        next_clip = next((clip for clip in self.favorites if clip['positions'][0] > start), self.favorites[0])
+        next_start, next_end = next_clip['positions']
+        self.preroll_standby(self.video_path, next_start, next_end)
+
+    def swap_players(self):
+        """Make the pre-rolled standby player the active one, without seeking."""
+        previous = self.media_player
+        self.media_player, self.standby_player = self.standby_player, previous
+        self.video_stack.setCurrentWidget(self.video_surface_for(self.media_player))
+        self.media_player.audio_set_mute(False)
+        previous.audio_set_mute(True)
+        previous.set_pause(1)
+        self.standby_clip = None
+        self.standby_ready = False
+
+    def video_surface_for(self, player):
+        for i in range(self.video_stack.count()):
+            surface = self.video_stack.widget(i)
+            if surface.media_player is player:
+                return surface
+        return None
 
     def return_to_main_video(self):
         if self.video_path:
             # Ensure media is loaded
             if not self.media_player.get_media():
-                media = self.instance.media_new(self.video_path)
-                self.media_player.set_media(media)
-            self.media_player.set_time(self.main_video_position)  # Resume from last position
+                self.set_player_media(self.media_player, self.video_path)
+            self.cancel_lead_in()
+            self.seek(self.main_video_position)  # Resume from last position
             self.media_player.play()
             self.is_playing = True
+            self.timer.start()
             self.return_button.setEnabled(False)
             self.position_saved = False  # Reset the flag
             self.feedback_label.setText("Returned to main video")
@@ -517,10 +1456,9 @@ class VideoPlayerApp(QWidget):
             # Get the selected row from the favorites list
             selected_row = self.favorites_list.currentRow()
             if selected_row >= 0:
-                del self.favorites[selected_row]
-                self.favorites_list.takeItem(selected_row)
-                self.save_clips_to_file()
-                self.update_favorites_list()  # Update the favorites list widget
+                self.clip_session.delete_clip(selected_row)
+                self.favorites_model.remove_clip(selected_row)  # Update the favorites list
+                self.media_cache.update_clips(self.video_path, self.favorites)
                 self.feedback_label.setText(f"Deleted clip {selected_row + 1}")
                 if self.favorites_list.count() > 0:
                     self.favorites_list.setCurrentRow(max(selected_row - 1, 0))
@@ -528,20 +1466,188 @@ class VideoPlayerApp(QWidget):
                 self.feedback_label.setText("No clip selected to delete.")
         else:
             # Get the selected item from the video clips tree
-            current_item = self.video_clips_tree.currentItem()
-            if current_item and current_item.parent():  # Ensure it's a clip, not a video
-                parent_item = current_item.parent()
-                clip_index = parent_item.indexOfChild(current_item)
-                del self.favorites[clip_index]
-                parent_item.takeChild(clip_index)
-                self.save_clips_to_file()
-                self.update_video_clips_tree()  # Update the video clips tree
-                self.feedback_label.setText(f"Deleted clip {clip_index + 1}")
-                if parent_item.childCount() > 0:
-                    self.video_clips_tree.setCurrentItem(parent_item.child(max(clip_index - 1, 0)))
+            current_index = self.video_clips_tree.currentIndex()
+            if current_index.isValid() and current_index.parent().isValid():  # Ensure it's a clip, not a video
+                parent_index = current_index.parent()
+                clip_index = current_index.row()
+                clip_id = current_index.data(CLIP_ID_ROLE)
+                deleted = self.clip_session.delete_clip_by_id(clip_id)
+                if deleted is None:
+                    self.feedback_label.setText("Clip no longer exists.")
+                    return
+                video_name, favorites_row = deleted
+                if favorites_row is not None:
+                    self.favorites_model.remove_clip(favorites_row)
+                    self.media_cache.update_clips(self.video_path, self.favorites)
+                elif video_name in self.video_clips and video_name in self.video_paths:
+                    self.media_cache.update_clips(self.video_paths[video_name], self.video_clips[video_name])
+                self.video_clips_model.remove_clip(video_name, clip_id)  # Update the video clips tree
+                self.feedback_label.setText(f"Deleted clip {clip_index + 1} of {video_name}")
+                if self.video_clips_model.rowCount(parent_index) > 0:
+                    self.video_clips_tree.setCurrentIndex(self.video_clips_model.index(max(clip_index - 1, 0), 0, parent_index))
             else:
                 self.feedback_label.setText("No clip selected to delete.")
 
+    def export_clips(self):
+        """Export the current video's clips (every video's in all-videos mode) as audio files."""
+        output_dir = QFileDialog.getExistingDirectory(self, "Export Clips To")
+        if not output_dir:
+            return
+        if self.single_video_mode:
+            if not self.video_path:
+                self.feedback_label.setText("No video loaded.")
+                return
+            video_name = os.path.basename(self.video_path)
+            video_ids, video_paths = [video_name], {video_name: self.video_path}
+        else:
+            video_ids, video_paths = None, dict(self.video_paths)
+
+        self.export_worker = ExportWorker(self.clip_store, video_paths, output_dir, video_ids, self,
+                                          clip_writer=self.clip_writer)
+        self.export_worker.progress.connect(
+            lambda done, total: self.feedback_label.setText(f"Exporting clips: {done}/{total} videos"))
+        self.export_worker.finished.connect(self.on_export_finished)
+        self.export_worker.start()
+        self.feedback_label.setText("Exporting clips...")
+
+    def on_export_finished(self, exported, skipped, errors):
+        if errors:
+            self.feedback_label.setText(f"Exported {exported} clips with {len(errors)} errors: {errors[0]}")
+        else:
+            self.feedback_label.setText(f"Exported {exported} clips ({skipped} already exported)")
+
+    def dedupe_clips(self):
+        """Drop duplicate or merge overlapping clips of the current video (every video's in all-videos mode)."""
+        choices = ["Drop duplicate clips", "Merge overlapping clips"]
+        choice, ok = QInputDialog.getItem(self, "Clean Up Clips", "Clean up:", choices, 0, False)
+        if not ok:
+            return
+        merge_overlaps = choice == choices[1]
+
+        # The open video goes through the session, so the list on screen and pending edits stay in step
+        dropped = self.clip_session.dedupe_clips(merge_overlaps=merge_overlaps) if self.video_path else []
+        if dropped:
+            self.apply_external_clips(os.path.basename(self.video_path))
+        if self.single_video_mode:
+            self.feedback_label.setText(f"Removed {len(dropped)} clips." if dropped else "No duplicate clips found.")
+            return
+
+        open_video = os.path.basename(self.video_path) if self.video_path else None
+        video_ids = [video_id for video_id in self.clip_session.videos_with_clips(self.video_paths, reset=False)
+                     if video_id != open_video]
+        self.dedupe_button.setEnabled(False)
+        self.feedback_label.setText("Cleaning up clips...")
+        self.run_in_background(
+            lambda: dedupe_library(self.clip_store, video_ids, merge_overlaps=merge_overlaps,
+                                   clip_writer=self.clip_writer),
+            on_done=lambda changed, error: self.on_library_deduped(changed, error, len(dropped), merge_overlaps))
+
+    def on_library_deduped(self, changed, error, removed, merge_overlaps):
+        self.dedupe_button.setEnabled(True)
+        if error is not None:
+            self.feedback_label.setText(f"Could not clean up the clips: {error}")
+            return
+        videos = len(changed) + (1 if removed else 0)  # Plus the open video, cleaned up first
+        for video_id, (kept, dropped) in sorted(changed.items()):
+            removed += len(dropped)
+            # Clips shown and edited during the sweep are cleaned up as the queued update will do
+            known = (self.clip_session.favorites if video_id == self.clip_session.video_id
+                     else self.clip_session.video_clips.get(video_id))
+            if known is not None:
+                kept = merge_clips(known, DEFAULT_TOLERANCE, merge_overlaps)[0]
+            if self.clip_session.reload_video(video_id, kept):
+                self.apply_external_clips(video_id, kept)
+        self.feedback_label.setText(f"Removed {removed} clips in {videos} videos.")
+
+    def toggle_playlist(self):
+        """Stop the practice playlist, or pick which clips to practice and build one in the background."""
+        if self.playlist is not None:
+            self.stop_playlist()
+            return
+        choices = ["All clips", "Clips in this video's folder",
+                   f"Videos added in the last {PLAYLIST_RECENT_DAYS} days", f"{PLAYLIST_SAMPLE_SIZE} random clips"]
+        choice, ok = QInputDialog.getItem(self, "Practice Playlist", "Practice:", choices, 0, False)
+        if not ok:
+            return
+        options = {}
+        if choice == choices[1]:
+            if not self.video_path:
+                self.feedback_label.setText("No video loaded.")
+                return
+            options['folder'] = os.path.dirname(self.video_path)
+        elif choice == choices[2]:
+            options['since'] = time.time() - PLAYLIST_RECENT_DAYS * 86400
+        elif choice == choices[3]:
+            options['sample'] = PLAYLIST_SAMPLE_SIZE
+
+        video_ids = self.clip_session.videos_with_clips(self.video_paths, reset=False)
+        self.playlist_button.setEnabled(False)
+        self.feedback_label.setText("Building playlist...")
+        self.run_in_background(
+            lambda: build_playlist(self.clip_store, dict(self.video_paths), video_ids, clip_writer=self.clip_writer,
+                                   **options),
+            on_done=lambda items, error: self.on_playlist_built(choice, items, error))
+
+    def on_playlist_built(self, name, items, error):
+        self.playlist_button.setEnabled(True)
+        if error is not None:
+            self.feedback_label.setText(f"Could not build the playlist: {error}")
+            return
+        if not items:
+            self.feedback_label.setText("No clips to practice.")
+            return
+        self.playlist = Playlist(items, name)
+        self.playlist_button.setText("Stop Playlist")
+        self.play_playlist_item(1)
+
+    def stop_playlist(self):
+        self.playlist = None
+        self.transition = None
+        self.reset_standby()  # It holds the playlist's next clip
+        self.playlist_button.setText("Practice Playlist")
+        self.feedback_label.setText("Playlist stopped.")
+
+    @traced("playlist.transition")
+    def play_playlist_item(self, step):
+        """Play the playlist clip ``step`` items away and get the following ones ready."""
+        # Drop items whose video has gone; each pass removes one, so this ends even if none is left
+        while True:
+            video_path, clip = self.playlist.advance(step)
+            if os.path.exists(video_path):
+                break
+            self.playlist.drop_current(step)
+            if not len(self.playlist):
+                self.stop_playlist()
+                self.feedback_label.setText("The playlist's videos were not found.")
+                return
+        start, end = clip['positions']
+        self.transition = (time.perf_counter(), start * 1000 - SEEK_SETTLED_MS, end * 1000)
+        tracer.start_async("playlist_transition", "playlist_transition_to_frame", video=os.path.basename(video_path))
+        if video_path != self.video_path:
+            # The media and clips were opened ahead, and the standby player may already sit on the clip
+            self.load_video(video_path=video_path, autoplay=False)
+        self.position_saved = False
+        self.play_clip(start, end)
+        self.feedback_label.setText(f"{self.playlist.name} {self.playlist.position + 1}/{len(self.playlist)}: "
+                                    f"{os.path.basename(video_path)} {start:.2f}s - {end:.2f}s")
+
+        # Look ahead: open the media and read the clips of the next videos in the background
+        for next_path, _ in self.playlist.upcoming(PLAYLIST_LOOKAHEAD):
+            if next_path != self.video_path:
+                self.media_cache.prefetch(next_path, self.media_path_for(next_path))
+
+    def on_transition_time(self, new_time):
+        """Time a playlist hop until the player reports a position inside the new clip."""
+        started, first_ms, last_ms = self.transition
+        if not first_ms <= new_time <= last_ms:
+            return
+        self.transition = None
+        latency_ms = (time.perf_counter() - started) * 1000
+        tracer.finish_async("playlist_transition")
+        if latency_ms > PLAYLIST_TRANSITION_BUDGET_MS:
+            self.feedback_label.setText(f"Slow playlist transition: {latency_ms:.0f} ms "
+                                        f"(budget {PLAYLIST_TRANSITION_BUDGET_MS} ms)")
+
     def toggle_loop(self):
         self.loop_enabled = not self.loop_enabled
         status = "enabled" if self.loop_enabled else "disabled"
@@ -563,6 +1669,7 @@ class VideoPlayerApp(QWidget):
         self.favorites_list.setCurrentRow(prev_row)
         self.play_favorite()
 
+    @traced()
     def keyPressEvent(self, event):
         key = event.key()
         
@@ -581,8 +1688,12 @@ class VideoPlayerApp(QWidget):
             self.start_clip()
         elif key == Qt.Key_E:
             self.save_clip()
+        elif key == Qt.Key_C:
+            self.clip_current_line()
         elif key == Qt.Key_L:
             self.toggle_loop()
+        elif key in (Qt.Key_N, Qt.Key_P) and self.playlist is not None:
+            self.play_playlist_item(1 if key == Qt.Key_N else -1)
         elif key in (Qt.Key_N, Qt.Key_Down):
             if self.single_video_mode:
                 self.next_clip()
@@ -597,12 +1708,12 @@ class VideoPlayerApp(QWidget):
             if self.single_video_mode:
                 self.play_favorite()
             else:
-                current_item = self.video_clips_tree.currentItem()
-                if current_item and not current_item.parent():  # Check if it's a top-level item (video)
-                    if current_item.isExpanded():
-                        self.video_clips_tree.collapseItem(current_item)
+                current_index = self.video_clips_tree.currentIndex()
+                if current_index.isValid() and not current_index.parent().isValid():  # Check if it's a top-level item (video)
+                    if self.video_clips_tree.isExpanded(current_index):
+                        self.video_clips_tree.collapse(current_index)
                     else:
-                        self.video_clips_tree.expandItem(current_item)
+                        self.video_clips_tree.expand(current_index)
                 else:
                     self.play_selected_clip()  # Play the selected clip if it's not a video
         elif key == Qt.Key_A:
@@ -612,54 +1723,76 @@ class VideoPlayerApp(QWidget):
 
     def navigate_tree(self, direction):
         """Navigate the video clips tree."""
-        current_item = self.video_clips_tree.currentItem()
-        if current_item:
+        current_index = self.video_clips_tree.currentIndex()
+        if current_index.isValid():
             if direction > 0:  # Move down
-                next_item = self.video_clips_tree.itemBelow(current_item)
+                next_index = self.video_clips_tree.indexBelow(current_index)
             else:  # Move up
-                next_item = self.video_clips_tree.itemAbove(current_item)
+                next_index = self.video_clips_tree.indexAbove(current_index)
 
-            if next_item:
-                self.video_clips_tree.setCurrentItem(next_item)
+            if next_index.isValid():
+                self.video_clips_tree.setCurrentIndex(next_index)
                 self.play_selected_clip()  # Play the clip after navigating
 
     def play_selected_clip(self):
         """Play the currently selected clip in the tree."""
-        current_item = self.video_clips_tree.currentItem()
-        if current_item and current_item.parent():  # Ensure it's a clip, not a video
-            self.on_clip_selected(current_item, 0)
+        current_index = self.video_clips_tree.currentIndex()
+        if current_index.isValid() and current_index.parent().isValid():  # Ensure it's a clip, not a video
+            self.on_clip_selected(current_index)
 
     def slider_clicked(self):
-        # Reset the current clip end when the slider is clicked
+        # Reset the current clip end when the slider is clicked; ClickableSlider has
+        # already sought to the click, and dragging from here scrubs by keyframe
         self.current_clip_end = None
 
-        # Calculate the position based on the click
-        value = self.position_slider.value()
-        self.set_position(value)
-
         # If the video is paused, start playing from the new position
         if not self.is_playing:
             self.play_video()
 
+    @traced()
     def update_favorites_list(self):
-        """Update the favorites list widget with the current clips."""
-        self.favorites_list.clear()
-        for i, clip_data in enumerate(self.favorites):
-            if isinstance(clip_data, dict) and 'positions' in clip_data:
-                start, end = clip_data['positions']
-                self.favorites_list.addItem(f"Clip {i + 1}: {start:.2f}s - {end:.2f}s")
+        """Show all clips of the current video in the favorites list."""
+        self.favorites_model.set_clips(self.favorites)
 
     def toggle_video_audio_mode(self):
-        """Toggle between video and audio mode."""
+        """Toggle between video and audio mode; audio mode turns the video track off so nothing is decoded."""
+        self.cpu_meter.sample(self.cpu_state())
         self.audio_mode = not self.audio_mode
+        self.cpu_meter.sample(self.cpu_state())
+
+        # The standby player is pre-rolled again, in the new mode, for the next clip
+        self.reset_standby()
         if self.audio_mode:
             self.video_widget.hide()
+            if self.video_path:
+                self.request_sidecar(self.video_path)
+            if not self.switch_media():
+                self.set_video_enabled(self.media_player, False)
             self.toggle_mode_button.setText("Switch to Video Mode")
-            self.feedback_label.setText("Audio mode enabled.")
+            self.feedback_label.setText(f"Audio mode enabled. {self.cpu_meter.report()}")
         else:
             self.video_widget.show()
+            if not self.switch_media() and self.media_player.get_media() is not None:
+                # A re-enabled track shows nothing until its next keyframe; seek in place to draw the current frame
+                self.set_video_enabled(self.media_player, True)
+                self.seek(self.media_player.get_time())
             self.toggle_mode_button.setText("Switch to Audio Mode")
-            self.feedback_label.setText("Video mode enabled.")
+            self.feedback_label.setText(f"Video mode enabled. {self.cpu_meter.report()}")
+
+    def cpu_state(self):
+        """Return the state the CPU meter charges time to: the mode while playing, else None."""
+        if not self.is_playing:
+            return None
+        return "audio" if self.audio_mode else "video"
+
+    def set_video_enabled(self, player, enabled):
+        """Stop (track -1) or restart the decoding of a player's video; time, rate and audio carry on."""
+        if not enabled:
+            player.video_set_track(-1)
+        elif player.video_get_track() == -1:
+            tracks = [track for track, _ in player.video_get_track_description() or [] if track != -1]
+            if tracks:
+                player.video_set_track(tracks[0])
 
     def toggle_dark_mode(self):
         """Toggle between light and dark mode."""
@@ -701,7 +1834,7 @@ class VideoPlayerApp(QWidget):
             margin: -2px 0;
             border-radius: 3px;
         }
-        QListWidget {
+        QListView {
             background-color: #FFFFFF;
             color: #000000;
         }
@@ -738,22 +1871,22 @@ class VideoPlayerApp(QWidget):
             margin: -2px 0;
             border-radius: 3px;
         }
-        QListWidget {
+        QListView {
             background-color: #3A3A3A;
             color: #FFFFFF;
         }
         QLabel {
             color: #FFFFFF;
         }
-        QTreeWidget {
+        QTreeView {
             background-color: #3A3A3A;
-            color: #FFFFFF;  /* Set text color for QTreeWidget */
+            color: #FFFFFF;  /* Set text color for QTreeView */
         }
-        QTreeWidget::item {
+        QTreeView::item {
             background-color: #3A3A3A;  /* Set background color for items */
             color: #FFFFFF;  /* Ensure text color for items */
         }
-        QTreeWidget::item:selected {
+        QTreeView::item:selected {
             background-color: #5A5A5A;  /* Set background color for selected items */
         }
         QHeaderView::section {
@@ -768,6 +1901,7 @@ class VideoPlayerApp(QWidget):
         speed_text = self.speed_combo.currentText()
         self.playback_speed = float(speed_text.replace("x", ""))
         self.media_player.set_rate(self.playback_speed)
+        self.schedule_clip_end()
         self.feedback_label.setText(f"Playback speed set to {self.playback_speed}x")
 
     def toggle_half_speed(self):
@@ -777,51 +1911,52 @@ class VideoPlayerApp(QWidget):
         else:
             self.playback_speed = 1.0
         self.media_player.set_rate(self.playback_speed)
+        self.schedule_clip_end()
         self.speed_combo.setCurrentText(f"{self.playback_speed}x")
         self.feedback_label.setText(f"Playback speed set to {self.playback_speed}x")
 
+    @traced()
     def load_config_files(self):
-        """Load all config files and list videos with their clips."""
-        self.video_clips_tree.clear()  # Clear existing items
-        self.video_clips = {}  # Reset the video clips dictionary
-
-        # Get all JSON files in the config directory and sort them by name
-        json_files = sorted([f for f in os.listdir(self.config_dir) if f.endswith('.json')])
-
-        # Iterate over sorted JSON files
-        for file_name in json_files:
-            video_name = file_name[:-5]  # Remove the '.json' extension
-
-            # Use the video_paths dictionary to find the video path
-            video_path = self.video_paths.get(video_name)
-
-            # Check if the video file exists
-            if not video_path:
-                continue  # Skip this config file if the video file does not exist
-
-            file_path = os.path.join(self.config_dir, file_name)
-
-            with open(file_path, 'r') as f:
-                clips = json.load(f)
-
-            # Add video and clips to the tree
-            video_item = QTreeWidgetItem(self.video_clips_tree, [video_name])
-            for clip in clips:
-                start, end = clip['positions']
-                clip_item = QTreeWidgetItem(video_item, [f"Clip: {start:.2f}s - {end:.2f}s"])
-                video_item.addChild(clip_item)
-
-            self.video_clips[video_name] = clips
-
-        self.video_clips_tree.collapseAll()  # Collapse all items initially
-
-    def on_clip_selected(self, item, column):
+        """List the videos that have saved clips and read their clips in the background."""
+        # Keep only the videos whose video file exists
+        video_names = self.clip_session.videos_with_clips(self.video_paths)
+        self.tree_loaded = True
+
+        self.video_clips_model.set_videos(video_names)
+
+        # Parse the configs in a thread pool; the store skips files unchanged since they were last read
+        if self.config_load_worker is not None:
+            self.config_load_worker.cancelled = True
+        self.config_load_generation += 1
+        self.config_load_worker = ConfigLoadWorker(self.clip_store, video_names, self.config_load_generation, self,
+                                                   clip_writer=self.clip_writer)
+        self.config_load_worker.clips_loaded.connect(self.on_config_clips_loaded)
+        self.config_load_worker.start()
+
+    def on_config_clips_loaded(self, generation, batch):
+        """Fill the tree with a batch of clips read by the ConfigLoadWorker."""
+        if generation != self.config_load_generation:
+            return
+        for video_name, clips in batch:
+            clips = self.clip_session.preload(video_name, clips)
+            if clips is not None:
+                self.video_clips_model.preload_clips(video_name, clips)
+
+    def load_video_clips(self, video_name):
+        """Read the clips of one video from the clip store."""
+        return self.clip_session.clips_of(video_name)
+
+    def on_clip_selected(self, index):
         """Handle the event when a clip is selected in the tree."""
-        parent = item.parent()
-        if parent is not None:  # Ensure the item is a clip, not a video
-            video_name = parent.text(0)
-            clip_text = item.text(0)
-            start, end = self.parse_clip_text(clip_text)
+        parent = index.parent()
+        if parent.isValid():  # Ensure the item is a clip, not a video
+            # Rows carry the clip id; the session maps it to its video and full-precision times
+            found = self.clip_session.find_clip(index.data(CLIP_ID_ROLE))
+            if found is None:
+                self.feedback_label.setText("Clip no longer exists.")
+                return
+            video_name, clip = found
+            start, end = clip['positions']
 
             # Use the video_paths dictionary to find the video path
             video_path = self.video_paths.get(video_name)
@@ -830,39 +1965,56 @@ class VideoPlayerApp(QWidget):
             if self.video_path != video_path:
                 self.load_video(video_path=video_path)
 
+            # Get the neighbouring videos ready for navigate_tree
+            self.prefetch_adjacent_videos(parent)
+
             # Play the clip
             self.play_clip(start, end)
 
-    def parse_clip_text(self, clip_text):
-        """Parse the clip text to extract start and end times."""
-        # Example clip text: "Clip: 10.00s - 20.00s"
-        parts = clip_text.split(": ")[1].split(" - ")
-        start = float(parts[0].replace("s", ""))
-        end = float(parts[1].replace("s", ""))
-        return start, end
+    def prefetch_adjacent_videos(self, video_index):
+        """Prefetch the media and clips of the videos next to a video in the tree."""
+        for row in (video_index.row() - 1, video_index.row() + 1):
+            if 0 <= row < self.video_clips_model.rowCount():
+                video_path = self.video_paths.get(self.video_clips_model.index(row, 0).data())
+                if video_path:
+                    # Open the sidecar, not the video container, in audio mode
+                    self.media_cache.prefetch(video_path, self.media_path_for(video_path))
 
+    @traced()
     def play_clip(self, start, end):
         """Play the video from start to end time."""
         if self.video_path:
-            # Ensure media is loaded
-            if not self.media_player.get_media():
-                media = self.instance.media_new(self.video_path)
-                self.media_player.set_media(media)
+            # Ensure media is loaded, from the audio sidecar instead of the video while it is not shown
+            if self.audio_mode:
+                self.request_sidecar(self.video_path)
+            if not self.media_player.get_media() or self.media_paths.get(self.media_player) != self.media_path_for(self.video_path):
+                self.set_player_media(self.media_player, self.video_path)
 
             # Set the media to the main video and play from the start to end positions
             self.current_clip_start = start
             self.current_clip_end = end
-            self.media_player.set_time(int(start * 1000))  # Convert to milliseconds
+            resume_from = start * 1000  # Convert to milliseconds
+            self.cancel_lead_in()  # Before a swap, while the muted player is still the active one
+            if self.standby_ready and self.standby_clip == (self.video_path, start, end):
+                self.swap_players()  # Already positioned at the clip start
+            else:
+                resume_from = self.seek_clip_start(resume_from)
 
             # Reapply the current playback speed
             self.media_player.set_rate(self.playback_speed)
 
             self.media_player.play()
             self.is_playing = True
+            self.timer.start()
+            self.schedule_clip_end(int(resume_from))
             self.feedback_label.setText(f"Playing clip: {start:.2f}s - {end:.2f}s")
+
+            # Get the following clip ready on the standby player
+            QTimer.singleShot(0, lambda: self.preroll_next_clip(start))
         else:
             self.feedback_label.setText("Video file not found!")
 
+    @traced()
     def toggle_video_list(self):
         """Toggle between single video mode and all videos mode."""
         self.single_video_mode = not self.single_video_mode
@@ -876,7 +2028,8 @@ class VideoPlayerApp(QWidget):
         else:
             self.favorites_list.hide()
             self.video_clips_tree.show()
-            self.load_config_files()  # Load the config files when switching to all videos mode
+            if not self.tree_loaded:
+                self.load_config_files()  # List the videos once; edits and the watchers keep the tree current
             self.video_clips_tree.collapseAll()  # Collapse all items by default
             self.toggle_video_list_button.setText("Single/All Videos")
             self.feedback_label.setText("All videos mode enabled.")
@@ -892,10 +2045,335 @@ class VideoPlayerApp(QWidget):
             self.video_clips_tree.collapseAll()
             self.toggle_expand_button.setText("Expand All")
 
-class CustomListWidget(QListWidget):
+class PlayerEventSignals(QObject):
+    """Deliver libvlc media player events from libvlc's thread to the UI thread."""
+    time_changed = pyqtSignal(object, int)
+    end_reached = pyqtSignal(object)
+    playing = pyqtSignal(object)
+
+class ClipWriteSignals(QObject):
+    """Deliver ClipWriter completions from the writer thread to the UI thread."""
+    written = pyqtSignal(int, float, object)
+
+class LibraryScanWorker(QObject):
+    """Load a LibraryIndex and reconcile it in a background thread, streaming the changes."""
+    loaded = pyqtSignal(dict)
+    videos_found = pyqtSignal(dict)
+    videos_removed = pyqtSignal(list)
+    finished = pyqtSignal(int, int)
+
+    def __init__(self, library_index, parent=None):
+        super().__init__(parent)
+        self.library_index = library_index
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def run(self):
+        def on_batch(added, removed):
+            if added:
+                self.videos_found.emit(added)
+            if removed:
+                self.videos_removed.emit(removed)
+
+        with startup.stage("library_index"):
+            video_paths = self.library_index.load()
+        self.loaded.emit(video_paths)
+        with startup.stage("scan"):
+            added, removed = self.library_index.reconcile(on_batch=on_batch)
+        self.finished.emit(len(added), len(removed))
+
+class ConfigLoadWorker(QObject):
+    """Read the clips of many videos in a background thread pool and stream them back in order."""
+    clips_loaded = pyqtSignal(int, list)  # generation, [(video name, clips)]
+
+    BATCH_SIZE = 200
+
+    def __init__(self, clip_store, video_names, generation, parent=None, clip_writer=None):
+        super().__init__(parent)
+        self.clip_store = clip_store
+        self.clip_writer = clip_writer  # Its queued edits are shown too
+        self.video_names = list(video_names)
+        self.generation = generation
+        self.cancelled = False
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def run(self):
+        batch = []
+        with tracer.span("config_load", videos=len(self.video_names)):
+            for item in iter_clips_parallel(self.clip_store, self.video_names, clip_writer=self.clip_writer):
+                if self.cancelled:
+                    return
+                batch.append(item)
+                if len(batch) >= self.BATCH_SIZE:
+                    self.clips_loaded.emit(self.generation, batch)
+                    batch = []
+        if batch:
+            self.clips_loaded.emit(self.generation, batch)
+
+class LibraryWatcher(QObject):
+    """Watch the video directories and the config directory, batching change notifications.
+
+    QFileSystemWatcher reports every directory change on its own, so a bulk
+    copy produces a burst of signals. They are collected and emitted once the
+    directories have been quiet for BATCH_DELAY_MS. Directory changes only
+    cover files being added, removed or renamed, so the config file of the
+    current video is also watched for edits made in place.
+    """
+    BATCH_DELAY_MS = 500
+    video_dirs_changed = pyqtSignal(list)
+    config_dir_changed = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.on_directory_changed)
+        self.watcher.fileChanged.connect(self.on_config_file_changed)
+        self.config_dir = None
+        self.config_file = None
+        self.pending_dirs = set()
+        self.config_changed = False
+        self.batch_timer = QTimer(self)
+        self.batch_timer.setSingleShot(True)
+        self.batch_timer.setInterval(self.BATCH_DELAY_MS)
+        self.batch_timer.timeout.connect(self.emit_batch)
+
+    def watch_config_dir(self, config_dir):
+        self.config_dir = os.path.abspath(config_dir)
+        if os.path.isdir(self.config_dir):
+            self.watcher.addPath(self.config_dir)
+        self.rewatch_config_file()
+
+    def watch_config_file(self, config_file):
+        """Watch one config file for in-place edits, replacing the previously watched one."""
+        if self.config_file and self.config_file != config_file and self.config_file in self.watcher.files():
+            self.watcher.removePath(self.config_file)
+        self.config_file = config_file
+        self.rewatch_config_file()
+
+    def rewatch_config_file(self):
+        # Atomic replaces and late creation drop the file from the watcher, so add it back
+        if self.config_dir and self.config_file and self.config_file not in self.watcher.files() and os.path.exists(self.config_file):
+            self.watcher.addPath(self.config_file)
+
+    def on_config_file_changed(self, path):
+        self.config_changed = True
+        self.batch_timer.start()
+
+    def watch_dirs(self, dir_paths):
+        """Start watching the given directories; already watched ones are skipped."""
+        watched = set(self.watcher.directories())
+        new_paths = [path for path in dir_paths if path not in watched]
+        if new_paths:
+            self.watcher.addPaths(new_paths)
+
+    def on_directory_changed(self, path):
+        if path == self.config_dir:
+            self.config_changed = True
+        else:
+            self.pending_dirs.add(path)
+        self.batch_timer.start()  # Restart: wait for the burst to end
+
+    def emit_batch(self):
+        if self.pending_dirs:
+            dir_paths, self.pending_dirs = sorted(self.pending_dirs), set()
+            self.video_dirs_changed.emit(dir_paths)
+        if self.config_changed:
+            self.config_changed = False
+            self.rewatch_config_file()
+            self.config_dir_changed.emit()
+
+class SubtitleSearchDialog(QDialog):
+    """Search the subtitles of the whole library; play hits or save them as clips."""
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setWindowTitle("Search Subtitles")
+        self.resize(900, 600)
+        self.hits = []
+        self.search_generation = 0  # Results of an older search that finishes late are dropped
+
+        layout = QVBoxLayout(self)
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("Phrase to search for")
+        self.query_edit.returnPressed.connect(self.search)
+        layout.addWidget(self.query_edit)
+
+        self.results_list = QListWidget()
+        self.results_list.itemDoubleClicked.connect(self.play_hit)
+        layout.addWidget(self.results_list)
+
+        buttons_layout = QHBoxLayout()
+        self.play_button = QPushButton("Play")
+        self.play_button.clicked.connect(self.play_hit)
+        buttons_layout.addWidget(self.play_button)
+        self.save_clip_button = QPushButton("Save as Clip")
+        self.save_clip_button.clicked.connect(self.save_hit_as_clip)
+        buttons_layout.addWidget(self.save_clip_button)
+        layout.addLayout(buttons_layout)
+
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
+    def search(self):
+        """Search the subtitle index in the background."""
+        self.search_generation += 1
+        generation, started = self.search_generation, time.perf_counter()
+        self.status_label.setText("Searching...")
+        self.parent().run_in_background(
+            self.parent().subtitle_index.search, self.query_edit.text(),
+            on_done=lambda hits, error: self.on_search_done(generation, started, hits, error))
+
+    def on_search_done(self, generation, started, hits, error):
+        if generation != self.search_generation:
+            return
+        if error is not None:
+            self.status_label.setText(f"Search failed: {error}")
+            return
+        self.hits = hits
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.results_list.clear()
+        for video_id, start, end, text in self.hits:
+            self.results_list.addItem(f"{video_id} @ {self.parent().format_time(start * 1000)}  {' / '.join(text.splitlines())}")
+        self.status_label.setText(f"{len(self.hits)} hits in {elapsed_ms:.0f} ms")
+
+    def current_hit(self):
+        row = self.results_list.currentRow()
+        return self.hits[row] if 0 <= row < len(self.hits) else None
+
+    def play_hit(self):
+        hit = self.current_hit()
+        if hit:
+            self.parent().play_subtitle_hit(hit)
+
+    def save_hit_as_clip(self):
+        hit = self.current_hit()
+        if hit:
+            self.parent().save_subtitle_hit_as_clip(hit)
+
+class BackgroundTask(QObject):
+    """Run a function in a background thread and report its result to the UI thread."""
+    finished = pyqtSignal(object, object)  # result, error
+
+    def __init__(self, function, args=(), parent=None):
+        super().__init__(parent)
+        self.function = function
+        self.args = args
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def wait(self):
+        """Block until the function has returned and return ``(result, error)``."""
+        self.thread.join()
+        return self.result, self.error
+
+    def run(self):
+        try:
+            result, error = self.function(*self.args), None
+        except Exception as e:
+            result, error = None, e
+        self.result, self.error = result, error
+        self.finished.emit(result, error)
+
+class ExportWorker(QObject):
+    """Run clip_export.export_clips in a background thread."""
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(int, int, list)
+
+    def __init__(self, clip_store, video_paths, output_dir, video_ids=None, parent=None, clip_writer=None):
+        super().__init__(parent)
+        self.clip_store = clip_store
+        self.clip_writer = clip_writer
+        self.video_paths = video_paths
+        self.output_dir = output_dir
+        self.video_ids = video_ids
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def run(self):
+        try:
+            if self.clip_writer is not None:
+                self.clip_writer.flush()  # Export what is on screen; the workers read the store themselves
+            exported, skipped, errors = export_clips(
+                self.clip_store, self.video_paths, self.output_dir, video_ids=self.video_ids,
+                on_progress=self.progress.emit)
+        except Exception as e:
+            exported, skipped, errors = 0, 0, [str(e)]
+        self.finished.emit(exported, skipped, errors)
+
+class ClipListModel(QAbstractListModel):
+    """Flat model of the current video's clips for the favorites list.
+
+    Single clips are inserted and removed with row notifications, so the view
+    keeps its selection and scroll position and only repaints what it shows.
+    """
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.itemDoubleClicked.connect(self.parent().play_favorite)  # Connect double-click to play_favorite
+        self.clips = []
+
+    def set_clips(self, clips):
+        """Replace all clips, e.g. when another video is loaded."""
+        self.beginResetModel()
+        self.clips = list(clips)
+        self.endResetModel()
+
+    def insert_clip(self, row, clip):
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.clips.insert(row, clip)
+        self.endInsertRows()
+        self.renumber_from(row + 1)
+
+    def remove_clip(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.clips[row]
+        self.endRemoveRows()
+        self.renumber_from(row)
+
+    def renumber_from(self, row):
+        """Let the view refresh the "Clip N" labels that shifted; it only re-reads the visible ones."""
+        if row < len(self.clips):
+            self.dataChanged.emit(self.index(row), self.index(len(self.clips) - 1), [Qt.DisplayRole])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.clips)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        clip = self.clips[index.row()]
+        if role == CLIP_ID_ROLE:
+            return clip['id']
+        if role == CLIP_POSITIONS_ROLE:
+            return tuple(clip['positions'])
+        if role != Qt.DisplayRole:
+            return None
+        start, end = clip['positions']
+        return f"Clip {index.row() + 1}: {start:.2f}s - {end:.2f}s"
+
+class CustomListView(QListView):
+    """Favorites list view with the row-based API the player uses."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.doubleClicked.connect(self.parent().play_favorite)  # Connect double-click to play_favorite
+
+    def currentRow(self):
+        index = self.currentIndex()
+        return index.row() if index.isValid() else -1
+
+    def setCurrentRow(self, row):
+        index = self.model().index(row, 0)
+        self.setCurrentIndex(index)
+        self.scrollTo(index)
+
+    def count(self):
+        return self.model().rowCount()
 
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_L:
@@ -911,17 +2389,58 @@ class ClickableVideoWidget(QWidget):
         self.setAttribute(Qt.WA_OpaquePaintEvent)
         self.setAttribute(Qt.WA_DontCreateNativeAncestors)
         self.setAttribute(Qt.WA_NativeWindow)
+        self.media_player = None  # The player rendering into this widget
 
     def mousePressEvent(self, event):
-        # Call the toggle play/pause method in the parent
-        self.parent().toggle_play_pause()
+        # Call the toggle play/pause method in the main window
+        self.window().toggle_play_pause()
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
-        if self.parent().media_player:
-            self.parent().media_player.video_set_scale(0)
+        if self.media_player:
+            self.media_player.video_set_scale(0)
 
 class ClickableSlider(QSlider):
+    def __init__(self, orientation, parent=None):
+        super().__init__(orientation, parent)
+        self.waveform = None
+        self.waveform_lines = None  # (width, height, maximum, lines) of the last paint
+
+    def set_waveform(self, waveform):
+        """Draw a waveform.Waveform behind the groove, or nothing if None."""
+        self.waveform = waveform
+        self.waveform_lines = None
+        self.update()
+
+    def paintEvent(self, event):
+        if self.waveform is None:
+            super().paintEvent(event)
+            return
+        painter = QStylePainter(self)
+        option = QStyleOptionSlider()
+        self.initStyleOption(option)
+
+        option.subControls = QStyle.SC_SliderGroove
+        painter.drawComplexControl(QStyle.CC_Slider, option)
+
+        painter.setPen(QColor(120, 160, 220, 170))
+        painter.drawLines(self.waveform_geometry())
+
+        option.subControls = QStyle.SC_SliderHandle
+        painter.drawComplexControl(QStyle.CC_Slider, option)
+
+    def waveform_geometry(self):
+        """Return one vertical line per pixel column, recomputed only when the size or range changes."""
+        width, height, maximum = self.width(), self.height(), self.maximum()
+        if self.waveform_lines is None or self.waveform_lines[:3] != (width, height, maximum):
+            duration = maximum / 1000.0 if maximum > 0 else self.waveform.duration
+            peaks = self.waveform.peaks(0.0, duration, width)
+            middle = height / 2.0
+            lines = [QLineF(x, middle - high * middle, x, middle - low * middle)
+                     for x, (low, high) in enumerate(peaks.tolist())]
+            self.waveform_lines = (width, height, maximum, lines)
+        return self.waveform_lines[3]
+
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
             # Calculate the new position based on the click
@@ -931,7 +2450,207 @@ class ClickableSlider(QSlider):
             self.parent().set_position(new_value)
         super().mousePressEvent(event)
 
-class CustomTreeWidget(QTreeWidget):
+class VideoClipsModel(QAbstractItemModel):
+    """Two-level model of videos and their clips.
+
+    Only the video rows exist up front; clips are handed over by
+    ``preload_clips`` as they are read in the background, or loaded through
+    ``load_clips`` on an earlier expand, and inserted in batches when the
+    view expands a video.
+    """
+
+    FETCH_BATCH_SIZE = 500
+
+    def __init__(self, load_clips, parent=None):
+        super().__init__(parent)
+        self.load_clips = load_clips  # Callable returning the clips of a video name
+        self.videos = []
+        self.rows_by_name = {}
+
+    def set_videos(self, video_names):
+        """Replace the list of videos; no clips are loaded until a video is expanded."""
+        self.beginResetModel()
+        self.videos = [VideoNode(name) for name in video_names]
+        self.rows_by_name = {node.name: row for row, node in enumerate(self.videos)}
+        self.endResetModel()
+
+    def add_video(self, video_name):
+        """Insert a video row at its sorted position, if it is not listed yet."""
+        if video_name in self.rows_by_name:
+            return
+        row = bisect.bisect_left([node.name for node in self.videos], video_name)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.videos.insert(row, VideoNode(video_name))
+        self.rows_by_name = {node.name: i for i, node in enumerate(self.videos)}
+        self.endInsertRows()
+
+    def remove_video(self, video_name):
+        """Remove a video row and its clips."""
+        row = self.rows_by_name.get(video_name)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.videos[row]
+        self.rows_by_name = {node.name: i for i, node in enumerate(self.videos)}
+        self.endRemoveRows()
+
+    def set_clips(self, video_name, clips):
+        """Replace the clips of one video, keeping it expanded if it was."""
+        row = self.rows_by_name.get(video_name)
+        if row is None:
+            return
+        node = self.videos[row]
+        parent = self.index(row, 0)
+        fetched = node.fetched
+        if fetched:
+            self.beginRemoveRows(parent, 0, fetched - 1)
+            node.fetched = 0
+            self.endRemoveRows()
+        node.clips = list(clips)
+        count = min(len(node.clips), max(fetched, self.FETCH_BATCH_SIZE)) if fetched else 0
+        if count:
+            self.beginInsertRows(parent, 0, count - 1)
+            node.fetched = count
+            self.endInsertRows()
+        self.dataChanged.emit(parent, parent)
+
+    def preload_clips(self, video_name, clips):
+        """Give a video its clips ahead of its first expand; nothing changes if they are loaded already."""
+        row = self.rows_by_name.get(video_name)
+        if row is None or self.videos[row].clips is not None:
+            return
+        self.videos[row].clips = list(clips)
+        if not clips:
+            parent = self.index(row, 0)
+            self.dataChanged.emit(parent, parent)  # Let the view drop the expand arrow
+
+    def insert_clip(self, video_name, clip):
+        """Insert a clip into a video at its sorted row, if its clips have been loaded; returns the row."""
+        video_row = self.rows_by_name.get(video_name)
+        if video_row is None or self.videos[video_row].clips is None:
+            return None
+        node = self.videos[video_row]
+        row = insertion_row(node.clips, clip['positions'][0])
+        if row <= node.fetched:
+            self.beginInsertRows(self.index(video_row, 0), row, row)
+            node.clips.insert(row, clip)
+            node.fetched += 1
+            self.endInsertRows()
+        else:
+            node.clips.insert(row, clip)  # Not fetched into the view yet
+        return row
+
+    def remove_clip(self, video_name, clip_id):
+        """Remove the row of a clip from a video, if its clips have been loaded."""
+        video_row = self.rows_by_name.get(video_name)
+        if video_row is None or self.videos[video_row].clips is None:
+            return
+        node = self.videos[video_row]
+        row = next((i for i, clip in enumerate(node.clips) if clip['id'] == clip_id), None)
+        if row is None:
+            return
+        if row < node.fetched:
+            self.beginRemoveRows(self.index(video_row, 0), row, row)
+            del node.clips[row]
+            node.fetched -= 1
+            self.endRemoveRows()
+        else:
+            del node.clips[row]
+        if not node.clips:
+            parent = self.index(video_row, 0)
+            self.dataChanged.emit(parent, parent)  # Let the view drop the expand arrow
+
+    def clip_index(self, video_name, clip_row):
+        """Return the index of a clip row, fetching rows up to it if necessary."""
+        row = self.rows_by_name.get(video_name)
+        if row is None:
+            return QModelIndex()
+        parent = self.index(row, 0)
+        while self.videos[row].fetched <= clip_row and self.canFetchMore(parent):
+            self.fetchMore(parent)
+        return self.index(clip_row, 0, parent)
+
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column, None)
+        return self.createIndex(row, column, self.videos[parent.row()])
+
+    def parent(self, index=QModelIndex()):
+        if not index.isValid():
+            return QModelIndex()
+        node = index.internalPointer()
+        if node is None:
+            return QModelIndex()
+        return self.createIndex(self.rows_by_name[node.name], 0, None)
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return len(self.videos)
+        if parent.internalPointer() is None:
+            return self.videos[parent.row()].fetched
+        return 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return bool(self.videos)
+        if parent.internalPointer() is None:
+            clips = self.videos[parent.row()].clips
+            return clips is None or len(clips) > 0
+        return False
+
+    def canFetchMore(self, parent):
+        if not parent.isValid() or parent.internalPointer() is not None:
+            return False
+        node = self.videos[parent.row()]
+        return node.clips is None or node.fetched < len(node.clips)
+
+    def fetchMore(self, parent):
+        if not self.canFetchMore(parent):
+            return
+        node = self.videos[parent.row()]
+        if node.clips is None:
+            node.clips = list(self.load_clips(node.name))
+            if not node.clips:
+                self.dataChanged.emit(parent, parent)  # Let the view drop the expand arrow
+                return
+        count = min(self.FETCH_BATCH_SIZE, len(node.clips) - node.fetched)
+        self.beginInsertRows(parent, node.fetched, node.fetched + count - 1)
+        node.fetched += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, CLIP_ID_ROLE, CLIP_POSITIONS_ROLE):
+            return None
+        node = index.internalPointer()
+        if node is None:
+            return self.videos[index.row()].name if role == Qt.DisplayRole else None
+        clip = node.clips[index.row()]
+        if role == CLIP_ID_ROLE:
+            return clip['id']
+        if role == CLIP_POSITIONS_ROLE:
+            return tuple(clip['positions'])
+        start, end = clip['positions']
+        return f"Clip: {start:.2f}s - {end:.2f}s"
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and section == 0:
+            return "Video"
+        return None
+
+class VideoNode:
+    """A video row of VideoClipsModel and its (possibly not yet loaded) clips."""
+
+    def __init__(self, name):
+        self.name = name
+        self.clips = None  # Loaded on first expand
+        self.fetched = 0  # Number of clip rows inserted into the model
+
+class CustomTreeView(QTreeView):
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -959,7 +2678,17 @@ if __name__ == "__main__":
     else:
         raise ValueError(f"Unsupported system: {platform.system()}")
 
-    app = QApplication(sys.argv)
-    window = VideoPlayerApp(debug=debug_mode, debug_video_path=debug_video_path, config_dir=config_dir, base_video_dir=base_video_dir)
-    window.show()
+    # --trace PATH (or the VIDEOCLIP_TRACE environment variable) records a Chrome trace of the session;
+    # --clip-backend sqlite keeps the clips in a local SQLite database instead of the JSON configs
+    import argparse
+    arg_parser = argparse.ArgumentParser(add_help=False)
+    arg_parser.add_argument("--trace", default=None)
+    arg_parser.add_argument("--clip-backend", default="json", choices=["json", "sqlite"])
+    known_args, qt_args = arg_parser.parse_known_args()
+
+    startup.mark("import")
+    with startup.stage("qt_init"):
+        app = QApplication(sys.argv[:1] + qt_args)
+        window = VideoPlayerApp(debug=debug_mode, debug_video_path=debug_video_path, config_dir=config_dir, base_video_dir=base_video_dir, clip_backend=known_args.clip_backend, trace_path=known_args.trace)
+        window.show()
     sys.exit(app.exec_())
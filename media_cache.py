@@ -0,0 +1,123 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+
+from instrumentation import tracer
+
+
+class MediaCache:
+    """Bounded LRU cache of parsed vlc.Media objects and the clip lists of their videos.
+
+    A cache entry is created either on demand by ``get`` (a miss) or ahead of
+    time by ``prefetch``. Parsing is done asynchronously by libvlc and clip
+    lists are read from the clip store in a worker thread, so prefetching never
+    blocks the caller. The vlc.Instance is asked for on the first entry, so the
+    cache can exist before VLC has been started. Entries are keyed by the file
+    played, which is the video itself or a stand-in for it such as its audio
+    sidecar; the clips are always those of the video.
+    """
+
+    PARSE_TIMEOUT_MS = 5000
+
+    def __init__(self, get_instance, load_clips, capacity=8, media_options=None):
+        self.get_instance = get_instance  # Callable returning the vlc.Instance
+        self.load_clips = load_clips  # Callable returning the clips of a video id
+        self.media_options = media_options  # Optional callable (video path, media path) -> libvlc media options
+        self.capacity = capacity
+        self.entries = OrderedDict()  # media path -> MediaCacheEntry
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.hits = 0
+        self.misses = 0
+        self.prefetches = 0
+
+    def _open_media(self, video_path, media_path):
+        import vlc
+
+        media = self.get_instance().media_new(media_path)
+        if self.media_options is not None:
+            for option in self.media_options(video_path, media_path):
+                media.add_option(option)
+        media.parse_with_options(vlc.MediaParseFlag.network, self.PARSE_TIMEOUT_MS)
+        return media
+
+    def _create_entry(self, video_path, media_path):
+        clips = self.executor.submit(self.load_clips, os.path.basename(video_path))
+        return MediaCacheEntry(video_path, self._open_media(video_path, media_path), clips)
+
+    def _insert(self, media_path, entry):
+        self.entries[media_path] = entry
+        while len(self.entries) > self.capacity:
+            _, evicted = self.entries.popitem(last=False)
+            evicted.media.release()  # A player using it keeps its own reference
+
+    def get(self, video_path, media_path=None):
+        """Return ``(media, clips)`` for a video, played from ``media_path`` if given, creating the entry on a miss."""
+        media_path = media_path or video_path
+        with self.lock:
+            entry = self.entries.get(media_path)
+            if entry is None:
+                self.misses += 1
+                tracer.count("media_cache.misses")
+                entry = self._create_entry(video_path, media_path)
+                self._insert(media_path, entry)
+            else:
+                self.hits += 1
+                tracer.count("media_cache.hits")
+                self.entries.move_to_end(media_path)
+        return entry.media, list(entry.clips.result())
+
+    def prefetch(self, video_path, media_path=None):
+        """Start opening and parsing a video that is likely to be played next, from ``media_path`` if given."""
+        if not video_path or not os.path.exists(video_path):
+            return
+        media_path = media_path or video_path
+        with self.lock:
+            if media_path in self.entries:
+                return
+            self.prefetches += 1
+            tracer.count("media_cache.prefetches")
+            self._insert(media_path, self._create_entry(video_path, media_path))
+
+    def reopen_media(self, video_path):
+        """Open the cached media of a video again, e.g. after its media options changed."""
+        with self.lock:
+            for media_path, entry in self.entries.items():
+                if entry.video_path == video_path:
+                    entry.media.release()  # A player using it keeps its own reference
+                    entry.media = self._open_media(video_path, media_path)
+
+    def update_clips(self, video_path, clips):
+        """Keep the cached clip list of a video in sync after it was edited."""
+        with self.lock:
+            for entry in self.entries.values():
+                if entry.video_path == video_path:
+                    entry.clips = Future()
+                    entry.clips.set_result(list(clips))
+
+    def stats(self):
+        """Return hit, miss and prefetch counters for tuning the cache size."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'capacity': self.capacity,
+                'hits': self.hits,
+                'misses': self.misses,
+                'prefetches': self.prefetches,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        with self.lock:
+            for entry in self.entries.values():
+                entry.media.release()
+            self.entries.clear()
+
+
+class MediaCacheEntry:
+    def __init__(self, video_path, media, clips):
+        self.video_path = video_path
+        self.media = media
+        self.clips = clips  # Future resolving to the clip list
@@ -0,0 +1,105 @@
+import os
+import json
+import time
+import threading
+import subprocess
+
+from clip_store import atomic_write_json
+from disk_cache import file_identity
+
+SLOW_STORAGE_MS = 20.0  # A read slower than this means a network share or a sleeping disk
+HEAVY_BITRATE = 20000000  # Bits per second above which even the loop filter is skipped
+LATENCY_READ_BYTES = 64 * 1024
+
+
+def probe_properties(video_path):
+    """Return the codec, resolution and bit rate of a video's first video stream, and its storage latency."""
+    probe = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "v:0",
+         "-show_entries", "stream=codec_name,width,height,bit_rate:format=bit_rate", "-of", "json", video_path],
+        capture_output=True, text=True)
+    if probe.returncode != 0:
+        raise RuntimeError(f"ffprobe failed to read {video_path}: {probe.stderr.strip()}")
+    data = json.loads(probe.stdout or "{}")
+    stream = (data.get('streams') or [{}])[0]
+    bitrate = stream.get('bit_rate') or data.get('format', {}).get('bit_rate') or 0
+    return {
+        'codec': stream.get('codec_name', ''),
+        'width': int(stream.get('width') or 0),
+        'height': int(stream.get('height') or 0),
+        'bitrate': int(bitrate),
+        'latency_ms': storage_latency_ms(video_path),
+    }
+
+
+def storage_latency_ms(video_path):
+    """Time a read from the middle of a file, where the OS is unlikely to have cached it."""
+    with open(video_path, 'rb', buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        f.seek(max(0, size // 2 - LATENCY_READ_BYTES))
+        started = time.perf_counter()
+        f.read(LATENCY_READ_BYTES)
+        return (time.perf_counter() - started) * 1000
+
+
+def choose_profile(properties):
+    """Return ``(name, media_options)`` of the libvlc profile suiting a video's probed properties.
+
+    ``input-fast-seek`` is never set: it would turn every seek into a keyframe
+    seek, and clip starts need accurate ones (the player snaps to keyframes
+    itself where it can).
+    """
+    height, bitrate = properties.get('height', 0), properties.get('bitrate', 0)
+    if bitrate > HEAVY_BITRATE or height > 1080:
+        # Skipping the loop filter on every frame halves H.264/HEVC decoding at a small cost in sharpness
+        name, options = "heavy", [":avcodec-skiploopfilter=4"]
+    elif height >= 720 or properties.get('codec') in ('hevc', 'av1', 'vp9'):
+        name, options = "hd", [":avcodec-skiploopfilter=1"]  # Non-reference frames only
+    else:
+        name, options = "light", []
+
+    # Buffer more of a file on slow storage so a stall on the share does not stall playback
+    if properties.get('latency_ms', 0.0) > SLOW_STORAGE_MS:
+        name += "+slow_storage"
+        options += [":file-caching=1500", ":network-caching=1500"]
+    else:
+        options += [":file-caching=300"]
+    return name, options
+
+
+class MediaProfileStore:
+    """Probed properties of videos, persisted in one JSON file and keyed by file identity."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.properties = None  # file identity -> properties, read on first use
+
+    def _load(self):
+        if self.properties is None:
+            try:
+                with open(self.path, 'r') as f:
+                    self.properties = json.load(f)
+            except (OSError, ValueError):
+                self.properties = {}
+
+    def get(self, video_path):
+        """Return the stored properties of a video, or None if it has not been probed since it last changed."""
+        try:
+            identity = file_identity(video_path)
+        except OSError:
+            return None
+        with self.lock:
+            self._load()
+            return self.properties.get(identity)
+
+    def probe(self, video_path):
+        """Probe a video, store its properties and return them."""
+        identity = file_identity(video_path)
+        properties = probe_properties(video_path)
+        with self.lock:
+            self._load()
+            self.properties[identity] = properties
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            atomic_write_json(self.path, self.properties)
+        return properties
@@ -0,0 +1,72 @@
+import os
+import random
+
+from clip_store import iter_clips_parallel
+
+
+def is_under(path, folder):
+    """Return True if ``path`` is inside ``folder``."""
+    folder = os.path.abspath(folder)
+    return os.path.abspath(path).startswith(folder.rstrip(os.sep) + os.sep)
+
+
+def build_playlist(clip_store, video_paths, video_ids, folder=None, since=None, sample=None, seed=None,
+                   clip_writer=None):
+    """Return the ``(video_path, clip)`` items of a practice playlist.
+
+    ``folder`` keeps the videos under a directory and ``since`` those whose file
+    was modified after a timestamp. Items run video by video in clip order,
+    unless ``sample`` picks that many clips at random, in random order. Edits
+    still queued on ``clip_writer`` are included.
+    """
+    selected = []
+    for video_id in sorted(video_ids):
+        video_path = video_paths.get(video_id)
+        if video_path is None or (folder and not is_under(video_path, folder)):
+            continue
+        if since is not None:
+            try:
+                if os.path.getmtime(video_path) < since:
+                    continue
+            except OSError:
+                continue
+        selected.append(video_id)
+
+    items = [(video_paths[video_id], clip)
+             for video_id, clips in iter_clips_parallel(clip_store, selected, clip_writer=clip_writer) for clip in clips]
+    if sample is not None:
+        items = random.Random(seed).sample(items, min(sample, len(items)))
+    return items
+
+
+class Playlist:
+    """Clips of many videos, played back to back from a cursor that wraps around."""
+
+    def __init__(self, items, name=""):
+        self.items = list(items)
+        self.name = name
+        self.position = -1  # Nothing played yet
+
+    def __len__(self):
+        return len(self.items)
+
+    def current(self):
+        return self.items[self.position] if 0 <= self.position < len(self.items) else None
+
+    def advance(self, step=1):
+        """Move the cursor by ``step`` items and return the item there, or None for an empty playlist."""
+        if not self.items:
+            return None
+        self.position = (self.position + step) % len(self.items)
+        return self.items[self.position]
+
+    def drop_current(self, step=1):
+        """Remove the current item, so that the next ``advance(step)`` goes on from where it was."""
+        del self.items[self.position]
+        if step > 0:
+            self.position -= 1  # The following items moved down by one
+
+    def upcoming(self, count):
+        """Return up to ``count`` items after the current one, wrapping around."""
+        count = min(count, len(self.items) - 1)
+        return [self.items[(self.position + i) % len(self.items)] for i in range(1, count + 1)]
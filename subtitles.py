@@ -0,0 +1,346 @@
+import os
+import re
+import bisect
+import sqlite3
+import threading
+
+from disk_cache import file_identity
+
+SUBTITLE_EXTENSIONS = ('.srt', '.ass', '.ssa')
+# Chinese encodings decode each other's bytes without errors, so they are told apart by how many of
+# the characters decoded fall in the encoding's block of common characters (GB2312 and Big5 level 1)
+CJK_ENCODINGS = {'gb18030': (b'\xb0\xa1', b'\xd7\xfe'), 'big5': (b'\xa4\x40', b'\xc6\x7e')}
+ENCODING_SAMPLE_CHARS = 20000
+
+SRT_TIME_RE = re.compile(
+    r"(\d+):(\d+):(\d+)[,.](\d+)\s*-->\s*(\d+):(\d+):(\d+)[,.](\d+)")
+ASS_TIME_RE = re.compile(r"(\d+):(\d+):(\d+)[.:](\d+)")
+HTML_TAG_RE = re.compile(r"<[^>]+>")
+ASS_TAG_RE = re.compile(r"\{[^}]*\}")
+WORD_RE = re.compile(r"[0-9a-z]+(?:'[a-z]+)?")
+CJK_RE = re.compile("[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af]+")
+
+
+def find_sidecars(video_path):
+    """Return the subtitle files next to a video that share its name (e.g. ``video.en.srt``)."""
+    directory = os.path.dirname(video_path)
+    stem = os.path.splitext(os.path.basename(video_path))[0]
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    return sorted(os.path.join(directory, name) for name in names
+                  if name.lower().endswith(SUBTITLE_EXTENSIONS)
+                  and (os.path.splitext(name)[0] == stem or name.startswith(stem + '.')))
+
+
+def read_text(path):
+    """Read a subtitle file, guessing its encoding."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:2] in (b'\xff\xfe', b'\xfe\xff'):
+        return data.decode('utf-16')
+    try:
+        return data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        pass
+    candidates = []
+    for encoding in CJK_ENCODINGS:
+        try:
+            candidates.append((encoding, data.decode(encoding)))
+        except UnicodeDecodeError:
+            continue
+    if candidates:
+        return max(candidates, key=lambda candidate: common_share(candidate[1], candidate[0]))[1]
+    return data.decode('latin-1')
+
+
+def common_share(text, encoding):
+    """Return the share of a decoded text's non-ASCII characters that are common characters of ``encoding``."""
+    low, high = CJK_ENCODINGS[encoding]
+    total = common = 0
+    for char in text[:ENCODING_SAMPLE_CHARS]:
+        if char < '\x80':
+            continue
+        total += 1
+        try:
+            encoded = char.encode(encoding)
+        except UnicodeEncodeError:
+            continue
+        common += len(encoded) == 2 and low <= encoded <= high
+    return common / total if total else 0.0
+
+
+def _seconds(hours, minutes, seconds, fraction):
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds) + int(fraction) / 10 ** len(fraction)
+
+
+def parse_srt(text):
+    """Parse SubRip text into (start, end, text) cues."""
+    cues = []
+    for block in re.split(r"\r?\n\s*\r?\n", text):
+        lines = block.strip().splitlines()
+        for i, line in enumerate(lines):
+            match = SRT_TIME_RE.search(line)
+            if match:
+                groups = match.groups()
+                cue_text = HTML_TAG_RE.sub("", "\n".join(lines[i + 1:])).strip()
+                if cue_text:
+                    cues.append((_seconds(*groups[:4]), _seconds(*groups[4:]), cue_text))
+                break
+    return cues
+
+
+def parse_ass(text):
+    """Parse Advanced SubStation Alpha text into (start, end, text) cues."""
+    cues = []
+    fields = ['layer', 'start', 'end', 'style', 'name', 'marginl', 'marginr', 'marginv', 'effect', 'text']
+    in_events = False
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith('['):
+            in_events = line.lower() == '[events]'
+        elif in_events and line.lower().startswith('format:'):
+            fields = [field.strip().lower() for field in line[7:].split(',')]
+        elif in_events and line.lower().startswith('dialogue:'):
+            values = line[9:].split(',', len(fields) - 1)
+            if len(values) < len(fields):
+                continue
+            event = dict(zip(fields, values))
+            start = ASS_TIME_RE.match(event['start'].strip())
+            end = ASS_TIME_RE.match(event['end'].strip())
+            cue_text = ASS_TAG_RE.sub("", event['text']).replace("\\N", "\n").replace("\\n", "\n").strip()
+            if start and end and cue_text:
+                cues.append((_seconds(*start.groups()), _seconds(*end.groups()), cue_text))
+    return cues
+
+
+def parse_subtitle_file(path):
+    text = read_text(path)
+    if path.lower().endswith('.srt'):
+        return parse_srt(text)
+    return parse_ass(text)
+
+
+class SubtitleTrack:
+    """Cues of one video, sorted by start time, answering "which cues are at time t" by bisection."""
+
+    def __init__(self, cues):
+        cues = sorted(cues)
+        self.starts = [cue[0] for cue in cues]
+        self.ends = [cue[1] for cue in cues]
+        self.texts = [cue[2] for cue in cues]
+        # Running maximum of the end times, so the backwards scan over overlapping cues can stop early
+        self.max_ends = []
+        running = float('-inf')
+        for end in self.ends:
+            running = max(running, end)
+            self.max_ends.append(running)
+        self.sorted_ends = sorted(self.ends)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def cues_at(self, time):
+        """Return the indexes of the cues shown at ``time`` seconds."""
+        i = bisect.bisect_right(self.starts, time) - 1
+        found = []
+        while i >= 0 and self.max_ends[i] > time:
+            if self.ends[i] > time:
+                found.append(i)
+            i -= 1
+        found.reverse()
+        return found
+
+    def text_at(self, time):
+        return "\n".join(self.texts[i] for i in self.cues_at(time))
+
+    def line_at(self, time):
+        """Return ``(start, end)`` of the cue shown at ``time``, else of the last cue before it, or None."""
+        cues = self.cues_at(time)
+        if cues:
+            return self.starts[cues[-1]], self.ends[cues[-1]]
+        i = bisect.bisect_right(self.starts, time) - 1
+        return (self.starts[i], self.ends[i]) if i >= 0 else None
+
+    def snap_start(self, time, window=1.5):
+        """Return the start of the cue enclosing ``time``, else the nearest cue start within ``window``."""
+        cues = self.cues_at(time)
+        if cues:
+            return self.starts[cues[-1]]
+        return _nearest(self.starts, time, window)
+
+    def snap_end(self, time, window=1.5):
+        """Return the end of the cue enclosing ``time``, else the nearest cue end within ``window``."""
+        cues = self.cues_at(time)
+        if cues:
+            return self.ends[cues[0]]
+        return _nearest(self.sorted_ends, time, window)
+
+    def lines(self):
+        """Return the distinct ``(start, end)`` pairs of all cues; bilingual duplicates appear once."""
+        return sorted(set(zip(self.starts, self.ends)))
+
+
+def _nearest(boundaries, time, window):
+    """Return the value of a sorted list nearest to ``time`` if it is within ``window``, else None."""
+    i = bisect.bisect_left(boundaries, time)
+    candidates = [boundaries[j] for j in (i - 1, i) if 0 <= j < len(boundaries)]
+    if not candidates:
+        return None
+    best = min(candidates, key=lambda b: abs(b - time))
+    return best if abs(best - time) <= window else None
+
+
+def load_track(video_path):
+    """Parse every sidecar subtitle of a video into a single track (bilingual files are merged)."""
+    cues = []
+    for path in find_sidecars(video_path):
+        try:
+            cues.extend(parse_subtitle_file(path))
+        except OSError:
+            continue
+    return SubtitleTrack(cues)
+
+
+class SubtitleLibrary:
+    """Lazily parsed subtitle tracks, one per video path."""
+
+    def __init__(self):
+        self.tracks = {}
+        self.lock = threading.Lock()
+
+    def track(self, video_path):
+        with self.lock:
+            if video_path not in self.tracks:
+                self.tracks[video_path] = load_track(video_path)
+            return self.tracks[video_path]
+
+
+def tokenize(text):
+    """Split text into search tokens: lowercase words, plus single characters and bigrams of CJK runs."""
+    text = text.lower()
+    tokens = WORD_RE.findall(text)
+    for run in CJK_RE.findall(text):
+        tokens.extend(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def query_tokens(phrase):
+    """Return the tokens a cue must contain to possibly match a phrase."""
+    phrase = phrase.lower()
+    tokens = WORD_RE.findall(phrase)
+    for run in CJK_RE.findall(phrase):
+        tokens.extend([run] if len(run) == 1 else [run[i:i + 2] for i in range(len(run) - 1)])
+    return sorted(set(tokens))
+
+
+class SubtitleSearchIndex:
+    """Persistent inverted index over the subtitle cues of the whole library."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS files (
+        id INTEGER PRIMARY KEY,
+        path TEXT UNIQUE NOT NULL,
+        identity TEXT NOT NULL,
+        video_id TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS cues (
+        id INTEGER PRIMARY KEY,
+        file_id INTEGER NOT NULL,
+        start REAL NOT NULL,
+        end REAL NOT NULL,
+        text TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS cues_file ON cues (file_id);
+    CREATE TABLE IF NOT EXISTS postings (
+        token TEXT NOT NULL,
+        cue_id INTEGER NOT NULL,
+        PRIMARY KEY (token, cue_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS postings_cue ON postings (cue_id);
+    """
+
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def _remove_file(self, file_id):
+        self.conn.execute("DELETE FROM postings WHERE cue_id IN (SELECT id FROM cues WHERE file_id = ?)", (file_id,))
+        self.conn.execute("DELETE FROM cues WHERE file_id = ?", (file_id,))
+        self.conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def update(self, video_paths):
+        """Index the sidecar subtitles of a basename -> path dictionary of videos.
+
+        Files whose identity did not change since the last update are skipped,
+        and files that disappeared are dropped. Returns the number of files indexed.
+        """
+        with self.lock:
+            known = {path: (file_id, identity) for file_id, path, identity
+                     in self.conn.execute("SELECT id, path, identity FROM files")}
+        seen, indexed = set(), 0
+        for video_id, video_path in video_paths.items():
+            for path in find_sidecars(video_path):
+                seen.add(path)
+                try:
+                    identity = file_identity(path)
+                except OSError:
+                    continue
+                if known.get(path, (None, None))[1] == identity:
+                    continue
+                try:
+                    cues = parse_subtitle_file(path)
+                except OSError:
+                    continue
+                with self.lock, self.conn:
+                    if path in known:
+                        self._remove_file(known[path][0])
+                    file_id = self.conn.execute(
+                        "INSERT INTO files (path, identity, video_id) VALUES (?, ?, ?)",
+                        (path, identity, video_id)).lastrowid
+                    for start, end, text in cues:
+                        cue_id = self.conn.execute(
+                            "INSERT INTO cues (file_id, start, end, text) VALUES (?, ?, ?, ?)",
+                            (file_id, start, end, text)).lastrowid
+                        self.conn.executemany(
+                            "INSERT OR IGNORE INTO postings (token, cue_id) VALUES (?, ?)",
+                            [(token, cue_id) for token in set(tokenize(text))])
+                indexed += 1
+        with self.lock, self.conn:
+            for path in set(known) - seen:
+                self._remove_file(known[path][0])
+        return indexed
+
+    def search(self, phrase, limit=200):
+        """Return up to ``limit`` ``(video_id, start, end, text)`` hits for cues containing a phrase."""
+        tokens = query_tokens(phrase)
+        if not tokens:
+            return []
+        needle = " ".join(phrase.lower().split())
+        placeholders = ",".join("?" * len(tokens))
+        hits = []
+        with self.lock:
+            cursor = self.conn.execute(
+                f"""SELECT files.video_id, cues.start, cues.end, cues.text FROM cues
+                    JOIN files ON files.id = cues.file_id
+                    WHERE cues.id IN (
+                        SELECT cue_id FROM postings WHERE token IN ({placeholders})
+                        GROUP BY cue_id HAVING COUNT(*) = ?)
+                    ORDER BY files.video_id, cues.start""",
+                (*tokens, len(tokens)))
+            # The postings only say every token occurs; check the phrase itself, stopping at the limit
+            for row in cursor:
+                if needle in " ".join(row[3].lower().split()):
+                    hits.append(row)
+                    if len(hits) >= limit:
+                        break
+        return hits
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
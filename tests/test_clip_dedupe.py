@@ -0,0 +1,49 @@
+from clip_dedupe import merge_clips, dedupe_video
+from clip_store import ClipWriter, JsonClipStore, make_clip
+
+CLIPS = [
+    make_clip((10, 20), 'a'),
+    make_clip((10.1, 12), 'b'),
+    make_clip((10.2, 20.1), 'c'),
+    make_clip((30, 31), 'd'),
+    make_clip((30.9, 35), 'e'),
+]
+
+
+def summary(kept, dropped):
+    return ([(clip['id'], tuple(clip['positions'])) for clip in kept],
+            [(clip['id'], target) for clip, target in dropped])
+
+
+def test_merge_clips_drops_near_duplicates():
+    assert summary(*merge_clips(CLIPS)) == (
+        [('a', (10, 20)), ('b', (10.1, 12)), ('d', (30, 31)), ('e', (30.9, 35))],
+        [('c', 'a')])
+
+
+def test_merge_clips_merges_overlaps():
+    assert summary(*merge_clips(CLIPS, merge_overlaps=True)) == (
+        [('a', (10, 20.1)), ('d', (30, 35))],
+        [('b', 'a'), ('c', 'a'), ('e', 'd')])
+    assert [tuple(clip['positions']) for clip in CLIPS][0] == (10, 20)  # The input is not modified
+
+
+def test_merge_clips_tolerance():
+    clips = [make_clip((1, 2), 'a'), make_clip((1.5, 2.5), 'b')]
+    assert summary(*merge_clips(clips))[1] == []
+    assert summary(*merge_clips(clips, tolerance=0.5))[1] == [('b', 'a')]
+
+
+def test_dedupe_video_through_the_writer_keeps_queued_edits(tmp_path):
+    store = JsonClipStore(str(tmp_path))
+    store.add_clips('v.mp4', CLIPS[:3])
+    writer = ClipWriter(store, debounce=10, max_delay=10)
+    try:
+        writer.add_clips('v.mp4', [make_clip((40, 41), 'f')])
+        kept, dropped = dedupe_video(store, 'v.mp4', clip_writer=writer)
+        writer.add_clips('v.mp4', [make_clip((50, 51), 'g')])
+        assert [clip['id'] for clip, _ in dropped] == ['c']
+        assert writer.flush(timeout=5)
+        assert [clip['id'] for clip in store.clips_for_video('v.mp4')] == ['a', 'b', 'f', 'g']
+    finally:
+        writer.close()
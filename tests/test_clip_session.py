@@ -0,0 +1,116 @@
+import pytest
+
+from clip_session import ClipSession
+from clip_store import ClipWriter, JsonClipStore, make_clip
+from playlist import build_playlist
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JsonClipStore(str(tmp_path / "config"))
+    store.add_clips('a.mp4', [make_clip((1, 2), 'a1'), make_clip((5, 6), 'a2')])
+    store.add_clips('b.mp4', [make_clip((3, 4), 'b1')])
+    return store
+
+
+@pytest.fixture
+def writer(store):
+    # Nothing is written unless flushed, so the tests see only queued changes
+    writer = ClipWriter(store, debounce=10, max_delay=10)
+    yield writer
+    writer.close()
+
+
+def positions(clips):
+    return [tuple(clip['positions']) for clip in clips]
+
+
+def test_add_clip_keeps_rows_sorted_and_saves(store):
+    session = ClipSession(store)
+    session.load_clips('a.mp4')
+    assert session.add_clip(3, 4) == 1
+    assert session.add_clip(0, 0.5) == 0
+    assert positions(session.favorites) == [(0, 0.5), (1, 2), (3, 4), (5, 6)]
+    assert positions(store.clips_for_video('a.mp4')) == [(0, 0.5), (1, 2), (3, 4), (5, 6)]
+
+
+def test_delete_clip_by_id_of_the_open_video(store):
+    session = ClipSession(store)
+    session.load_clips('a.mp4')
+    assert session.delete_clip_by_id('a2') == ('a.mp4', 1)
+    assert positions(session.favorites) == [(1, 2)]
+    assert positions(store.clips_for_video('a.mp4')) == [(1, 2)]
+
+
+def test_delete_clip_by_id_of_another_video(store):
+    session = ClipSession(store)
+    session.load_clips('a.mp4')
+    session.clips_of('b.mp4')
+    assert session.delete_clip_by_id('b1') == ('b.mp4', None)
+    assert session.video_clips['b.mp4'] == []
+    assert positions(session.favorites) == [(1, 2), (5, 6)]
+    assert store.clips_for_video('b.mp4') == []
+    assert session.delete_clip_by_id('b1') is None
+
+
+def test_delete_clip_by_id_of_a_video_not_read_yet(store):
+    session = ClipSession(store)
+    assert session.delete_clip_by_id('b1') == ('b.mp4', None)
+    assert store.get_clip('b1') is None
+
+
+def test_queued_edits_are_visible_before_they_are_written(store, writer):
+    session = ClipSession(store, writer)
+    session.load_clips('a.mp4')
+    session.add_clip(7, 8)
+    session.delete_clip_by_id('a1')
+
+    other = ClipSession(store, writer)
+    assert positions(other.read_clips('a.mp4')) == [(5, 6), (7, 8)]
+    assert other.find_clip('a1') is None
+    assert positions(store.clips_for_video('a.mp4')) == [(1, 2), (5, 6)]
+
+    assert writer.flush(timeout=5)
+    assert positions(store.clips_for_video('a.mp4')) == [(5, 6), (7, 8)]
+
+
+def test_delete_clip_by_id_finds_a_clip_still_queued(store, writer):
+    session = ClipSession(store, writer)
+    session.load_clips('b.mp4')
+    session.add_clip(8, 9)
+    clip_id = session.favorites[-1]['id']
+
+    other = ClipSession(store, writer)
+    assert other.delete_clip_by_id(clip_id) == ('b.mp4', None)
+    assert writer.flush(timeout=5)
+    assert positions(store.clips_for_video('b.mp4')) == [(3, 4)]
+
+
+def test_videos_with_clips_includes_queued_videos(store, writer):
+    session = ClipSession(store, writer)
+    session.load_clips('c.mp4')
+    session.add_clip(1, 2)
+    video_paths = {'a.mp4': '/v/a.mp4', 'c.mp4': '/v/c.mp4'}
+    assert session.videos_with_clips(video_paths) == ['a.mp4', 'c.mp4']
+
+
+def test_build_playlist_includes_queued_edits(store, writer):
+    session = ClipSession(store, writer)
+    session.load_clips('a.mp4')
+    session.add_clip(7, 8)
+    session.delete_clip_by_id('b1')
+
+    video_paths = {'a.mp4': '/v/a.mp4', 'b.mp4': '/v/b.mp4'}
+    items = build_playlist(store, video_paths, ['a.mp4', 'b.mp4'], clip_writer=writer)
+    assert [(path, tuple(clip['positions'])) for path, clip in items] == [
+        ('/v/a.mp4', (1, 2)), ('/v/a.mp4', (5, 6)), ('/v/a.mp4', (7, 8))]
+
+
+def test_dedupe_clips_replaces_the_open_video_once(store):
+    session = ClipSession(store)
+    session.load_clips('a.mp4')
+    session.add_clip(1.1, 2.1)
+    dropped = session.dedupe_clips()
+    assert [target for _, target in dropped] == ['a1']
+    assert positions(session.favorites) == [(1, 2), (5, 6)]
+    assert positions(store.clips_for_video('a.mp4')) == [(1, 2), (5, 6)]
@@ -0,0 +1,173 @@
+import time
+import threading
+
+import pytest
+
+from clip_store import (ClipWriter, JsonClipStore, SQLiteClipStore, make_clip, overlay_ops, overlay_clip,
+                        iter_clips_parallel)
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'json':
+        store = JsonClipStore(str(tmp_path / "config"))
+    else:
+        store = SQLiteClipStore(str(tmp_path / "cache" / "clips.sqlite3"))
+    yield store
+    store.close()
+
+
+def spans(clips):
+    return [(clip['id'], tuple(clip['positions'])) for clip in clips]
+
+
+def test_overlay_ops_applies_operations_in_order():
+    a, b, c = make_clip((1, 2), 'a'), make_clip((3, 4), 'b'), make_clip((0, 5), 'c')
+    ops = [
+        ('add', 'v.mp4', [c]),
+        ('delete', 'a'),
+        ('add', 'other.mp4', [make_clip((9, 9.5), 'x')]),
+        ('update', 'v.mp4', lambda clips: clips + [make_clip((7, 8), 'd')]),
+    ]
+    assert spans(overlay_ops('v.mp4', [a, b], ops)) == [('c', (0, 5)), ('b', (3, 4)), ('d', (7, 8))]
+    assert spans(overlay_ops('v.mp4', [a, b], [('replace', 'v.mp4', [c])])) == [('c', (0, 5))]
+    # The clips read from the store are not modified
+    assert spans([a, b]) == [('a', (1, 2)), ('b', (3, 4))]
+
+
+def test_overlay_clip_follows_adds_deletes_and_replaces():
+    a = make_clip((1, 2), 'a')
+    assert overlay_clip('a', None, [('add', 'v.mp4', [a])]) == ('v.mp4', a)
+    assert overlay_clip('a', ('v.mp4', a), [('delete', 'a')]) is None
+    assert overlay_clip('a', ('v.mp4', a), [('replace', 'v.mp4', [])]) is None
+    assert overlay_clip('a', ('v.mp4', a), [('replace', 'w.mp4', [])]) == ('v.mp4', a)
+    assert overlay_clip('a', None, [('add', 'v.mp4', [a]), ('delete', 'a'), ('add', 'w.mp4', [a])]) == ('w.mp4', a)
+
+
+def test_apply_batch(store):
+    store.add_clips('v.mp4', [make_clip((5, 6), 'a'), make_clip((1, 2), 'b')])
+    store.apply([
+        ('add', 'v.mp4', [make_clip((3, 4), 'c')]),
+        ('delete', 'b'),
+        ('update', 'v.mp4', lambda clips: [clip for clip in clips if clip['id'] != 'a']),
+        ('replace', 'w.mp4', [make_clip((0, 1), 'd')]),
+    ])
+    assert spans(store.clips_for_video('v.mp4')) == [('c', (3, 4))]
+    assert store.get_clip('d') == ('w.mp4', {'id': 'd', 'positions': (0, 1)})
+    assert store.get_clip('b') is None
+    assert store.video_ids() == ['v.mp4', 'w.mp4']
+
+
+def test_writer_coalesces_a_burst_into_one_batch(store):
+    batches = []
+    writer = ClipWriter(store, debounce=0.2, max_delay=5.0, on_written=lambda count, ms, error: batches.append(count))
+    try:
+        for i in range(5):
+            writer.add_clips('v.mp4', [make_clip((i, i + 0.5), f"c{i}")])
+        assert writer.has_pending()
+        assert store.clips_for_video('v.mp4') == []  # Nothing is written before the debounce
+        deadline = time.monotonic() + 5
+        while writer.has_pending() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert batches == [5]
+        assert len(store.clips_for_video('v.mp4')) == 5
+    finally:
+        writer.close()
+
+
+def test_writer_writes_after_max_delay_despite_a_steady_stream(store):
+    writer = ClipWriter(store, debounce=0.3, max_delay=0.5)
+    try:
+        started = time.monotonic()
+        i = 0
+        while writer.stats()['writes'] == 0 and time.monotonic() - started < 3:
+            writer.add_clips('v.mp4', [make_clip((i, i + 0.5), f"c{i}")])
+            i += 1
+            time.sleep(0.05)
+        assert writer.stats()['writes'] == 1
+        assert time.monotonic() - started < 1.5
+    finally:
+        writer.close()
+
+
+def test_writer_replace_supersedes_queued_changes_to_the_video(store):
+    writer = ClipWriter(store, debounce=10, max_delay=10)
+    try:
+        writer.add_clips('v.mp4', [make_clip((1, 2), 'a')])
+        writer.add_clips('w.mp4', [make_clip((1, 2), 'b')])
+        writer.replace_clips('v.mp4', [make_clip((3, 4), 'c')])
+        assert [op[0] for op in writer.pending] == ['add', 'replace']
+        assert writer.flush(timeout=5)
+        assert spans(store.clips_for_video('v.mp4')) == [('c', (3, 4))]
+        assert spans(store.clips_for_video('w.mp4')) == [('b', (1, 2))]
+    finally:
+        writer.close()
+
+
+def test_writer_read_returns_the_changes_not_yet_written(store):
+    store.add_clips('v.mp4', [make_clip((1, 2), 'a')])
+    writer = ClipWriter(store, debounce=10, max_delay=10)
+    try:
+        writer.add_clips('v.mp4', [make_clip((3, 4), 'b')])
+        writer.delete_clip('a')
+        clips, ops = writer.read(store.clips_for_video, 'v.mp4')
+        assert spans(clips) == [('a', (1, 2))]
+        assert spans(overlay_ops('v.mp4', clips, ops)) == [('b', (3, 4))]
+        found, ops = writer.read(store.get_clip, 'b')
+        assert overlay_clip('b', found, ops) == ('v.mp4', {'id': 'b', 'positions': (3, 4)})
+
+        assert writer.flush(timeout=5)
+        clips, ops = writer.read(store.clips_for_video, 'v.mp4')
+        assert ops == []
+        assert spans(clips) == [('b', (3, 4))]
+    finally:
+        writer.close()
+
+
+def test_writer_read_includes_the_batch_being_written(tmp_path):
+    store = JsonClipStore(str(tmp_path))
+    release = threading.Event()
+    applying = threading.Event()
+    apply = store.apply
+
+    def slow_apply(ops):
+        applying.set()
+        release.wait(5)
+        apply(ops)
+
+    store.apply = slow_apply
+    writer = ClipWriter(store, debounce=0, max_delay=0)
+    try:
+        writer.add_clips('v.mp4', [make_clip((1, 2), 'a')])
+        assert applying.wait(5)
+        clips, ops = writer.read(store.clips_for_video, 'v.mp4')
+        assert spans(overlay_ops('v.mp4', clips, ops)) == [('a', (1, 2))]
+        release.set()
+        assert writer.flush(timeout=5)
+    finally:
+        release.set()
+        writer.close()
+
+
+def test_writer_update_sees_the_changes_queued_before_it(store):
+    writer = ClipWriter(store, debounce=10, max_delay=10)
+    try:
+        writer.add_clips('v.mp4', [make_clip((1, 2), 'a'), make_clip((3, 4), 'b')])
+        writer.update('v.mp4', lambda clips: [clip for clip in clips if clip['id'] != 'a'])
+        writer.add_clips('v.mp4', [make_clip((5, 6), 'c')])
+        assert writer.flush(timeout=5)
+        assert spans(store.clips_for_video('v.mp4')) == [('b', (3, 4)), ('c', (5, 6))]
+    finally:
+        writer.close()
+
+
+def test_iter_clips_parallel_includes_queued_changes(store):
+    store.add_clips('v.mp4', [make_clip((1, 2), 'a')])
+    writer = ClipWriter(store, debounce=10, max_delay=10)
+    try:
+        writer.add_clips('w.mp4', [make_clip((3, 4), 'b')])
+        writer.delete_clip('a')
+        results = dict(iter_clips_parallel(store, ['v.mp4', 'w.mp4'], clip_writer=writer))
+        assert results == {'v.mp4': [], 'w.mp4': [{'id': 'b', 'positions': (3, 4)}]}
+    finally:
+        writer.close()
@@ -0,0 +1,102 @@
+import os
+
+from library_index import LibraryIndex
+
+
+def touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'wb').close()
+    bump_mtime(os.path.dirname(path))
+
+
+def bump_mtime(dir_path):
+    # Directory mtimes have a coarse granularity; make every change visible to the index
+    stat = os.stat(dir_path)
+    os.utime(dir_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def make_library(tmp_path):
+    base = tmp_path / "videos"
+    touch(str(base / "a.mp4"))
+    touch(str(base / "show" / "b.mp4"))
+    touch(str(base / "show" / "notes.txt"))
+    touch(str(base / "show" / "season" / "c.mp4"))
+    return str(base), LibraryIndex(str(base), str(tmp_path / "cache" / "library_index.json"))
+
+
+def test_reconcile_finds_every_video_and_saves(tmp_path):
+    base, index = make_library(tmp_path)
+    added, removed = index.reconcile()
+    assert added == {
+        'a.mp4': os.path.join(base, "a.mp4"),
+        'b.mp4': os.path.join(base, "show", "b.mp4"),
+        'c.mp4': os.path.join(base, "show", "season", "c.mp4"),
+    }
+    assert removed == []
+
+    reloaded = LibraryIndex(base, index.index_path)
+    assert reloaded.load() == added
+    assert reloaded.reconcile() == ({}, [])
+
+
+def test_reconcile_reports_changes(tmp_path):
+    base, index = make_library(tmp_path)
+    index.reconcile()
+    os.remove(os.path.join(base, "a.mp4"))
+    bump_mtime(base)
+    touch(os.path.join(base, "show", "season", "d.mp4"))
+
+    added, removed = index.reconcile()
+    assert added == {'d.mp4': os.path.join(base, "show", "season", "d.mp4")}
+    assert removed == [os.path.join(base, "a.mp4")]
+
+
+def test_reconcile_drops_a_deleted_subtree(tmp_path):
+    base, index = make_library(tmp_path)
+    index.reconcile()
+    os.rename(os.path.join(base, "show"), os.path.join(str(tmp_path), "moved"))
+    bump_mtime(base)
+
+    added, removed = index.reconcile()
+    assert added == {}
+    assert sorted(removed) == [os.path.join(base, "show", "b.mp4"), os.path.join(base, "show", "season", "c.mp4")]
+    assert index.video_paths() == {'a.mp4': os.path.join(base, "a.mp4")}
+
+
+def test_reconcile_streams_batches(tmp_path):
+    base, index = make_library(tmp_path)
+    batches = []
+    added, _ = index.reconcile(on_batch=lambda added, removed: batches.append(sorted(added)), batch_size=1)
+    assert len(batches) >= 2
+    assert sorted(name for batch in batches for name in batch) == sorted(added)
+
+
+def test_reconcile_skips_unchanged_directories(tmp_path, monkeypatch):
+    base, index = make_library(tmp_path)
+    index.reconcile()
+    listed = []
+    list_dir = index._list_dir
+    monkeypatch.setattr(index, '_list_dir', lambda dir_path: listed.append(dir_path) or list_dir(dir_path))
+    touch(os.path.join(base, "show", "e.mp4"))
+
+    index.reconcile()
+    assert listed == [os.path.join(base, "show")]
+
+
+def test_refresh_dir(tmp_path):
+    base, index = make_library(tmp_path)
+    index.reconcile()
+    touch(os.path.join(base, "show", "season", "f.mp4"))
+    touch(os.path.join(base, "g.mp4"))
+
+    assert index.refresh_dir(os.path.join(base, "show"), recursive=False) == ({}, [])
+    added, removed = index.refresh_dir(os.path.join(base, "show"))
+    assert added == {'f.mp4': os.path.join(base, "show", "season", "f.mp4")}
+    assert removed == []
+    assert 'g.mp4' not in index.video_paths()
+
+
+def test_load_ignores_an_index_of_another_root(tmp_path):
+    base, index = make_library(tmp_path)
+    index.reconcile()
+    assert LibraryIndex(str(tmp_path), index.index_path).load() == {}
@@ -0,0 +1,45 @@
+from playlist import Playlist, is_under
+
+
+def test_advance_wraps_around():
+    playlist = Playlist(['a', 'b', 'c'])
+    assert playlist.current() is None
+    assert [playlist.advance() for _ in range(4)] == ['a', 'b', 'c', 'a']
+    assert playlist.advance(-1) == 'c'
+    assert playlist.advance(-1) == 'b'
+
+
+def test_advance_on_an_empty_playlist():
+    playlist = Playlist([])
+    assert playlist.advance() is None
+    assert playlist.current() is None
+    assert playlist.upcoming(3) == []
+
+
+def test_upcoming_wraps_and_never_repeats_the_current_item():
+    playlist = Playlist(['a', 'b', 'c'])
+    playlist.advance()
+    assert playlist.upcoming(2) == ['b', 'c']
+    playlist.advance(2)
+    assert playlist.upcoming(5) == ['a', 'b']
+    assert Playlist(['a']).upcoming(3) == []
+
+
+def test_drop_current_goes_on_in_the_same_direction():
+    items = ['a', 'b', 'c', 'd']
+    playlist = Playlist(items)
+    playlist.advance()
+    playlist.advance()
+    playlist.drop_current()
+    assert playlist.advance() == 'c'
+
+    playlist.drop_current(-1)
+    assert playlist.advance(-1) == 'a'
+    assert playlist.items == ['a', 'd']
+    assert items == ['a', 'b', 'c', 'd']  # The caller's list is not modified
+
+
+def test_is_under():
+    assert is_under('/videos/show/a.mp4', '/videos')
+    assert is_under('/videos/show/a.mp4', '/videos/')
+    assert not is_under('/videos2/a.mp4', '/videos')
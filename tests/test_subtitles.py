@@ -0,0 +1,143 @@
+import os
+
+import pytest
+
+from subtitles import (SubtitleSearchIndex, SubtitleTrack, find_sidecars, load_track, parse_ass, parse_srt,
+                       query_tokens, read_text, tokenize)
+
+SRT = """1
+00:00:01,000 --> 00:00:02,500
+<i>Hello</i> there
+
+2
+00:00:03,000 --> 00:00:04,000
+General Kenobi
+
+3
+00:00:05,000 --> 00:00:06,000
+
+"""
+
+ASS = r"""[Script Info]
+Title: test
+
+[V4+ Styles]
+Format: Name, Fontname
+Style: Default,Arial
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 0,0:00:01.00,0:00:02.50,Default,,0,0,0,,{\b1}Hello{\b0}, there\Nfriend
+Comment: 0,0:00:02.00,0:00:03.00,Default,,0,0,0,,not shown
+Dialogue: 0,0:01:00.25,0:01:01.00,Default,,0,0,0,,你好
+"""
+
+
+def test_parse_srt():
+    assert parse_srt(SRT) == [(1.0, 2.5, "Hello there"), (3.0, 4.0, "General Kenobi")]
+    assert parse_srt(SRT.replace("\n", "\r\n")) == parse_srt(SRT)
+
+
+def test_parse_ass():
+    assert parse_ass(ASS) == [(1.0, 2.5, "Hello, there\nfriend"), (60.25, 61.0, "你好")]
+
+
+def test_read_text_tells_chinese_encodings_apart(tmp_path):
+    simplified = "我们今天去学校上课，然后回家吃饭。这个问题很重要。"
+    traditional = "我們今天去學校上課，然後回家吃飯。這個問題很重要。"
+    for encoding, text in (('gb18030', simplified), ('big5', traditional), ('utf-8', simplified),
+                           ('utf-16', traditional)):
+        path = tmp_path / f"{encoding}.srt"
+        path.write_bytes(text.encode(encoding))
+        assert read_text(str(path)) == text
+
+
+def test_find_sidecars_matches_the_whole_stem(tmp_path):
+    for name in ("x.mp4", "x.srt", "x.en.ass", "x2.srt", "x.txt", "y.srt"):
+        (tmp_path / name).write_text("")
+    video_path = str(tmp_path / "x.mp4")
+    assert [os.path.basename(path) for path in find_sidecars(video_path)] == ["x.en.ass", "x.srt"]
+
+
+@pytest.fixture
+def track():
+    return SubtitleTrack([(5.0, 6.0, "b"), (1.0, 2.0, "a"), (1.5, 4.0, "overlap"), (10.0, 11.0, "c")])
+
+
+def test_track_cues_at(track):
+    assert len(track) == 4
+    assert track.text_at(1.6) == "a\noverlap"
+    assert track.text_at(3.0) == "overlap"
+    assert track.text_at(4.5) == ""
+    assert track.line_at(4.5) == (1.5, 4.0)
+    assert track.line_at(0.5) is None
+
+
+def test_track_snap_start(track):
+    assert track.snap_start(1.7) == 1.5  # The latest cue enclosing the time
+    assert track.snap_start(4.5) == 5.0
+    assert track.snap_start(8.0) is None
+    assert track.snap_start(8.0, window=2.5) == 10.0
+
+
+def test_track_snap_end(track):
+    assert track.snap_end(1.7) == 2.0  # The earliest cue enclosing the time
+    assert track.snap_end(4.5) == 4.0
+    assert track.snap_end(8.0) is None
+    assert track.snap_end(8.0, window=2.0) == 6.0
+
+
+def test_track_lines_merge_bilingual_cues():
+    track = SubtitleTrack([(1.0, 2.0, "Hello"), (1.0, 2.0, "你好"), (3.0, 4.0, "Bye")])
+    assert track.lines() == [(1.0, 2.0), (3.0, 4.0)]
+    assert track.text_at(1.5) == "Hello\n你好"
+
+
+def test_load_track_merges_sidecars(tmp_path):
+    (tmp_path / "x.en.srt").write_text(SRT, encoding='utf-8')
+    (tmp_path / "x.zh.ass").write_text(ASS, encoding='utf-8')
+    track = load_track(str(tmp_path / "x.mp4"))
+    assert len(track) == 4
+    assert track.text_at(1.2) == "Hello there\nHello, there\nfriend"
+
+
+def test_tokenize_and_query_tokens():
+    assert tokenize("Don't STOP 你好吗") == ["don't", "stop", "你", "好", "吗", "你好", "好吗"]
+    assert query_tokens("stop 你好吗") == ["stop", "你好", "好吗"]
+    assert query_tokens("你") == ["你"]
+
+
+@pytest.fixture
+def video_paths(tmp_path):
+    (tmp_path / "a.en.srt").write_text(SRT, encoding='utf-8')
+    (tmp_path / "b.zh.ass").write_text(ASS, encoding='utf-8')
+    return {'a.mp4': str(tmp_path / "a.mp4"), 'b.mp4': str(tmp_path / "b.mp4")}
+
+
+@pytest.fixture
+def index(tmp_path, video_paths):
+    index = SubtitleSearchIndex(str(tmp_path / "cache" / "subtitles.sqlite3"))
+    assert index.update(video_paths) == 2
+    yield index
+    index.close()
+
+
+def test_search_matches_the_phrase(index):
+    assert index.search("hello there") == [('a.mp4', 1.0, 2.5, "Hello there")]
+    assert index.search("there hello") == []  # Every token occurs, but not the phrase
+    assert index.search("THERE  friend") == [('b.mp4', 1.0, 2.5, "Hello, there\nfriend")]
+    assert index.search("你好") == [('b.mp4', 60.25, 61.0, "你好")]
+    assert index.search("!!") == []
+
+
+def test_search_limit(index):
+    assert len(index.search("hello")) == 2
+    assert index.search("hello", limit=1) == [('a.mp4', 1.0, 2.5, "Hello there")]
+
+
+def test_update_skips_unchanged_files_and_drops_removed_ones(index, video_paths):
+    assert index.update(video_paths) == 0
+    os.remove(os.path.join(os.path.dirname(video_paths['a.mp4']), "a.en.srt"))
+    assert index.update(video_paths) == 0
+    assert index.search("kenobi") == []
+    assert len(index.search("hello")) == 1
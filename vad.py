@@ -0,0 +1,167 @@
+import os
+import numpy as np
+
+from audio_decode import SAMPLE_RATE, iter_audio_chunks
+from disk_cache import file_identity
+
+FRAME_SECONDS = 0.02
+ENERGY_MARGIN_DB = 12.0  # How far above the noise floor a frame must be to count as speech
+VOICED_ZCR = 0.25  # Voiced speech crosses zero less often than noise and fricatives
+MIN_SPEECH_SECONDS = 0.15
+MAX_GAP_SECONDS = 0.3  # Pauses shorter than this do not split a speech interval
+SNAP_PADDING = 0.1  # Seconds kept before an onset and after an offset so words are not clipped
+
+
+class SpeechDetector:
+    """Energy / zero-crossing voice activity detector fed with streaming sample chunks."""
+
+    def __init__(self, sample_rate=SAMPLE_RATE, frame_seconds=FRAME_SECONDS):
+        self.sample_rate = sample_rate
+        self.frame = int(sample_rate * frame_seconds)
+        self.energies, self.zcrs = [], []
+        self.leftover = np.empty(0, dtype=np.float32)
+
+    def add(self, chunk):
+        samples = np.concatenate((self.leftover, chunk)) if self.leftover.size else chunk
+        usable = samples.size - samples.size % self.frame
+        frames = samples[:usable].reshape(-1, self.frame)
+        self.leftover = samples[usable:]
+        if not len(frames):
+            return
+        self.energies.append(10 * np.log10(np.mean(frames * frames, axis=1) + 1e-10))
+        signs = np.signbit(frames)
+        self.zcrs.append(np.mean(signs[:, 1:] != signs[:, :-1], axis=1))
+
+    def intervals(self):
+        """Return the detected speech as a sorted float64 array of (start, end) seconds."""
+        if not self.energies:
+            return np.zeros((0, 2))
+        energy = np.concatenate(self.energies)
+        zcr = np.concatenate(self.zcrs)
+
+        noise_floor = np.percentile(energy, 10)
+        speech = (energy > noise_floor + ENERGY_MARGIN_DB) | (
+            (energy > noise_floor + ENERGY_MARGIN_DB / 2) & (zcr < VOICED_ZCR))
+
+        # Turn the frame mask into runs of speech
+        edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        if not len(starts):
+            return np.zeros((0, 2))
+
+        frame_seconds = self.frame / self.sample_rate
+        intervals = np.stack((starts, ends), axis=1) * frame_seconds
+
+        # Merge runs separated by short pauses, then drop blips
+        gaps = intervals[1:, 0] - intervals[:-1, 1]
+        new_run = np.concatenate(([True], gaps > MAX_GAP_SECONDS))
+        merged = np.stack((intervals[new_run, 0],
+                           np.maximum.reduceat(intervals[:, 1], np.flatnonzero(new_run))), axis=1)
+        return merged[merged[:, 1] - merged[:, 0] >= MIN_SPEECH_SECONDS]
+
+
+def detect_speech(chunks, sample_rate=SAMPLE_RATE):
+    """Return the speech intervals of a stream of sample chunks."""
+    detector = SpeechDetector(sample_rate)
+    for chunk in chunks:
+        detector.add(chunk)
+    return detector.intervals()
+
+
+def snap_start(intervals, time, window=1.0):
+    """Return the speech onset nearest to ``time`` (minus padding), or None if none is within ``window``."""
+    return _nearest(intervals[:, 0], time, window, -SNAP_PADDING) if len(intervals) else None
+
+
+def snap_end(intervals, time, window=1.0):
+    """Return the speech offset nearest to ``time`` (plus padding), or None if none is within ``window``."""
+    return _nearest(intervals[:, 1], time, window, SNAP_PADDING) if len(intervals) else None
+
+
+def _nearest(boundaries, time, window, padding):
+    i = int(np.searchsorted(boundaries, time))
+    candidates = [boundaries[j] for j in (i - 1, i) if 0 <= j < len(boundaries)]
+    best = min(candidates, key=lambda b: abs(b - time))
+    if abs(best - time) > window:
+        return None
+    return max(0.0, float(best) + padding)
+
+
+class SpeechCache:
+    """On-disk cache of speech interval arrays keyed by file identity."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def path_for(self, video_path):
+        return os.path.join(self.cache_dir, f"{file_identity(video_path)}.npy")
+
+    def load(self, video_path):
+        try:
+            return np.load(self.path_for(video_path))
+        except (OSError, ValueError):
+            return None
+
+    def save(self, video_path, intervals):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path_for(video_path)
+        tmp_path = f"{path}.tmp.npy"
+        np.save(tmp_path, intervals)
+        os.replace(tmp_path, path)
+        return intervals
+
+    def build(self, video_path):
+        return self.save(video_path, detect_speech(iter_audio_chunks(video_path)))
+
+
+def _analyze(args):
+    """Worker process entry point for analyze_directory."""
+    cache_dir, video_path = args
+    cache = SpeechCache(cache_dir)
+    if cache.load(video_path) is not None:
+        return video_path, None, False
+    try:
+        cache.build(video_path)
+    except Exception as e:
+        return video_path, str(e), False
+    return video_path, None, True
+
+
+def analyze_directory(base_dir, cache_dir, workers=None, extensions=('.mp4',), on_progress=None):
+    """Pre-compute the speech intervals of every video under a directory with a process pool.
+
+    Returns ``(built, errors)``.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    video_paths = [os.path.join(root, name) for root, _, files in os.walk(base_dir)
+                   for name in sorted(files) if name.endswith(extensions)]
+    built, errors = 0, []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for done, (video_path, error, was_built) in enumerate(
+                executor.map(_analyze, [(cache_dir, path) for path in video_paths]), 1):
+            if error:
+                errors.append(f"{video_path}: {error}")
+            built += was_built
+            if on_progress:
+                on_progress(done, len(video_paths))
+    return built, errors
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pre-compute speech intervals for every video in a directory.")
+    parser.add_argument("base_video_dir", help="Directory containing the videos")
+    parser.add_argument("--cache-dir", default=os.path.join(os.getcwd(), "cache", "speech"),
+                        help="Speech interval cache directory")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    args = parser.parse_args()
+
+    built_count, error_list = analyze_directory(
+        args.base_video_dir, args.cache_dir, args.workers,
+        on_progress=lambda done, total: print(f"{done}/{total} videos", flush=True))
+    print(f"Analyzed {built_count} videos, {len(error_list)} errors")
+    for message in error_list:
+        print(message)
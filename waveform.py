@@ -0,0 +1,147 @@
+import os
+import json
+import shutil
+import numpy as np
+
+from audio_decode import SAMPLE_RATE, iter_audio_chunks
+from disk_cache import file_identity, touch, evict_to_budget
+
+BASE_BUCKET = 64  # Samples per peak at the finest level (8 ms at 8 kHz)
+LEVEL_FACTOR = 4  # Each level has a quarter of the peaks of the previous one
+MIN_LEVEL_PEAKS = 256  # Stop adding levels below this many peaks
+
+
+class PeakAccumulator:
+    """Compute the (min, max) of every ``bucket`` samples of a stream of sample chunks."""
+
+    def __init__(self, bucket=BASE_BUCKET):
+        self.bucket = bucket
+        self.mins, self.maxs = [], []
+        self.leftover = np.empty(0, dtype=np.float32)
+
+    def add(self, chunk):
+        samples = np.concatenate((self.leftover, chunk)) if self.leftover.size else chunk
+        usable = samples.size - samples.size % self.bucket
+        blocks = samples[:usable].reshape(-1, self.bucket)
+        self.mins.append(blocks.min(axis=1))
+        self.maxs.append(blocks.max(axis=1))
+        self.leftover = samples[usable:]
+
+    def peaks(self):
+        mins, maxs = list(self.mins), list(self.maxs)
+        if self.leftover.size:
+            mins.append(self.leftover.min(keepdims=True))
+            maxs.append(self.leftover.max(keepdims=True))
+        if not mins:
+            return np.zeros((0, 2), dtype=np.float32)
+        return np.stack((np.concatenate(mins), np.concatenate(maxs)), axis=1)
+
+
+def compute_base_peaks(chunks, bucket=BASE_BUCKET):
+    """Return the (min, max) of every ``bucket`` samples of a stream of sample chunks."""
+    accumulator = PeakAccumulator(bucket)
+    for chunk in chunks:
+        accumulator.add(chunk)
+    return accumulator.peaks()
+
+
+def reduce_peaks(peaks, factor=LEVEL_FACTOR):
+    """Combine every ``factor`` (min, max) pairs into one."""
+    pad = -len(peaks) % factor
+    if pad:
+        peaks = np.concatenate((peaks, np.repeat(peaks[-1:], pad, axis=0)))
+    blocks = peaks.reshape(-1, factor, 2)
+    return np.stack((blocks[:, :, 0].min(axis=1), blocks[:, :, 1].max(axis=1)), axis=1)
+
+
+def build_levels(base_peaks):
+    """Return the multi-resolution pyramid of peak arrays, finest first, as int8."""
+    levels = [base_peaks]
+    while len(levels[-1]) > MIN_LEVEL_PEAKS * LEVEL_FACTOR:
+        levels.append(reduce_peaks(levels[-1]))
+    return [np.clip(np.round(level * 127), -127, 127).astype(np.int8) for level in levels]
+
+
+class Waveform:
+    """Multi-resolution min/max peaks of a video's audio track."""
+
+    def __init__(self, levels, sample_rate=SAMPLE_RATE, bucket=BASE_BUCKET, factor=LEVEL_FACTOR):
+        self.levels = levels  # int8 arrays of shape (n, 2), possibly memory-mapped
+        self.sample_rate = sample_rate
+        self.bucket = bucket
+        self.factor = factor
+        self.duration = len(levels[0]) * bucket / sample_rate if levels else 0.0
+
+    def peaks(self, start, end, width):
+        """Return ``width`` (min, max) pairs in [-1, 1] covering ``start``..``end`` seconds."""
+        if not self.levels or width <= 0 or end <= start:
+            return np.zeros((0, 2), dtype=np.float32)
+
+        # Pick the coarsest level that still has at least one peak per column
+        seconds_per_peak = self.bucket / self.sample_rate
+        level = 0
+        for i in range(len(self.levels)):
+            if (end - start) / (seconds_per_peak * self.factor ** i) >= width:
+                level = i
+        scale = seconds_per_peak * self.factor ** level
+        peaks = self.levels[level]
+
+        first = max(0, int(start / scale))
+        last = min(len(peaks), max(first + 1, int(np.ceil(end / scale))))
+        window = np.asarray(peaks[first:last], dtype=np.float32) / 127.0
+        if len(window) == 0:
+            return np.zeros((0, 2), dtype=np.float32)
+        edges = np.linspace(0, len(window), width, endpoint=False).astype(np.intp)
+        return np.stack((np.minimum.reduceat(window[:, 0], edges),
+                         np.maximum.reduceat(window[:, 1], edges)), axis=1)
+
+
+class WaveformCache:
+    """On-disk cache of waveforms, keyed by file identity and bounded by a disk budget.
+
+    Each video gets a directory of ``level<N>.npy`` files that are memory-mapped
+    when loaded, so opening a waveform costs no decoding and almost no I/O.
+    """
+
+    def __init__(self, cache_dir, budget_bytes=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.budget_bytes = budget_bytes
+
+    def entry_dir(self, video_path):
+        return os.path.join(self.cache_dir, file_identity(video_path))
+
+    def load(self, video_path):
+        """Return the cached waveform of a video, or None if it has not been built."""
+        try:
+            entry_dir = self.entry_dir(video_path)
+            with open(os.path.join(entry_dir, "meta.json"), 'r') as f:
+                meta = json.load(f)
+            levels = [np.load(os.path.join(entry_dir, f"level{i}.npy"), mmap_mode='r')
+                      for i in range(meta['levels'])]
+        except (OSError, ValueError, KeyError):
+            return None
+        touch(entry_dir)
+        return Waveform(levels, meta['sample_rate'], meta['bucket'], meta['factor'])
+
+    def build(self, video_path):
+        """Decode a video's audio once, store its peak pyramid and return it memory-mapped."""
+        return self.save(video_path, compute_base_peaks(iter_audio_chunks(video_path)))
+
+    def save(self, video_path, base_peaks):
+        """Store the peak pyramid computed from a video's finest peaks and return it memory-mapped."""
+        entry_dir = self.entry_dir(video_path)
+        levels = build_levels(base_peaks)
+
+        tmp_dir = f"{entry_dir}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for i, level in enumerate(levels):
+            np.save(os.path.join(tmp_dir, f"level{i}.npy"), level)
+        meta = {'levels': len(levels), 'sample_rate': SAMPLE_RATE, 'bucket': BASE_BUCKET, 'factor': LEVEL_FACTOR}
+        with open(os.path.join(tmp_dir, "meta.json"), 'w') as f:
+            json.dump(meta, f)
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, entry_dir)
+
+        evict_to_budget(self.cache_dir, self.budget_bytes, keep=[entry_dir])
+        return self.load(video_path)